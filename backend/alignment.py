@@ -0,0 +1,201 @@
+"""
+Alignment index for the AI Accessibility Reader.
+Maps each synthesized chunk and sentence to its position in the audio
+(milliseconds and file bytes), in the extracted text (character offsets)
+and, for PDFs, to its page, so clients can seek and highlight without
+scanning the audio or downloading the whole text.
+"""
+
+import re
+import json
+import os
+from collections import deque
+import segmenter
+
+ALIGNMENT_SUFFIX = '.align.json'  # Stored next to the audio as <file_id>.align.json
+FORMAT_VERSION = 1
+CHUNK_FIELDS = ['start_ms', 'end_ms', 'start_byte', 'end_byte', 'text_start', 'text_end', 'page']
+SENTENCE_FIELDS = ['chunk'] + CHUNK_FIELDS
+
+_CONTENT_RE = re.compile(r'\S+')
+
+
+def content_length(text):
+    """Non-whitespace characters in text; chunking collapses whitespace but keeps these"""
+    return sum(map(len, text.split()))
+
+
+def alignment_filename(file_id):
+    return f"{file_id}{ALIGNMENT_SUFFIX}"
+
+
+class AlignmentBuilder:
+    """
+    Collects alignment entries while a document is synthesized
+
+    The extracted text is passed through feed() or track() as it reaches
+    the chunker, and add_chunk() is called for every chunk in order. Chunk
+    text is whitespace-normalized, so positions in the extracted text are
+    found by counting non-whitespace characters, which chunking preserves;
+    only text not yet located is buffered. Sentences within a chunk get a
+    share of its audio proportional to their length.
+    """
+    def __init__(self, page_breaks=False):
+        self.page_breaks = page_breaks  # Each piece of text is one page (PDF)
+        self.chunks = []
+        self.sentences = []  # [chunk, start fraction, end fraction, text_start, text_end, page]
+        self.params = None
+        self.byte_offsets = None
+        self.duration_ms = 0
+        self._pieces = deque()  # [raw offset, text, page] not yet fully located
+        self._pieces_seen = 0
+        self._raw_length = 0
+        self._pos = 0  # Position in the first buffered piece
+        self._byte_offset = None
+
+    def feed(self, piece):
+        """Record the next piece of extracted text"""
+        self._pieces_seen += 1
+        page = self._pieces_seen if self.page_breaks else None
+        self._pieces.append([self._raw_length, piece, page])
+        self._raw_length += len(piece)
+
+    def track(self, pieces):
+        """Pass text pieces through to the chunker, recording each one"""
+        for piece in pieces:
+            self.feed(piece)
+            yield piece
+
+    def _locate(self, count):
+        """Consume count non-whitespace characters; returns (text_start, text_end, page)"""
+        start = None
+        end = self._pieces[0][0] + self._pos if self._pieces else self._raw_length
+        page = None
+        while count > 0 and self._pieces:
+            piece_start, text, piece_page = self._pieces[0]
+            match = _CONTENT_RE.search(text, self._pos)
+            if match is None:
+                self._pieces.popleft()
+                self._pos = 0
+                continue
+            if start is None:
+                start = piece_start + match.start()
+                page = piece_page
+            # Chunks may split a word (a run-on token longer than max_chars)
+            taken = min(count, match.end() - match.start())
+            self._pos = match.start() + taken
+            count -= taken
+            end = piece_start + self._pos
+        return (start if start is not None else end), end, page
+
+    def add_chunk(self, chunk, pcm_start, pcm_end):
+        """Record the next chunk and the PCM byte range its audio occupies"""
+        index = len(self.chunks)
+        spans = list(segmenter.iter_sentence_spans(chunk)) or [(0, len(chunk))]
+        total = content_length(chunk) or 1
+        done = 0
+        first = len(self.sentences)
+        for start, end in spans:
+            length = content_length(chunk[start:end])
+            text_start, text_end, page = self._locate(length)
+            self.sentences.append([index, done / total, (done + length) / total, text_start, text_end, page])
+            done += length
+        sentences = self.sentences[first:]
+        self.chunks.append([pcm_start, pcm_end, sentences[0][3], sentences[-1][4], sentences[0][5]])
+
+    def finish(self, params, byte_offset=None, byte_offsets=None):
+        """
+        Fix the audio layout once the output is complete
+
+        Args:
+            params (tuple): (channels, sample_width, frame_rate) of the PCM
+            byte_offset (callable, optional): Maps a PCM offset to a byte
+                offset in the output file
+            byte_offsets (str, optional): 'exact' or 'estimated', describing
+                byte_offset's results
+        """
+        self.params = params
+        self._byte_offset = byte_offset if byte_offsets else None
+        self.byte_offsets = byte_offsets if byte_offset else None
+        if self.chunks and params:
+            self.duration_ms = self._ms(self.chunks[-1][1])
+
+    def _ms(self, pcm_offset):
+        channels, sample_width, frame_rate = self.params
+        return round(pcm_offset * 1000 / (channels * sample_width * frame_rate))
+
+    def _byte(self, pcm_offset):
+        return self._byte_offset(pcm_offset) if self._byte_offset else None
+
+    def _pcm_at(self, chunk, fraction):
+        """PCM offset of a fraction of a chunk's audio, on a frame boundary"""
+        pcm_start, pcm_end = chunk[0], chunk[1]
+        block_align = self.params[0] * self.params[1]
+        frames = (pcm_end - pcm_start) // block_align
+        return pcm_start + round(fraction * frames) * block_align
+
+    def to_dict(self, audio_file):
+        if self.params is None:
+            raise ValueError("finish() must be called before the index is written")
+        chunks = [[self._ms(pcm_start), self._ms(pcm_end), self._byte(pcm_start), self._byte(pcm_end),
+                   text_start, text_end, page]
+                  for pcm_start, pcm_end, text_start, text_end, page in self.chunks]
+        sentences = []
+        for index, start_fraction, end_fraction, text_start, text_end, page in self.sentences:
+            pcm_start = self._pcm_at(self.chunks[index], start_fraction)
+            pcm_end = self._pcm_at(self.chunks[index], end_fraction)
+            sentences.append([index, self._ms(pcm_start), self._ms(pcm_end), self._byte(pcm_start),
+                              self._byte(pcm_end), text_start, text_end, page])
+        return {
+            'version': FORMAT_VERSION,
+            'audio_file': audio_file,
+            'duration_ms': self.duration_ms,
+            'text_length': self._raw_length,
+            'pages': self._pieces_seen if self.page_breaks else None,
+            'byte_offsets': self.byte_offsets,
+            'chunk_fields': CHUNK_FIELDS,
+            'chunks': chunks,
+            'sentence_fields': SENTENCE_FIELDS,
+            'sentences': sentences,
+        }
+
+    def write(self, path, audio_file):
+        """Write the index atomically as compact JSON"""
+        temp_path = f"{path}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as index_file:
+            json.dump(self.to_dict(audio_file), index_file, separators=(',', ':'))
+        os.replace(temp_path, path)
+
+
+def load(path):
+    with open(path, 'r', encoding='utf-8') as index_file:
+        return json.load(index_file)
+
+
+def select(index, page=None, at_ms=None):
+    """
+    Narrow an index to the entries for one page or one moment of the audio
+
+    Returns:
+        dict: The index with only matching chunks and sentences (chunk rows
+        keep their position in 'chunk_ids')
+    """
+    page_column = CHUNK_FIELDS.index('page')
+    start_column = CHUNK_FIELDS.index('start_ms')
+    end_column = CHUNK_FIELDS.index('end_ms')
+
+    def wanted(row):
+        if page is not None and row[page_column] != page:
+            return False
+        if at_ms is not None and not row[start_column] <= at_ms < row[end_column]:
+            return False
+        return True
+
+    sentences = [row for row in index['sentences'] if wanted(row[1:])]
+    # A chunk starting on the previous page still counts if one of its sentences matches
+    chunk_ids = sorted({row[0] for row in sentences} |
+                       {i for i, row in enumerate(index['chunks']) if wanted(row)})
+    return dict(index,
+                chunk_ids=chunk_ids,
+                chunks=[index['chunks'][i] for i in chunk_ids],
+                sentences=sentences)
@@ -1,31 +1,195 @@
 import os
 import uuid
+import hashlib
 import logging
-from flask import Flask, request, jsonify, send_file
+import threading
+from collections import OrderedDict
+from flask import Flask, Request, Response, request, jsonify, send_file, stream_with_context
 from flask_cors import CORS
 from werkzeug.utils import secure_filename
 import text_processor
 import tts_engine
+import metrics
+import audio_encoder
+import audio_processing
+import alignment
+from alignment import AlignmentBuilder
+import text_store
+from text_store import TextStore
+from audio_encoder import EncoderError
+from job_queue import JobQueue, QueueFullError, COMPLETED, FAILED
+from audio_stream import StreamRegistry
+from document_index import DocumentIndex, document_key, text_digest
+from storage_manager import StorageManager
+import upload_validation
+from upload_validation import UploadSink, UploadTooLarge, UnsupportedUpload
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+class UploadRequest(Request):
+    """Request whose uploaded files stream straight into the upload folder"""
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        return UploadSink(app.config['UPLOAD_FOLDER'], filename)
+
 app = Flask(__name__)
+app.request_class = UploadRequest
 CORS(app)  # Enable CORS for all routes
 
 # Configuration
 UPLOAD_FOLDER = 'uploads'
 AUDIO_FOLDER = 'static/audio'
+STREAM_FOLDER = 'static/audio/streams'
 ALLOWED_EXTENSIONS = {'txt', 'pdf', 'docx'}
+JOB_WORKERS = 4  # Documents converted concurrently; they take turns at synthesis (tts_engine.SYNTHESIS_SLOTS)
+JOB_QUEUE_SIZE = 16  # Uploads waiting beyond this are rejected with 503
+JOB_RETRY_AFTER = 30  # Seconds clients should wait before retrying a rejected upload
+JOB_AGING = 1000  # Characters of estimated cost forgiven per second an upload waits for a worker
+JOB_MAX_PER_CLIENT = 2  # Workers one client may hold while others are waiting
+STREAM_START_TIMEOUT = 60  # Seconds a stream request waits for the first chunk
+UPLOAD_BLOCK_SIZE = 64 * 1024  # Bytes read per iteration while saving uploads
+# Whole request body; per-type limits live in upload_validation.UPLOAD_LIMITS
+MAX_CONTENT_LENGTH = upload_validation.max_upload_bytes() + 1024 * 1024
+# Documents estimated to hold more text are extracted and synthesized concurrently; the
+# estimate counts pages where the format has them (upload_validation.estimate_chars)
+STREAMING_EXTRACTION_MIN_CHARS = 512 * 1024
+DEFAULT_AUDIO_FORMAT = 'mp3'  # Used unless the client asks otherwise; WAV if ffmpeg is missing
+AUDIO_CACHE_MAX_AGE = 365 * 24 * 3600  # Finished audio never changes under its name
+# Let a front proxy send audio bytes: None, 'x-sendfile' (Apache/lighttpd) or 'x-accel-redirect' (nginx)
+AUDIO_SENDFILE = None
+AUDIO_ACCEL_PREFIX = '/protected-audio/'  # Internal nginx location aliased to AUDIO_FOLDER
+ETAG_CACHE_SIZE = 4096  # Content hashes remembered for served audio files
+ETAG_BLOCK_SIZE = 1024 * 1024
+AUDIO_MAX_BYTES = 20 * 1024 ** 3  # Least recently played audio is evicted beyond this
+AUDIO_MAX_AGE = 30 * 24 * 3600  # Audio not played for this long is removed
+UPLOAD_MAX_AGE = 3600  # Uploads not owned by a running job are orphans after this
+CHUNK_TEMP_MAX_AGE = 6 * 3600  # Untouched chunk directories of crashed conversions
+CHECKPOINT_MAX_AGE = 7 * 24 * 3600  # Checkpoints of failed conversions nobody retried
+STREAM_MAX_AGE = 3600  # Stream data not written to for this long was abandoned
+STORAGE_SWEEP_INTERVAL = 300  # Seconds between storage sweeps
+PROFILING_ENABLED = False  # Allow profile=1 on uploads to capture a cProfile trace of the job
+PROFILE_FOLDER = 'profiles'
+TEXT_DEFAULT_CHARS = 4096  # Characters per text slice unless the client asks for fewer or more
+TEXT_MAX_CHARS = 64 * 1024  # Largest slice a single text request returns
 
 app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER
+app.config['MAX_CONTENT_LENGTH'] = MAX_CONTENT_LENGTH
 app.config['AUDIO_FOLDER'] = AUDIO_FOLDER
+app.config['STREAM_FOLDER'] = STREAM_FOLDER
+app.config['JOB_WORKERS'] = JOB_WORKERS
+app.config['JOB_QUEUE_SIZE'] = JOB_QUEUE_SIZE
+app.config['JOB_RETRY_AFTER'] = JOB_RETRY_AFTER
+app.config['JOB_AGING'] = JOB_AGING
+app.config['JOB_MAX_PER_CLIENT'] = JOB_MAX_PER_CLIENT
+app.config['STREAM_START_TIMEOUT'] = STREAM_START_TIMEOUT
+app.config['STREAMING_EXTRACTION_MIN_CHARS'] = STREAMING_EXTRACTION_MIN_CHARS
+app.config['DEFAULT_AUDIO_FORMAT'] = DEFAULT_AUDIO_FORMAT
+app.config['AUDIO_CACHE_MAX_AGE'] = AUDIO_CACHE_MAX_AGE
+app.config['AUDIO_SENDFILE'] = AUDIO_SENDFILE
+app.config['AUDIO_ACCEL_PREFIX'] = AUDIO_ACCEL_PREFIX
+app.config['USE_X_SENDFILE'] = AUDIO_SENDFILE == 'x-sendfile'
+app.config['AUDIO_MAX_BYTES'] = AUDIO_MAX_BYTES
+app.config['AUDIO_MAX_AGE'] = AUDIO_MAX_AGE
+app.config['UPLOAD_MAX_AGE'] = UPLOAD_MAX_AGE
+app.config['CHUNK_TEMP_MAX_AGE'] = CHUNK_TEMP_MAX_AGE
+app.config['CHECKPOINT_MAX_AGE'] = CHECKPOINT_MAX_AGE
+app.config['STREAM_MAX_AGE'] = STREAM_MAX_AGE
+app.config['STORAGE_SWEEP_INTERVAL'] = STORAGE_SWEEP_INTERVAL
+app.config['PROFILING_ENABLED'] = PROFILING_ENABLED
+app.config['PROFILE_FOLDER'] = PROFILE_FOLDER
+app.config['TEXT_DEFAULT_CHARS'] = TEXT_DEFAULT_CHARS
+app.config['TEXT_MAX_CHARS'] = TEXT_MAX_CHARS
 
 # Create necessary directories if they don't exist
 os.makedirs(UPLOAD_FOLDER, exist_ok=True)
 os.makedirs(AUDIO_FOLDER, exist_ok=True)
 
+# Run as a script, this file is re-imported as __mp_main__ by every spawned
+# worker process (e.g. PDF extraction), which must not load any engines
+SERVING_PROCESS = __name__ != '__mp_main__'
+
+# Load models in the WSGI master before workers fork (e.g. gunicorn --preload)
+# so they are shared copy-on-write instead of loaded once per worker
+if SERVING_PROCESS and os.environ.get('TTS_PRELOAD') == '1':
+    tts_engine.initialize_tts()
+
+# Warm up (the rest of) the engines in the background, so /api/ready turns green
+# under any WSGI server without waiting for an upload. The dev reloader's watcher
+# process (running this file without WERKZEUG_RUN_MAIN) never serves requests.
+if SERVING_PROCESS and (__name__ != '__main__' or os.environ.get('WERKZEUG_RUN_MAIN') == 'true'):
+    tts_engine.start_background_initialization()
+
+# Background workers for extraction and synthesis; shorter documents go first
+job_queue = JobQueue(num_workers=app.config['JOB_WORKERS'], max_queue_size=app.config['JOB_QUEUE_SIZE'],
+                     aging=app.config['JOB_AGING'], max_per_client=app.config['JOB_MAX_PER_CLIENT'])
+
+# Growing audio streams for conversions still in progress
+audio_streams = StreamRegistry(app.config['STREAM_FOLDER'], stream_ttl=app.config['STREAM_MAX_AGE'])
+
+# Previously converted and in-flight documents, for deduplication
+document_index = DocumentIndex(os.path.join(app.config['AUDIO_FOLDER'], 'documents.json'))
+
+# Extracted text of converted documents, stored next to their audio
+texts = TextStore(app.config['AUDIO_FOLDER'])
+
+def storage_in_use(filename):
+    """Whether an audio file or upload belongs to a conversion that is still running or streaming"""
+    # Audio is <file_id>.<ext>, sidecars <file_id>.<suffix>, uploads <file_id>_<name>
+    file_id = filename.split('.', 1)[0].split('_', 1)[0]
+    job = job_queue.get(file_id)
+    if job is not None and not job.finished:
+        return True
+    stream = audio_streams.get(file_id)
+    return stream is not None and not stream.finished
+
+# Quotas for generated audio, orphaned uploads, abandoned chunk directories and stale checkpoints
+storage = StorageManager(app.config['AUDIO_FOLDER'], app.config['UPLOAD_FOLDER'],
+                         max_audio_bytes=app.config['AUDIO_MAX_BYTES'],
+                         max_audio_age=app.config['AUDIO_MAX_AGE'],
+                         upload_max_age=app.config['UPLOAD_MAX_AGE'],
+                         temp_max_age=app.config['CHUNK_TEMP_MAX_AGE'],
+                         checkpoint_dir=tts_engine.CHECKPOINT_DIR,
+                         checkpoint_max_age=app.config['CHECKPOINT_MAX_AGE'],
+                         stream_dir=app.config['STREAM_FOLDER'],
+                         stream_max_age=app.config['STREAM_MAX_AGE'],
+                         sidecars=(alignment.ALIGNMENT_SUFFIX, text_store.TEXT_SUFFIX,
+                                   text_store.TEXT_INDEX_SUFFIX),
+                         sweep_interval=app.config['STORAGE_SWEEP_INTERVAL'],
+                         in_use=storage_in_use)
+
+# Point-in-time values refreshed on every /metrics scrape
+queue_depth_gauge = metrics.registry.register(metrics.Gauge(
+    'reader_queue_depth', 'Jobs waiting for a worker'))
+jobs_gauge = metrics.registry.register(metrics.Gauge(
+    'reader_jobs', 'Tracked jobs by state', labels=('state',)))
+chunk_cache_gauge = metrics.registry.register(metrics.Gauge(
+    'reader_chunk_cache', 'Chunk cache counters and size', labels=('field',)))
+storage_gauge = metrics.registry.register(metrics.Gauge(
+    'reader_storage_bytes', 'Disk used by generated audio, stream data and uploads', labels=('area',)))
+
+def collect_gauges():
+    job_stats = job_queue.stats()
+    queue_depth_gauge.set(job_stats['queue_depth'])
+    for state, count in job_stats['jobs'].items():
+        jobs_gauge.set(count, state=state)
+    cache_stats = tts_engine.get_cache_stats()
+    for field in ('hits', 'misses', 'evictions', 'entries', 'size_bytes'):
+        chunk_cache_gauge.set(cache_stats[field], field=field)
+    storage_stats = storage.stats()
+    for area in ('audio', 'stream', 'upload'):
+        storage_gauge.set(storage_stats[f'{area}_bytes'], area=area)
+
+metrics.registry.add_collector(collect_gauges)
+
+# On-demand profiling of single jobs (a different profiler can be plugged in with metrics.set_profiler)
+if app.config['PROFILING_ENABLED']:
+    metrics.set_profiler(metrics.CProfileHook(app.config['PROFILE_FOLDER']))
+
+# Content-hash ETags of audio files, keyed by path and invalidated on change
+audio_etags = OrderedDict()
+audio_etags_lock = threading.Lock()
+
 def allowed_file(filename):
     """Check if the file extension is allowed"""
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
@@ -36,36 +200,36 @@ def home():
 
 @app.route('/api/health', methods=['GET'])
 def health_check():
-    """Health check endpoint to verify TTS engine status"""
-    try:
-        # Try to initialize TTS engine if not already done
-        if tts_engine.current_tts_engine is None:
-            tts_engine.initialize_tts()
-        
-        engine_info = tts_engine.get_current_engine()
-        available_engines = tts_engine.get_available_engines()
-        
-        return jsonify({
-            'status': 'healthy',
-            'tts_ready': True,
-            'message': 'TTS engine is ready',
-            'current_engine': engine_info,
-            'available_engines': available_engines
-        }), 200
-    except Exception as e:
-        logger.error(f"Health check failed: {str(e)}")
-        available_engines = tts_engine.get_available_engines()
-        return jsonify({
-            'status': 'unhealthy',
-            'tts_ready': False,
-            'error': str(e),
-            'message': 'TTS engine failed to initialize',
-            'available_engines': available_engines
-        }), 500
+    """Liveness check; reports TTS engine status but never waits for it"""
+    engine_status = tts_engine.get_engine_status()
+    tts_ready = engine_status['state'] == tts_engine.ENGINE_READY
+    
+    return jsonify({
+        'status': 'healthy',
+        'tts_ready': tts_ready,
+        'message': 'TTS engine is ready' if tts_ready else f"TTS engine is {engine_status['state']}",
+        'tts_status': engine_status,
+        'current_engine': tts_engine.get_current_engine(),
+        'available_engines': tts_engine.get_available_engines(),
+        'capabilities': tts_engine.get_capability_stats(),
+        'jobs': job_queue.stats(),
+        'chunk_cache': tts_engine.get_cache_stats(),
+        'checkpoints': tts_engine.get_checkpoint_stats(),
+        'scheduler': tts_engine.get_scheduler_stats(),
+        'storage': storage.stats()
+    }), 200
+
+@app.route('/api/ready', methods=['GET'])
+def readiness_check():
+    """Readiness check: 200 once the TTS engine is warmed up, 503 until then"""
+    engine_status = tts_engine.get_engine_status()
+    if engine_status['state'] == tts_engine.ENGINE_READY:
+        return jsonify({'ready': True, 'tts_status': engine_status}), 200
+    return jsonify({'ready': False, 'tts_status': engine_status}), 503
 
 @app.route('/api/upload', methods=['POST'])
 def upload_file():
-    """Handle file upload, extract text, and convert to speech"""
+    """Handle file upload and queue text extraction and speech conversion"""
     if 'file' not in request.files:
         return jsonify({'error': 'No file part'}), 400
     
@@ -76,77 +240,460 @@ def upload_file():
     
     if not file or not allowed_file(file.filename):
         return jsonify({'error': 'File type not allowed. Please upload .txt, .pdf, or .docx files.'}), 400
-
+    
+    try:
+        output = choose_output_format()
+    except EncoderError as ee:
+        return jsonify({'error': str(ee), 'available_formats': audio_encoder.available_formats()}), 400
+    
+    try:
+        voice = choose_voice()
+    except ValueError as ve:
+        return jsonify({'error': str(ve), 'engines': tts_engine.registry.names()}), 400
+    
+    storage.start()
+    file_path = None
     try:
         # Generate secure filename with UUID to avoid collisions
         filename = secure_filename(file.filename)
         file_id = str(uuid.uuid4())
         file_path = os.path.join(app.config['UPLOAD_FOLDER'], f"{file_id}_{filename}")
         
-        # Save uploaded file
-        file.save(file_path)
-        logger.info(f"File saved: {file_path}")
+        with metrics.time_stage('upload'):
+            # Save uploaded file, hashing it on the way for deduplication
+            content_hash = save_upload(file, file_path)
+            logger.info(f"File saved: {file_path}")
+            
+            # Page counts and archive structure, checked before any extraction is queued
+            extension = upload_validation.file_extension(filename)
+            pages = upload_validation.validate_document(file_path, extension)
+        
+        # Identical document already converted with the current engine settings
+        existing = find_converted_document('file', content_hash, output, voice)
+        if existing:
+            logger.info(f"Returning existing audio for duplicate upload {content_hash[:12]}")
+            remove_upload(file_path)
+            return jsonify(existing), 200
+        
+        # Identical document currently being converted: share that job
+        owner = document_index.claim(in_flight_key('file', content_hash, output, voice), file_id)
+        if owner is not None:
+            logger.info(f"Joining in-flight job {owner} for duplicate upload")
+            remove_upload(file_path)
+            return jsonify(queued_response(owner)), 202
+        
+        task = process_document
+        if app.config['PROFILING_ENABLED'] and request.values.get('profile') == '1':
+            task = profiled_task(process_document)
+        
+        stream = audio_streams.create(file_id)
+        try:
+            job_queue.submit(task, file_path, file_id, stream, content_hash, output, voice, job_id=file_id,
+                             cost=upload_validation.estimate_chars(file_path, extension, pages),
+                             client=request.remote_addr)
+        except QueueFullError as qe:
+            logger.warning(f"Rejecting upload: {str(qe)}")
+            remove_upload(file_path)
+            audio_streams.discard(file_id)
+            document_index.release(in_flight_key('file', content_hash, output, voice), file_id)
+            response = jsonify({'error': 'Server is busy. Please try again shortly.'})
+            response.headers['Retry-After'] = str(app.config['JOB_RETRY_AFTER'])
+            return response, 503
+        
+        return jsonify(queued_response(file_id)), 202
+        
+    except (UploadTooLarge, UnsupportedUpload) as ue:
+        logger.info(f"Rejected upload {file.filename}: {ue.description}")
+        remove_upload(file_path)
+        raise
+        
+    except Exception as e:
+        logger.exception("Unexpected error during file upload")
+        if file_path and os.path.exists(file_path) and job_queue.get(file_id) is None:
+            remove_upload(file_path)
+        return jsonify({'error': f'An unexpected error occurred: {str(e)}'}), 500
+
+def queued_response(job_id):
+    """Response body pointing the client at a queued or running job"""
+    return {
+        'success': True,
+        'message': 'File queued for processing',
+        'job_id': job_id,
+        'status_url': f"/api/jobs/{job_id}",
+        'stream_url': f"/api/audio/{job_id}/stream"
+    }
+
+def profiled_task(func):
+    """Wrap a job function so the whole job runs under the configured profiler"""
+    def run(job, *args):
+        with metrics.profiled(job.id):
+            return func(job, *args)
+    return run
+
+def save_upload(file, file_path):
+    """Write an uploaded file to disk and return the SHA-256 of its bytes"""
+    if isinstance(file.stream, UploadSink):
+        # Already streamed to disk and hashed while the request was parsed
+        return file.stream.claim(file_path)
+    
+    digest = hashlib.sha256()
+    with open(file_path, 'wb') as out:
+        while True:
+            block = file.stream.read(UPLOAD_BLOCK_SIZE)
+            if not block:
+                break
+            digest.update(block)
+            out.write(block)
+    return digest.hexdigest()
+
+def choose_output_format():
+    """
+    Pick the output format, bitrate and playback speed for an upload
+
+    An explicit 'format' field or query parameter wins; otherwise the best
+    audio type in the Accept header, falling back to DEFAULT_AUDIO_FORMAT.
+    
+    Returns:
+        dict: {'format': name, 'bitrate': bitrate or None, 'speed': factor,
+        'processing': server-side post-processing steps, which also shape the audio}
+    
+    Raises:
+        EncoderError: If the requested format, bitrate or speed is not supported
+    """
+    available = audio_encoder.available_formats()
+    requested = request.values.get('format', '').strip().lower()
+    if requested:
+        if requested not in available:
+            raise EncoderError(f"Output format '{requested}' is not available")
+        output_format = requested
+    else:
+        default = app.config['DEFAULT_AUDIO_FORMAT']
+        if default not in available:
+            default = 'wav'
+        by_mimetype = {audio_encoder.ENCODERS[name].mimetype: name for name in available}
+        # Listing the default first makes wildcards (*/*, audio/*) resolve to it
+        candidates = [audio_encoder.ENCODERS[default].mimetype] + \
+            [mimetype for mimetype, name in by_mimetype.items() if name != default]
+        output_format = by_mimetype.get(request.accept_mimetypes.best_match(candidates), default)
+    
+    bitrate = audio_encoder.normalize_bitrate(output_format, request.values.get('bitrate'))
+    try:
+        speed = audio_processing.normalize_speed(request.values.get('speed'))
+    except ValueError as ve:
+        raise EncoderError(str(ve))
+    return {'format': output_format, 'bitrate': bitrate, 'speed': speed,
+            'processing': tts_engine.get_processing_settings()}
+
+def choose_voice():
+    """
+    Engine, model and voice requested for an upload ('engine', 'model' and
+    'voice' fields or query parameters); None means the default
+    
+    Raises:
+        ValueError: If the engine is unknown or lacks the model or voice option
+    """
+    voice = {key: (request.values.get(key) or '').strip() or None for key in ('engine', 'model', 'voice')}
+    tts_engine.validate_selection(**voice)
+    return voice
+
+def output_signature(signature, output):
+    """Engine signature extended with the output encoding, which also shapes the audio file"""
+    if signature is None:
+        return None
+    return dict(signature, output=output)
+
+def in_flight_key(kind, digest, output, voice):
+    """Single-flight key for a conversion of identical content with the same engine choice and encoding"""
+    processing = output['processing']
+    return (f"{kind}:{digest}:{output['format']}:{output['bitrate']}:{output['speed']}:"
+            f"{processing['trim_silence']:d}{processing['normalize_loudness']:d}:"
+            f"{voice['engine']}:{voice['model']}:{voice['voice']}")
+
+def find_converted_document(kind, digest, output, voice, signature=None):
+    """Look up finished audio for identical content, engine settings and output encoding"""
+    signature = signature or output_signature(tts_engine.get_engine_signature(**voice), output)
+    if signature is None:
+        return None
+    
+    key = document_key(kind, digest, signature)
+    result = document_index.lookup(key)
+    if result is None:
+        return None
+    
+    # Audio may have been deleted since it was recorded
+    if not os.path.exists(os.path.join(app.config['AUDIO_FOLDER'], result['audio_file'])):
+        document_index.forget(key)
+        return None
+    return result
+
+def process_document(job, file_path, file_id, stream, content_hash, output, voice):
+    """Extract text from an uploaded file and convert it to speech (runs on a job worker)"""
+    error = None
+    text_claim = None
+    try:
+        # job.cost is the upload's text estimate: file size says little about a PDF's text
+        if job.cost >= app.config['STREAMING_EXTRACTION_MIN_CHARS']:
+            return process_document_streaming(job, file_path, file_id, stream, content_hash, output, voice)
         
-        # Extract text from file
+        # Extract text from file; pieces are pages for PDFs, which the alignment index records
         logger.info("Extracting text from file...")
-        text = text_processor.extract_text(file_path)
+        with metrics.time_stage('extract'):
+            pieces = list(text_processor.iter_text(file_path))
+            text = ''.join(pieces)
         
         if not text or not text.strip():
-            return jsonify({'error': 'No text could be extracted from the file'}), 400
+            raise ValueError('No text could be extracted from the file')
         
         logger.info(f"Extracted {len(text)} characters of text")
+        # Synthesis turns favour the conversion with the least text left
+        ticket = tts_engine.scheduler.ticket(job.id, job.client, len(text))
+        
+        # Different files can carry the same text; reuse or wait for its audio
+        signature = output_signature(tts_engine.get_engine_signature(initialize=True, **voice), output)
+        digest = text_digest(text)
+        existing = find_converted_document('text', digest, output, voice, signature)
+        if existing is None:
+            owner = document_index.claim(in_flight_key('text', digest, output, voice), job.id)
+            if owner is None:
+                text_claim = in_flight_key('text', digest, output, voice)
+            else:
+                owner_job = job_queue.get(owner)
+                if owner_job is not None and owner_job.wait() and owner_job.state == COMPLETED:
+                    existing = owner_job.result
+        if existing:
+            logger.info(f"Reusing existing audio {existing['audio_file']} for identical text")
+            return existing
         
         # Convert text to speech
-        audio_filename = f"{file_id}.wav"  # Changed to WAV since MP3 might not work without ffmpeg
+        audio_filename = audio_filename_for(file_id, output)
         audio_path = os.path.join(app.config['AUDIO_FOLDER'], audio_filename)
         
-        logger.info("Converting text to speech...")
-        tts_engine.text_to_speech(text, audio_path)
+        store_text(file_id, file_path, pieces)  # Readable while synthesis runs
+        alignment_index = new_alignment(file_path)
+        for piece in pieces:
+            alignment_index.feed(piece)
         
-        # Clean up uploaded file
-        try:
-            os.remove(file_path)
-        except Exception as cleanup_error:
-            logger.warning(f"Failed to clean up uploaded file: {cleanup_error}")
+        logger.info(f"Converting text to speech ({output['format']})...")
+        # The engine actually used may differ from the requested one (spillover)
+        used = tts_engine.text_to_speech(text, audio_path, progress_callback=job.update_progress,
+                                         segment_callback=stream.add_segment, bitrate=output['bitrate'],
+                                         checkpoint_key=content_hash, alignment=alignment_index,
+                                         ticket=ticket, speed=output['speed'], **voice)
         
-        return jsonify({
-            'success': True,
-            'message': 'File processed successfully',
-            'audio_url': f"/api/audio/{audio_filename}",
-            'text': text[:1000] + ('...' if len(text) > 1000 else ''),  # Return preview of text
-            'text_length': len(text),
-            'audio_file': audio_filename
-        }), 200
+        audio_etag(audio_path)  # Hash now rather than on the first download
+        write_alignment(alignment_index, file_id, audio_filename)
+        result = conversion_result(file_id, audio_filename, text[:1000], len(text), output, used)
+        signature = output_signature(used, output)
+        document_index.record([document_key('file', content_hash, signature),
+                               document_key('text', digest, signature)], result)
+        return result
         
     except ValueError as ve:
         logger.error(f"Validation error: {str(ve)}")
-        return jsonify({'error': f'File processing error: {str(ve)}'}), 400
+        error = f'File processing error: {str(ve)}'
+        raise ValueError(error)
         
     except RuntimeError as re:
         logger.error(f"Runtime error: {str(re)}")
-        return jsonify({'error': f'TTS engine error: {str(re)}'}), 500
-        
-    except Exception as e:
-        logger.exception("Unexpected error during file processing")
-        return jsonify({'error': f'An unexpected error occurred: {str(e)}'}), 500
+        error = f'TTS engine error: {str(re)}'
+        raise RuntimeError(error)
+    
+    finally:
+        # Clean up uploaded file and close the stream for any listeners; its
+        # data goes too, as later requests are served the final file
+        remove_upload(file_path)
+        stream.finish(error)
+        audio_streams.discard(file_id)
+        document_index.release(in_flight_key('file', content_hash, output, voice), job.id)
+        if text_claim:
+            document_index.release(text_claim, job.id)
+
+def process_document_streaming(job, file_path, file_id, stream, content_hash, output, voice):
+    """
+    Convert a large document while it is still being extracted
+
+    Pages are extracted on a background thread and fed straight into the
+    TTS chunker, so synthesis starts after the first page and memory stays
+    bounded. Text-level deduplication is skipped because the full text is
+    only known at the end; the chunk cache still absorbs repeated text.
+    """
+    logger.info("Extracting and converting text as a stream...")
+    text_stream = text_processor.TextStream(text_processor.prefetch(text_processor.iter_text(file_path)))
+    
+    if not text_stream.has_text():
+        if text_stream.error is not None:
+            raise text_stream.error
+        raise ValueError('No text could be extracted from the file')
+    
+    audio_filename = audio_filename_for(file_id, output)
+    audio_path = os.path.join(app.config['AUDIO_FOLDER'], audio_filename)
+    alignment_index = new_alignment(file_path)
+    text_writer = texts.writer(file_id, page_breaks=has_pages(file_path))
+    # The full length is unknown until extraction ends; the upload's estimate stands
+    # in and is refined as extracted text is chunked
+    ticket = tts_engine.scheduler.ticket(job.id, job.client, job.cost)
+    try:
+        used = tts_engine.text_to_speech(alignment_index.track(text_writer.track(text_stream)), audio_path,
+                                         progress_callback=job.update_progress,
+                                         segment_callback=stream.add_segment, bitrate=output['bitrate'],
+                                         checkpoint_key=content_hash, alignment=alignment_index,
+                                         ticket=ticket, speed=output['speed'], **voice)
+    except RuntimeError:
+        # Report extraction failures as such, not as TTS errors
+        if text_stream.error is not None:
+            raise text_stream.error
+        raise
+    finally:
+        if not text_writer.closed:
+            text_writer.abort()
+    
+    logger.info(f"Extracted and converted {text_stream.length} characters of text")
+    audio_etag(audio_path)
+    write_alignment(alignment_index, file_id, audio_filename)
+    signature = output_signature(used, output)
+    result = conversion_result(file_id, audio_filename, text_stream.preview, text_stream.length, output, used)
+    document_index.record([document_key('file', content_hash, signature),
+                           document_key('text', text_stream.hexdigest(), signature)], result)
+    return result
+
+def has_pages(file_path):
+    """Whether each piece of extracted text is a page (PDF text arrives a page at a time)"""
+    return upload_validation.file_extension(file_path) == 'pdf'
+
+def new_alignment(file_path):
+    """Alignment index builder for a document"""
+    return AlignmentBuilder(page_breaks=has_pages(file_path))
+
+def store_text(file_id, file_path, pieces):
+    """Persist extracted text for the text API (conversion goes on without it)"""
+    writer = texts.writer(file_id, page_breaks=has_pages(file_path))
+    try:
+        for piece in pieces:
+            writer.write(piece)
+        writer.close()
+    except OSError as e:
+        writer.abort()
+        logger.warning(f"Could not store text for {file_id}: {e}")
+
+def write_alignment(alignment_index, file_id, audio_filename):
+    """Store the alignment index next to the audio (the audio stays usable without it)"""
+    index_path = os.path.join(app.config['AUDIO_FOLDER'], alignment.alignment_filename(file_id))
+    try:
+        alignment_index.write(index_path, audio_filename)
+    except (OSError, ValueError) as e:
+        logger.warning(f"Could not write alignment index for {file_id}: {e}")
+
+def audio_filename_for(file_id, output):
+    return f"{file_id}{audio_encoder.ENCODERS[output['format']].extension}"
+
+def find_audio_file(file_id):
+    """Name of the finished audio for file_id in any output format, or None"""
+    for encoder_class in audio_encoder.ENCODERS.values():
+        filename = f"{file_id}{encoder_class.extension}"
+        if os.path.exists(os.path.join(app.config['AUDIO_FOLDER'], filename)):
+            return filename
+    return None
+
+def conversion_result(file_id, audio_filename, preview, text_length, output, engine_signature):
+    """Job result returned to clients once a document is converted"""
+    return {
+        'success': True,
+        'message': 'File processed successfully',
+        'audio_url': f"/api/audio/{audio_filename}",
+        'stream_url': f"/api/audio/{file_id}/stream",
+        'alignment_url': f"/api/audio/{file_id}/alignment",
+        'text_url': f"/api/documents/{file_id}/text",
+        'text': preview + ('...' if text_length > len(preview) else ''),  # Return preview of text
+        'text_length': text_length,
+        'audio_file': audio_filename,
+        'audio_format': output['format'],
+        'bitrate': output['bitrate'],
+        'speed': output['speed'],
+        'engine': engine_signature['engine'],
+        'voice_settings': engine_signature['settings']
+    }
+
+def audio_etag(audio_path):
+    """Strong ETag for an audio file: the SHA-256 of its contents, cached per file version"""
+    stat = os.stat(audio_path)
+    version = (stat.st_mtime_ns, stat.st_size)
+    with audio_etags_lock:
+        cached = audio_etags.get(audio_path)
+        if cached is not None and cached[0] == version:
+            audio_etags.move_to_end(audio_path)
+            return cached[1]
+    
+    digest = hashlib.sha256()
+    with open(audio_path, 'rb') as audio_file:
+        while True:
+            block = audio_file.read(ETAG_BLOCK_SIZE)
+            if not block:
+                break
+            digest.update(block)
+    etag = digest.hexdigest()
+    
+    with audio_etags_lock:
+        audio_etags[audio_path] = (version, etag)
+        audio_etags.move_to_end(audio_path)
+        while len(audio_etags) > ETAG_CACHE_SIZE:
+            audio_etags.popitem(last=False)
+    return etag
+
+def remove_upload(file_path):
+    """Delete an uploaded file, logging instead of raising on failure"""
+    try:
+        os.remove(file_path)
+    except Exception as cleanup_error:
+        logger.warning(f"Failed to clean up uploaded file: {cleanup_error}")
+
+@app.route('/api/jobs/<job_id>', methods=['GET'])
+def get_job_status(job_id):
+    """Report the state, progress and result of a queued conversion"""
+    job = job_queue.get(job_id)
+    if job is None:
+        return jsonify({'error': 'Job not found'}), 404
+    return jsonify(job.to_dict()), 200
 
 @app.route('/api/audio/<filename>', methods=['GET'])
 def get_audio(filename):
-    """Serve the generated audio file"""
+    """
+    Serve the generated audio file
+    
+    Supports Range requests (206) for seeking and resumed downloads, and
+    If-None-Match (304) against a strong content-hash ETag. Finished files
+    never change, so they are cacheable forever.
+    """
     # Validate filename to prevent directory traversal
     if '..' in filename or '/' in filename or '\\' in filename:
         return jsonify({'error': 'Invalid filename'}), 400
     
     audio_path = os.path.join(app.config['AUDIO_FOLDER'], filename)
     
+    # The file exists while it is still being encoded; don't let anyone cache it yet
+    job = job_queue.get(os.path.splitext(filename)[0])
+    if job is not None and not job.finished:
+        return jsonify({'error': 'Audio is not ready yet'}), 503
+    
     if os.path.exists(audio_path):
         try:
-            # Determine MIME type based on file extension
-            if audio_path.endswith('.wav'):
-                mimetype = 'audio/wav'
+            # Determine MIME type from the file's header bytes
+            mimetype = audio_encoder.detect_mimetype(audio_path)
+            etag = audio_etag(audio_path)
+            storage.start()
+            storage.touch(audio_path)
+            
+            if app.config['AUDIO_SENDFILE'] == 'x-accel-redirect':
+                # nginx serves the bytes (and ranges) from its internal location
+                response = Response(mimetype=mimetype)
+                response.headers['X-Accel-Redirect'] = app.config['AUDIO_ACCEL_PREFIX'] + filename
+                response.set_etag(etag)
+                response = response.make_conditional(request)
             else:
-                mimetype = 'audio/mpeg'
-            return send_file(audio_path, mimetype=mimetype)
+                # conditional=True answers Range with 206 and a matching If-None-Match with 304
+                response = send_file(audio_path, mimetype=mimetype, etag=etag, conditional=True)
+            
+            response.headers['Cache-Control'] = f"public, max-age={app.config['AUDIO_CACHE_MAX_AGE']}, immutable"
+            return response
         except Exception as e:
             logger.error(f"Error serving audio file {filename}: {str(e)}")
             return jsonify({'error': 'Error serving audio file'}), 500
@@ -154,6 +701,111 @@ def get_audio(filename):
         logger.warning(f"Audio file not found: {audio_path}")
         return jsonify({'error': 'Audio file not found'}), 404
 
+@app.route('/api/audio/<file_id>/stream', methods=['GET'])
+def stream_audio(file_id):
+    """Stream audio as a growing WAV while synthesis is still running"""
+    stream = audio_streams.get(file_id)
+    if stream is not None and stream.wait_until_ready(timeout=app.config['STREAM_START_TIMEOUT']):
+        wav = stream.open_wav()
+        if wav is not None:
+            return Response(stream_with_context(wav), mimetype='audio/wav',
+                            headers={'Cache-Control': 'no-cache'})
+    
+    job = job_queue.get(file_id)
+    if job is not None and stream is not None and stream.finished:
+        # The stream's data is discarded just before its job completes
+        job.wait(timeout=app.config['STREAM_START_TIMEOUT'])
+    if job is not None and job.state == COMPLETED:
+        # Nothing was streamed (e.g. deduplicated job) or the stream is done; serve the final file
+        return get_audio(job.result['audio_file'])
+    if job is not None and job.state == FAILED:
+        return jsonify({'error': job.error}), 500
+    if job is None and stream is None:
+        # Conversion finished long ago and its stream expired
+        audio_filename = find_audio_file(secure_filename(file_id))
+        if audio_filename is None:
+            return jsonify({'error': 'Audio file not found'}), 404
+        return get_audio(audio_filename)
+    return jsonify({'error': 'Audio is not ready yet'}), 503
+
+@app.route('/api/audio/<file_id>/alignment', methods=['GET'])
+def get_alignment(file_id):
+    """
+    Serve the alignment index of a converted document
+    
+    Maps each chunk and sentence to audio milliseconds and file byte
+    offsets (for Range requests), to offsets in the extracted text and,
+    for PDFs, to pages. With ?page=N or ?ms=T only the matching entries
+    are returned.
+    """
+    file_id = secure_filename(file_id)
+    job = job_queue.get(file_id)
+    if job is not None and not job.finished:
+        return jsonify({'error': 'Alignment is not ready yet'}), 503
+    if job is not None and job.state == COMPLETED and job.result:
+        # A deduplicated job reuses another document's audio and index
+        file_id = os.path.splitext(job.result['audio_file'])[0]
+    
+    index_path = os.path.join(app.config['AUDIO_FOLDER'], alignment.alignment_filename(file_id))
+    if not os.path.exists(index_path):
+        return jsonify({'error': 'Alignment not found'}), 404
+    
+    page = request.args.get('page', type=int)
+    at_ms = request.args.get('ms', type=int)
+    if page is None and at_ms is None:
+        response = send_file(os.path.abspath(index_path), mimetype='application/json', conditional=True)
+        response.headers['Cache-Control'] = f"public, max-age={app.config['AUDIO_CACHE_MAX_AGE']}, immutable"
+        return response
+    return jsonify(alignment.select(alignment.load(index_path), page=page, at_ms=at_ms)), 200
+
+@app.route('/api/documents/<document_id>/text', methods=['GET'])
+def get_document_text(document_id):
+    """
+    Read a slice of a document's extracted text
+    
+    ?offset= and ?limit= select characters (limit capped at TEXT_MAX_CHARS);
+    ?page= reads one PDF page. Slices come from a memory-mapped file, so
+    the cost does not grow with the size of the document.
+    """
+    document_id = secure_filename(document_id)
+    job = job_queue.get(document_id)
+    if job is not None and job.state == COMPLETED and job.result:
+        # A deduplicated job reuses another document's audio and text
+        document_id = os.path.splitext(job.result['audio_file'])[0]
+    
+    if not texts.exists(document_id):
+        if job is not None and not job.finished:
+            return jsonify({'error': 'Text is not ready yet'}), 503
+        return jsonify({'error': 'Text not found'}), 404
+    
+    offset = request.args.get('offset', 0, type=int)
+    limit = min(request.args.get('limit', app.config['TEXT_DEFAULT_CHARS'], type=int),
+                app.config['TEXT_MAX_CHARS'])
+    page = request.args.get('page', type=int)
+    try:
+        result = texts.read(document_id, offset=offset, limit=limit, page=page)
+    except ValueError as ve:
+        return jsonify({'error': str(ve)}), 400
+    
+    result['document_id'] = document_id
+    response = jsonify(result)
+    # Text never changes under its id
+    response.headers['Cache-Control'] = f"public, max-age={app.config['AUDIO_CACHE_MAX_AGE']}, immutable"
+    return response
+
+@app.route('/metrics', methods=['GET'])
+def prometheus_metrics():
+    """Stage timings, throughput histograms and counters in Prometheus text format"""
+    return Response(metrics.registry.render(), mimetype='text/plain; version=0.0.4')
+
+@app.route('/api/profiles/<job_id>', methods=['GET'])
+def get_profile(job_id):
+    """Download the cProfile trace of a job uploaded with profile=1"""
+    profile_path = os.path.join(app.config['PROFILE_FOLDER'], f"{secure_filename(job_id)}.prof")
+    if not app.config['PROFILING_ENABLED'] or not os.path.exists(profile_path):
+        return jsonify({'error': 'Profile not found'}), 404
+    return send_file(os.path.abspath(profile_path), mimetype='application/octet-stream', as_attachment=True)
+
 @app.route('/api/models', methods=['GET'])
 def get_available_models():
     """Get list of available TTS engines for debugging"""
@@ -163,15 +815,23 @@ def get_available_models():
         
         return jsonify({
             'available_engines': available_engines,
-            'current_engine': current_engine
+            'current_engine': current_engine,
+            'engines': tts_engine.get_engines(),
+            'available_formats': audio_encoder.available_formats()
         }), 200
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 @app.errorhandler(413)
 def too_large(e):
+    if isinstance(e, UploadTooLarge):
+        return jsonify({'error': e.description}), 413
     return jsonify({'error': 'File too large. Please upload a smaller file.'}), 413
 
+@app.errorhandler(415)
+def unsupported_media_type(e):
+    return jsonify({'error': e.description}), 415
+
 @app.errorhandler(500)
 def internal_error(e):
     logger.exception("Internal server error")
@@ -184,14 +844,4 @@ if __name__ == '__main__':
     available_engines = tts_engine.get_available_engines()
     logger.info(f"Available TTS engines: {available_engines}")
     
-    # Pre-initialize TTS engine to catch errors early
-    try:
-        logger.info("Pre-initializing TTS engine...")
-        tts_engine.initialize_tts()
-        current_engine = tts_engine.get_current_engine()
-        logger.info(f"TTS engine pre-initialization successful: {current_engine}")
-    except Exception as e:
-        logger.error(f"TTS engine pre-initialization failed: {str(e)}")
-        logger.info("Application will start anyway, but TTS functionality may be limited")
-    
     app.run(debug=True, port=5000)
\ No newline at end of file
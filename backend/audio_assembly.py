@@ -0,0 +1,176 @@
+"""
+Audio assembly for the AI Accessibility Reader.
+Concatenates chunk audio by streaming raw PCM frames straight into the
+output encoder, so memory stays flat and time is linear in document length.
+"""
+
+import os
+import struct
+import wave
+import logging
+
+logger = logging.getLogger(__name__)
+
+WAV_HEADER_SIZE = 44
+FRAMES_PER_BLOCK = 64 * 1024
+
+
+def wav_header(channels, sample_width, frame_rate, data_size):
+    """Build a 44-byte PCM WAV header"""
+    byte_rate = frame_rate * channels * sample_width
+    block_align = channels * sample_width
+    return struct.pack(
+        '<4sI4s4sIHHIIHH4sI',
+        b'RIFF', data_size + 36, b'WAVE',
+        b'fmt ', 16, 1, channels, frame_rate, byte_rate, block_align, sample_width * 8,
+        b'data', data_size
+    )
+
+
+def read_pcm(path):
+    """
+    Read an audio chunk file as raw PCM
+
+    Returns:
+        tuple: (pcm_bytes, channels, sample_width, frame_rate)
+    """
+    if path.lower().endswith('.wav'):
+        with wave.open(path, 'rb') as wav_file:
+            return (wav_file.readframes(wav_file.getnframes()), wav_file.getnchannels(),
+                    wav_file.getsampwidth(), wav_file.getframerate())
+
+    # Compressed chunks (e.g. gTTS MP3) need pydub/ffmpeg to decode
+    from pydub import AudioSegment
+    segment = AudioSegment.from_file(path)
+    return segment.raw_data, segment.channels, segment.sample_width, segment.frame_rate
+
+
+def convert_pcm(pcm, source_params, target_params):
+    """Convert PCM between (channels, sample_width, frame_rate) layouts"""
+    if source_params == target_params:
+        return pcm
+    from pydub import AudioSegment
+    channels, sample_width, frame_rate = source_params
+    segment = AudioSegment(data=pcm, sample_width=sample_width, frame_rate=frame_rate, channels=channels)
+    segment = (segment.set_channels(target_params[0])
+               .set_sample_width(target_params[1])
+               .set_frame_rate(target_params[2]))
+    return segment.raw_data
+
+
+def write_wav(path, samples, sample_rate):
+    """Write a mono float waveform in [-1, 1] (NumPy array) as 16-bit PCM WAV"""
+    import numpy as np
+    pcm = (np.clip(samples, -1.0, 1.0) * 32767).astype('<i2')
+    with wave.open(path, 'wb') as wav_file:
+        wav_file.setnchannels(1)
+        wav_file.setsampwidth(2)
+        wav_file.setframerate(sample_rate)
+        wav_file.writeframes(pcm.tobytes())
+
+
+class AudioAssembler:
+    """
+    Incrementally writes chunk audio into a single output file
+
+    PCM from each chunk is handed to an encoder (see audio_encoder) chosen
+    by the output file's extension, so compressed formats are encoded while
+    synthesis is still running. The format of the first chunk is used for
+    the whole file. With a processor (audio_processing.PostProcessor), each
+    chunk is read whole and processed before it is encoded.
+    """
+    def __init__(self, output_path, bitrate=None, processor=None):
+        self.output_path = output_path
+        self.bitrate = bitrate
+        self.processor = processor
+        self.params = None  # (channels, sample_width, frame_rate)
+        self.data_bytes = 0
+        self.chunks = 0
+        self.last_audio = None  # (pcm, channels, sample_width, frame_rate) of the last processed chunk
+        self._encoder = None
+        self._closed = False
+
+    def _start(self, params):
+        from audio_encoder import open_encoder
+        self.params = params
+        self._encoder = open_encoder(self.output_path, params, self.bitrate)
+
+    def append(self, chunk_path):
+        """Append one chunk's audio; returns the number of PCM bytes written"""
+        written = 0
+        if self.processor is not None:
+            pcm, channels, sample_width, frame_rate = read_pcm(chunk_path)
+            params = (channels, sample_width, frame_rate)
+            if self.params is None:
+                self._start(params)
+            pcm = self.processor.process(convert_pcm(pcm, params, self.params), self.params)
+            self._encoder.write(pcm)
+            written = len(pcm)
+            self.last_audio = (pcm,) + self.params
+        elif chunk_path.lower().endswith('.wav'):
+            with wave.open(chunk_path, 'rb') as wav_file:
+                params = (wav_file.getnchannels(), wav_file.getsampwidth(), wav_file.getframerate())
+                if self.params is None:
+                    self._start(params)
+                while True:
+                    frames = wav_file.readframes(FRAMES_PER_BLOCK)
+                    if not frames:
+                        break
+                    frames = convert_pcm(frames, params, self.params)
+                    self._encoder.write(frames)
+                    written += len(frames)
+        else:
+            pcm, channels, sample_width, frame_rate = read_pcm(chunk_path)
+            params = (channels, sample_width, frame_rate)
+            if self.params is None:
+                self._start(params)
+            pcm = convert_pcm(pcm, params, self.params)
+            self._encoder.write(pcm)
+            written = len(pcm)
+
+        self.data_bytes += written
+        self.chunks += 1
+        return written
+
+    @property
+    def byte_offsets(self):
+        """'exact' or 'estimated' if byte_offset() can place audio in the output file, else None"""
+        return getattr(self._encoder, 'byte_offsets', None)
+
+    def byte_offset(self, pcm_offset):
+        """Byte position in the output file of the audio at a PCM offset, or None"""
+        if self._encoder is None:
+            return None
+        return self._encoder.byte_offset(pcm_offset)
+
+    def close(self):
+        """Finish encoding and close the output file"""
+        if self._closed:
+            return
+        self._closed = True
+        if self._encoder is not None:
+            self._encoder.close()
+
+    def abort(self):
+        """Stop encoding and delete a partially written file"""
+        self._closed = True
+        if self._encoder is not None:
+            self._encoder.abort()
+        try:
+            os.remove(self.output_path)
+        except OSError:
+            pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            try:
+                self.close()
+            except Exception:
+                self.abort()
+                raise
+        else:
+            self.abort()
+        return False
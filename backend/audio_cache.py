@@ -0,0 +1,159 @@
+"""
+Synthesis cache for the AI Accessibility Reader.
+Stores synthesized audio per text chunk on disk, keyed by a hash of the
+normalized text and the engine/voice settings, with LRU eviction.
+"""
+
+import os
+import re
+import json
+import shutil
+import hashlib
+import threading
+import logging
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+_whitespace_re = re.compile(r'\s+')
+
+
+def normalize_text(text):
+    """Collapse whitespace so trivially different chunks share an entry"""
+    return _whitespace_re.sub(' ', text).strip()
+
+
+def make_key(text, engine_type, settings):
+    """
+    Build a cache key for a chunk
+
+    Args:
+        text (str): Chunk text
+        engine_type (str): Name of the engine that synthesizes it
+        settings (dict): Model, voice, rate, volume and anything else that
+            changes the produced audio
+
+    Returns:
+        str: Hex digest identifying the audio
+    """
+    payload = json.dumps({
+        'text': normalize_text(text),
+        'engine': engine_type,
+        'settings': settings,
+    }, sort_keys=True)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class ChunkCache:
+    """Size-bounded on-disk LRU cache of chunk audio files"""
+    def __init__(self, directory, max_bytes):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = None  # OrderedDict of filename -> size, least recently used first
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+
+    def _load(self):
+        """Index existing entries, oldest access first (caller holds the lock)"""
+        if self._entries is not None:
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        files = []
+        for entry in os.scandir(self.directory):
+            if entry.is_file() and not entry.name.endswith('.tmp'):
+                stat = entry.stat()
+                files.append((stat.st_mtime, entry.name, stat.st_size))
+        files.sort()
+        self._entries = OrderedDict((name, size) for _, name, size in files)
+        self._total_bytes = sum(self._entries.values())
+        logger.info(f"Chunk cache loaded: {len(self._entries)} entries, {self._total_bytes} bytes")
+
+    @staticmethod
+    def _filename(key, extension):
+        return f"{key}{extension}"
+
+    def fetch(self, key, output_path):
+        """
+        Copy a cached chunk to output_path
+
+        Returns:
+            bool: True on a cache hit
+        """
+        name = self._filename(key, os.path.splitext(output_path)[1])
+        cached_path = os.path.join(self.directory, name)
+        with self._lock:
+            self._load()
+            if name not in self._entries:
+                self.misses += 1
+                return False
+            self._entries.move_to_end(name)
+            self.hits += 1
+        try:
+            shutil.copyfile(cached_path, output_path)
+            os.utime(cached_path)
+            return True
+        except OSError as e:
+            logger.warning(f"Chunk cache entry {name} unreadable: {e}")
+            with self._lock:
+                self._forget(name)
+                self.hits -= 1
+                self.misses += 1
+            return False
+
+    def store(self, key, source_path):
+        """Add a freshly synthesized chunk to the cache"""
+        name = self._filename(key, os.path.splitext(source_path)[1])
+        cached_path = os.path.join(self.directory, name)
+        size = os.path.getsize(source_path)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            self._load()
+            if name in self._entries:
+                self._entries.move_to_end(name)
+                return
+        try:
+            # Copy then rename so readers never see a partial file
+            temp_path = f"{cached_path}.{threading.get_ident()}.tmp"
+            shutil.copyfile(source_path, temp_path)
+            os.replace(temp_path, cached_path)
+        except OSError as e:
+            logger.warning(f"Failed to cache chunk {name}: {e}")
+            return
+        with self._lock:
+            if name not in self._entries:
+                self._entries[name] = size
+                self._total_bytes += size
+            self._evict()
+
+    def _forget(self, name):
+        size = self._entries.pop(name, None)
+        if size is not None:
+            self._total_bytes -= size
+
+    def _evict(self):
+        """Remove least recently used entries until under max_bytes (caller holds the lock)"""
+        while self._total_bytes > self.max_bytes and self._entries:
+            name, _ = next(iter(self._entries.items()))
+            self._forget(name)
+            self.evictions += 1
+            try:
+                os.remove(os.path.join(self.directory, name))
+            except OSError as e:
+                logger.warning(f"Failed to evict cached chunk {name}: {e}")
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 3) if lookups else 0.0,
+                'evictions': self.evictions,
+                'entries': len(self._entries) if self._entries is not None else 0,
+                'size_bytes': self._total_bytes,
+                'max_bytes': self.max_bytes,
+            }
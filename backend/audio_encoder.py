@@ -0,0 +1,244 @@
+"""
+Output encoders for the AI Accessibility Reader.
+Each encoder receives raw PCM blocks as chunks finish and writes the final
+file incrementally: WAV directly, compressed formats (MP3, Opus, FLAC)
+through an ffmpeg process fed on stdin.
+"""
+
+import os
+import re
+import shutil
+import struct
+import subprocess
+import logging
+from audio_assembly import wav_header, WAV_HEADER_SIZE
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BITRATE = {'mp3': '128k', 'opus': '48k'}  # Speech needs far less than music
+_BITRATE_RE = re.compile(r'^(\d{1,3})k$')
+MIN_BITRATE_KBPS = 8
+MAX_BITRATE_KBPS = 320
+
+
+class EncoderError(Exception):
+    """Raised when an output format is unsupported or encoding fails"""
+
+
+class WavEncoder:
+    """Writes PCM straight into a WAV file, patching the header on close()"""
+    extension = '.wav'
+    mimetype = 'audio/wav'
+    byte_offsets = 'exact'
+
+    def __init__(self, output_path, params, bitrate=None):
+        self.output_path = output_path
+        self.data_bytes = 0
+        self._file = open(output_path, 'wb')
+        self._file.write(wav_header(*params, data_size=0))
+
+    @staticmethod
+    def available():
+        return True
+
+    def write(self, pcm):
+        self._file.write(pcm)
+        self.data_bytes += len(pcm)
+
+    def byte_offset(self, pcm_offset):
+        """Position in the output file of the audio at a PCM offset"""
+        return WAV_HEADER_SIZE + pcm_offset
+
+    def close(self):
+        if self._file.closed:
+            return
+        self._file.seek(4)
+        self._file.write(struct.pack('<I', self.data_bytes + 36))
+        self._file.seek(40)
+        self._file.write(struct.pack('<I', self.data_bytes))
+        self._file.close()
+
+    def abort(self):
+        self._file.close()
+
+
+class FfmpegEncoder:
+    """Pipes PCM into ffmpeg, which encodes while synthesis continues"""
+    extension = None
+    mimetype = None
+    container = None
+    codec_args = []
+    uses_bitrate = True
+    byte_offsets = None  # Variable bitrate: positions are only known to the decoder
+
+    def __init__(self, output_path, params, bitrate=None):
+        channels, sample_width, frame_rate = params
+        if sample_width != 2:
+            raise EncoderError(f"Unsupported sample width for encoding: {sample_width}")
+        self.output_path = output_path
+        self.params = params
+        self.bitrate = bitrate
+        command = ['ffmpeg', '-hide_banner', '-loglevel', 'error', '-y',
+                   '-f', 's16le', '-ar', str(frame_rate), '-ac', str(channels), '-i', 'pipe:0']
+        command += self.codec_args
+        if self.uses_bitrate and bitrate:
+            command += ['-b:a', bitrate]
+        command += ['-f', self.container, output_path]
+        self._process = subprocess.Popen(command, stdin=subprocess.PIPE,
+                                         stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+
+    @staticmethod
+    def available():
+        return shutil.which('ffmpeg') is not None
+
+    def write(self, pcm):
+        try:
+            self._process.stdin.write(pcm)
+        except BrokenPipeError:
+            raise EncoderError(f"ffmpeg exited early: {self._error_output()}")
+
+    def byte_offset(self, pcm_offset):
+        return None
+
+    def _error_output(self):
+        self._process.wait()
+        return self._process.stderr.read().decode(errors='replace').strip()
+
+    def close(self):
+        if self._process.returncode is not None:
+            return
+        self._process.stdin.close()
+        if self._process.wait() != 0:
+            raise EncoderError(f"ffmpeg failed: {self._process.stderr.read().decode(errors='replace').strip()}")
+
+    def abort(self):
+        if self._process.returncode is None:
+            self._process.kill()
+            self._process.wait()
+
+
+class Mp3Encoder(FfmpegEncoder):
+    extension = '.mp3'
+    mimetype = 'audio/mpeg'
+    container = 'mp3'
+    codec_args = ['-c:a', 'libmp3lame']
+    byte_offsets = 'estimated'  # Constant bitrate, give or take the ID3 tag and one frame
+
+    def byte_offset(self, pcm_offset):
+        if not self.bitrate:
+            return None
+        channels, sample_width, frame_rate = self.params
+        seconds = pcm_offset / (channels * sample_width * frame_rate)
+        return int(seconds * int(self.bitrate.rstrip('k')) * 1000 / 8)
+
+
+class OpusEncoder(FfmpegEncoder):
+    extension = '.opus'
+    mimetype = 'audio/ogg'
+    container = 'ogg'
+    codec_args = ['-c:a', 'libopus', '-application', 'voip']
+
+
+class FlacEncoder(FfmpegEncoder):
+    extension = '.flac'
+    mimetype = 'audio/flac'
+    container = 'flac'
+    codec_args = ['-c:a', 'flac']
+    uses_bitrate = False  # Lossless
+
+
+# Output format name -> encoder class; register_encoder() adds more
+ENCODERS = {
+    'wav': WavEncoder,
+    'mp3': Mp3Encoder,
+    'opus': OpusEncoder,
+    'flac': FlacEncoder,
+}
+
+
+def register_encoder(name, encoder_class):
+    """Make an additional output format available"""
+    ENCODERS[name] = encoder_class
+
+
+def available_formats():
+    """Output formats that can be produced on this machine"""
+    return [name for name, encoder_class in ENCODERS.items() if encoder_class.available()]
+
+
+def format_for_path(path):
+    """Output format name implied by a file's extension, or None"""
+    extension = os.path.splitext(path)[1].lower()
+    for name, encoder_class in ENCODERS.items():
+        if encoder_class.extension == extension:
+            return name
+    return None
+
+
+def normalize_bitrate(output_format, bitrate):
+    """
+    Validate a bitrate such as "64k" for an output format
+
+    Returns:
+        str or None: Bitrate to encode with (None for formats without one)
+
+    Raises:
+        EncoderError: If the bitrate is malformed or out of range
+    """
+    encoder_class = ENCODERS[output_format]
+    if not getattr(encoder_class, 'uses_bitrate', False):
+        return None
+    if not bitrate:
+        return DEFAULT_BITRATE.get(output_format)
+    match = _BITRATE_RE.match(str(bitrate).lower())
+    if not match or not MIN_BITRATE_KBPS <= int(match.group(1)) <= MAX_BITRATE_KBPS:
+        raise EncoderError(f"Invalid bitrate '{bitrate}'; use e.g. 64k "
+                           f"({MIN_BITRATE_KBPS}k-{MAX_BITRATE_KBPS}k)")
+    return match.group(0)
+
+
+def open_encoder(output_path, params, bitrate=None):
+    """
+    Create the encoder for output_path's format
+
+    Args:
+        output_path (str): Destination file; its extension selects the format
+        params (tuple): (channels, sample_width, frame_rate) of the PCM to come
+        bitrate (str): Target bitrate for lossy formats, e.g. "64k"
+
+    Raises:
+        EncoderError: If the format is unknown or cannot be produced here
+    """
+    output_format = format_for_path(output_path)
+    if output_format is None:
+        raise EncoderError(f"Unsupported output format: {output_path}")
+    encoder_class = ENCODERS[output_format]
+    if not encoder_class.available():
+        raise EncoderError(f"Output format '{output_format}' needs ffmpeg, which is not installed")
+    return encoder_class(output_path, params, normalize_bitrate(output_format, bitrate))
+
+
+# Leading bytes of each container, for serving files with the right type
+_SIGNATURES = [
+    (b'RIFF', 'audio/wav'),
+    (b'ID3', 'audio/mpeg'),
+    (b'\xff\xfb', 'audio/mpeg'),
+    (b'\xff\xf3', 'audio/mpeg'),
+    (b'\xff\xf2', 'audio/mpeg'),
+    (b'OggS', 'audio/ogg'),
+    (b'fLaC', 'audio/flac'),
+]
+
+
+def detect_mimetype(path):
+    """MIME type of an audio file from its header bytes, falling back to its extension"""
+    try:
+        with open(path, 'rb') as audio_file:
+            head = audio_file.read(4)
+    except OSError:
+        head = b''
+    for signature, mimetype in _SIGNATURES:
+        if head.startswith(signature):
+            return mimetype
+    output_format = format_for_path(path)
+    return ENCODERS[output_format].mimetype if output_format else 'application/octet-stream'
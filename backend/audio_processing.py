@@ -0,0 +1,242 @@
+"""
+Audio post-processing for the AI Accessibility Reader.
+Works on each chunk's PCM as a NumPy array before it is encoded: trims
+the silence engines put around every chunk, evens out loudness between
+chunks and changes playback speed without changing pitch. Cached chunk
+audio stays untouched, so a new speed reuses the earlier synthesis.
+"""
+
+import importlib.util
+import logging
+
+logger = logging.getLogger(__name__)
+
+WINDOW_MS = 10  # Analysis window for silence detection and loudness
+SILENCE_THRESHOLD_DBFS = -45  # Windows quieter than this are silence
+SILENCE_PAD_MS = 100  # Silence kept at each edge, so sentences do not run together
+TARGET_LOUDNESS_DBFS = -20  # Mean level of the non-silent windows after normalization
+MAX_GAIN_DB = 12  # Quiet chunks are boosted at most this much (noise stays noise)
+PEAK_CEILING_DBFS = -1  # Gain never pushes a peak above this
+STRETCH_WINDOW_MS = 40  # Phase vocoder frame; a power of two in samples near this
+MIN_SPEED = 0.5
+MAX_SPEED = 3.0
+
+# Sample width -> (NumPy dtype, offset, scale) mapping PCM to [-1, 1)
+_FORMATS = {
+    1: ('u1', 128, 128.0),
+    2: ('<i2', 0, 32768.0),
+    4: ('<i4', 0, 2147483648.0),
+}
+
+
+def numpy_available():
+    return importlib.util.find_spec('numpy') is not None
+
+
+def normalize_speed(speed):
+    """
+    Validate a playback speed such as "1.25"
+
+    Returns:
+        float: Speed factor (1.0 when not given)
+
+    Raises:
+        ValueError: If the speed is malformed, out of range, or needs NumPy,
+            which is not installed
+    """
+    if speed is None or str(speed).strip() == '':
+        return 1.0
+    try:
+        value = round(float(speed), 2)
+    except (TypeError, ValueError):
+        raise ValueError(f"Invalid speed '{speed}'; use e.g. 1.25")
+    if not MIN_SPEED <= value <= MAX_SPEED:
+        raise ValueError(f"Speed must be between {MIN_SPEED} and {MAX_SPEED}")
+    if value != 1.0 and not numpy_available():
+        raise ValueError("Changing the speed needs NumPy, which is not installed")
+    return value
+
+
+def to_float(pcm, channels, sample_width):
+    """PCM bytes as a float32 array of shape (frames, channels) in [-1, 1)"""
+    import numpy as np
+    dtype, offset, scale = _FORMATS[sample_width]
+    samples = np.frombuffer(pcm, dtype=dtype).astype(np.float32)
+    if offset:
+        samples -= offset
+    samples /= scale
+    return samples.reshape(-1, channels)
+
+
+def to_pcm(samples, sample_width):
+    """Inverse of to_float, clipping anything out of range"""
+    import numpy as np
+    dtype, offset, scale = _FORMATS[sample_width]
+    limit = (scale - 1) / scale
+    scaled = np.clip(samples, -1.0, limit) * scale + offset
+    return np.rint(scaled).astype(dtype).tobytes()
+
+
+def window_power(samples, frame_rate, window_ms=WINDOW_MS):
+    """
+    Mean square of each window of samples (all channels together)
+
+    Returns:
+        tuple: (power per window, frames per window); the last window is
+        zero-padded
+    """
+    import numpy as np
+    window = max(1, int(frame_rate * window_ms / 1000))
+    windows = -(-len(samples) // window)
+    padded = np.zeros((windows * window, samples.shape[1]), dtype=np.float32)
+    padded[:len(samples)] = samples
+    power = np.square(padded).reshape(windows, -1).mean(axis=1)
+    return power, window
+
+
+def _dbfs_power(dbfs):
+    return 10 ** (dbfs / 10)
+
+
+def trim_silence(samples, frame_rate, threshold_dbfs=SILENCE_THRESHOLD_DBFS, pad_ms=SILENCE_PAD_MS):
+    """Cut leading and trailing silence, keeping pad_ms at each edge; an all-silent chunk becomes empty"""
+    import numpy as np
+    if len(samples) == 0:
+        return samples
+    power, window = window_power(samples, frame_rate)
+    loud = np.flatnonzero(power > _dbfs_power(threshold_dbfs))
+    if loud.size == 0:
+        return samples[:0]
+    pad = int(frame_rate * pad_ms / 1000)
+    start = max(0, loud[0] * window - pad)
+    end = min(len(samples), (loud[-1] + 1) * window + pad)
+    return samples[start:end]
+
+
+def normalize_loudness(samples, frame_rate, target_dbfs=TARGET_LOUDNESS_DBFS, max_gain_db=MAX_GAIN_DB,
+                       peak_ceiling_dbfs=PEAK_CEILING_DBFS, threshold_dbfs=SILENCE_THRESHOLD_DBFS):
+    """
+    Scale samples so their non-silent windows average target_dbfs
+
+    Silence is left out of the measurement, so pauses do not make speech
+    louder. The gain is limited to +/- max_gain_db and so that no peak
+    exceeds peak_ceiling_dbfs.
+    """
+    import numpy as np
+    if len(samples) == 0:
+        return samples
+    power, _ = window_power(samples, frame_rate)
+    active = power[power > _dbfs_power(threshold_dbfs)]
+    if active.size == 0:
+        return samples
+    loudness_db = 10 * np.log10(active.mean())
+    gain_db = np.clip(target_dbfs - loudness_db, -max_gain_db, max_gain_db)
+    gain = 10 ** (gain_db / 20)
+    peak = float(np.abs(samples).max())
+    if peak > 0:
+        gain = min(gain, 10 ** (peak_ceiling_dbfs / 20) / peak)
+    return samples * np.float32(gain)
+
+
+def _stretch_channel(signal, speed, n_fft, window):
+    """Phase vocoder over one channel; every frame is processed at once"""
+    import numpy as np
+    hop = n_fft // 4
+    length = len(signal)
+    # Pad so the first and last samples sit under full frames
+    padded = np.concatenate([np.zeros(n_fft, np.float32), signal, np.zeros(2 * n_fft, np.float32)])
+    frames_count = int((length + n_fft) / (hop * speed)) + 2
+    positions = np.rint(np.arange(frames_count) * hop * speed).astype(np.int64)
+    frames = padded[positions[:, None] + np.arange(n_fft)] * window
+    spectrum = np.fft.rfft(frames, axis=1)
+    magnitude = np.abs(spectrum)
+    phase = np.angle(spectrum)
+
+    # Each bin's true frequency from its phase advance between analysis frames,
+    # accumulated at the synthesis hop
+    omega = 2 * np.pi * np.arange(n_fft // 2 + 1) / n_fft
+    advance = np.diff(positions)[:, None]
+    deviation = phase[1:] - phase[:-1] - omega * advance
+    deviation = (deviation + np.pi) % (2 * np.pi) - np.pi
+    increments = (omega + deviation / advance) * hop
+    synthesis_phase = np.concatenate([phase[:1], phase[:1] + np.cumsum(increments, axis=0)])
+    output_frames = np.fft.irfft(magnitude * np.exp(1j * synthesis_phase), n=n_fft, axis=1) * window
+
+    # Overlap-add: frames overlap 4x, so add each quarter as one contiguous run
+    output = np.zeros((frames_count + 3) * hop)
+    norm = np.zeros_like(output)
+    window_square = np.square(window)
+    for quarter in range(4):
+        section = slice(quarter * hop, (quarter + 1) * hop)
+        run = slice(quarter * hop, quarter * hop + frames_count * hop)
+        output[run] += output_frames[:, section].reshape(-1)
+        norm[run] += np.tile(window_square[section], frames_count)
+    output /= np.maximum(norm, 1e-3)
+    start = int(round(n_fft / speed))
+    return output[start:start + int(round(length / speed))].astype(np.float32)
+
+
+def time_stretch(samples, frame_rate, speed, window_ms=STRETCH_WINDOW_MS):
+    """Play samples speed times faster without changing pitch"""
+    import numpy as np
+    if speed == 1.0 or len(samples) == 0:
+        return samples
+    n_fft = 1 << max(8, int(round(np.log2(frame_rate * window_ms / 1000))))
+    window = np.hanning(n_fft + 1)[:-1].astype(np.float32)  # Periodic Hann
+    channels = [_stretch_channel(samples[:, channel], speed, n_fft, window)
+                for channel in range(samples.shape[1])]
+    return np.stack(channels, axis=1)
+
+
+class PostProcessor:
+    """
+    Post-processing applied to every chunk of one conversion
+
+    Args:
+        trim (bool): Trim leading and trailing silence
+        normalize (bool): Normalize loudness per chunk
+        speed (float): Playback speed factor (1.0 keeps the engine's rate)
+    """
+    def __init__(self, trim=True, normalize=True, speed=1.0):
+        self.trim = trim
+        self.normalize = normalize
+        self.speed = speed
+        self.frames_in = 0
+        self.frames_out = 0
+        self.trimmed_frames = 0
+        self._warned = False
+
+    @property
+    def active(self):
+        return self.trim or self.normalize or self.speed != 1.0
+
+    def process(self, pcm, params):
+        """
+        Process one chunk's PCM
+
+        Args:
+            pcm (bytes): Raw PCM
+            params (tuple): (channels, sample_width, frame_rate) of pcm
+
+        Returns:
+            bytes: Processed PCM in the same layout
+        """
+        channels, sample_width, frame_rate = params
+        if sample_width not in _FORMATS:
+            if not self._warned:
+                logger.warning(f"Skipping post-processing of {sample_width * 8}-bit audio")
+                self._warned = True
+            return pcm
+        samples = to_float(pcm, channels, sample_width)
+        self.frames_in += len(samples)
+        if self.trim:
+            trimmed = trim_silence(samples, frame_rate)
+            self.trimmed_frames += len(samples) - len(trimmed)
+            samples = trimmed
+        if self.speed != 1.0:
+            samples = time_stretch(samples, frame_rate, self.speed)
+        # Last, so the level reached is the level heard
+        if self.normalize:
+            samples = normalize_loudness(samples, frame_rate)
+        self.frames_out += len(samples)
+        return to_pcm(samples, sample_width)
@@ -0,0 +1,189 @@
+"""
+Progressive audio streaming for the AI Accessibility Reader.
+Collects PCM from each synthesized chunk as it is produced and serves it
+as a growing WAV stream, so playback can start before synthesis ends.
+"""
+
+import os
+import threading
+import time
+import logging
+from audio_assembly import wav_header, read_pcm, convert_pcm
+
+logger = logging.getLogger(__name__)
+
+# Size advertised in the WAV header of a stream whose final length is unknown
+STREAMING_DATA_SIZE = 0xFFFFFFFF - 36
+READ_BLOCK_SIZE = 64 * 1024
+
+
+class AudioStream:
+    """A PCM file that grows as chunks are synthesized"""
+    def __init__(self, stream_id, directory):
+        self.id = stream_id
+        self.pcm_path = os.path.join(directory, f"{stream_id}.pcm")
+        self.params = None  # (channels, sample_width, frame_rate) of the first chunk
+        self.bytes_written = 0
+        self.finished = False
+        self.error = None
+        self.finished_at = None
+        self.removed = False
+        self._cond = threading.Condition()
+        open(self.pcm_path, 'wb').close()
+
+    def add_segment(self, index, path, audio=None):
+        """Segment callback handed to the TTS engine; audio is the chunk's processed PCM, if any"""
+        try:
+            pcm, channels, sample_width, frame_rate = audio if audio is not None else read_pcm(path)
+        except Exception as e:
+            # A broken stream must never fail the conversion itself
+            logger.warning(f"Stream {self.id}: could not read chunk {index}: {e}")
+            return
+
+        if self.params is None:
+            self.params = (channels, sample_width, frame_rate)
+        else:
+            # Engines are consistent per document, but resample defensively
+            pcm = convert_pcm(pcm, (channels, sample_width, frame_rate), self.params)
+
+        with open(self.pcm_path, 'ab') as pcm_file:
+            pcm_file.write(pcm)
+
+        with self._cond:
+            self.bytes_written += len(pcm)
+            self._cond.notify_all()
+        logger.debug(f"Stream {self.id}: chunk {index} appended ({len(pcm)} bytes)")
+
+    def finish(self, error=None):
+        with self._cond:
+            self.finished = True
+            self.error = error
+            self.finished_at = time.time()
+            self._cond.notify_all()
+
+    def wait_until_ready(self, timeout=None):
+        """Block until the first chunk arrives or the stream ends"""
+        with self._cond:
+            self._cond.wait_for(lambda: self.params is not None or self.finished, timeout=timeout)
+            return self.params is not None
+
+    def open_wav(self):
+        """
+        Open the stream for reading
+
+        Returns:
+            generator or None: WAV header followed by PCM data as it becomes
+            available; None if no chunk has arrived or the data was removed
+        """
+        with self._cond:
+            if self.params is None or self.removed:
+                return None
+            # Opened under the lock, so removal cannot slip in between; an
+            # open file stays readable after it is unlinked
+            pcm_file = open(self.pcm_path, 'rb')
+        return self._iter_wav(pcm_file)
+
+    def _iter_wav(self, pcm_file):
+        yield wav_header(*self.params, data_size=STREAMING_DATA_SIZE)
+
+        offset = 0
+        with pcm_file:
+            while True:
+                with self._cond:
+                    self._cond.wait_for(lambda: self.bytes_written > offset or self.finished)
+                    available = self.bytes_written - offset
+                    if available == 0 and self.finished:
+                        return
+
+                while available > 0:
+                    data = pcm_file.read(min(available, READ_BLOCK_SIZE))
+                    if not data:
+                        break
+                    offset += len(data)
+                    available -= len(data)
+                    yield data
+
+    def remove(self):
+        """Delete the PCM data; readers already streaming keep their open file"""
+        with self._cond:
+            if self.removed:
+                return
+            self.removed = True
+        try:
+            os.remove(self.pcm_path)
+        except OSError as e:
+            # Still open elsewhere on some platforms; the startup sweep retries
+            logger.warning(f"Failed to remove stream data {self.pcm_path}: {e}")
+
+
+class StreamRegistry:
+    """Tracks in-progress audio streams by id"""
+    def __init__(self, directory, stream_ttl=3600):
+        self.directory = directory
+        self.stream_ttl = stream_ttl
+        self._streams = {}
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+        # Streams of conversions interrupted by a restart are not in the registry
+        self.sweep()
+
+    def create(self, stream_id):
+        with self._lock:
+            self._prune()
+            stream = AudioStream(stream_id, self.directory)
+            self._streams[stream_id] = stream
+            return stream
+
+    def get(self, stream_id):
+        with self._lock:
+            return self._streams.get(stream_id)
+
+    def discard(self, stream_id):
+        """Close a stream and delete its data, e.g. once the final audio file exists"""
+        with self._lock:
+            stream = self._streams.pop(stream_id, None)
+        if stream:
+            stream.finish()
+            stream.remove()
+
+    def _prune(self):
+        """Drop finished streams older than stream_ttl (caller holds the lock)"""
+        cutoff = time.time() - self.stream_ttl
+        expired = [stream for stream in self._streams.values()
+                   if stream.finished and stream.finished_at < cutoff]
+        for stream in expired:
+            del self._streams[stream.id]
+            stream.remove()
+
+    def sweep(self):
+        """
+        Delete stream data not written to for stream_ttl and not registered
+
+        Live streams are appended to after every chunk, so only abandoned
+        files (or ones other workers sharing the directory stopped writing
+        long ago) are old enough.
+
+        Returns:
+            int: Number of files removed
+        """
+        cutoff = time.time() - self.stream_ttl
+        removed = 0
+        with self._lock:
+            registered = {stream.pcm_path for stream in self._streams.values()}
+        try:
+            entries = list(os.scandir(self.directory))
+        except OSError as e:
+            logger.warning(f"Failed to list stream data in {self.directory}: {e}")
+            return 0
+        for entry in entries:
+            if not entry.name.endswith('.pcm') or entry.path in registered:
+                continue
+            try:
+                if entry.stat().st_mtime < cutoff:
+                    os.remove(entry.path)
+                    removed += 1
+            except OSError as e:
+                logger.warning(f"Failed to remove stream data {entry.path}: {e}")
+        if removed:
+            logger.info(f"Removed {removed} abandoned stream file(s) from {self.directory}")
+        return removed
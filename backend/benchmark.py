@@ -0,0 +1,513 @@
+"""
+Offline benchmark suite for the AI Accessibility Reader.
+Measures text extraction, sentence splitting, audio assembly, audio
+post-processing and end-to-end upload latency on CPU, using a deterministic stub TTS engine so
+results reflect pipeline overhead rather than model cost. Results are
+written as JSON and can be compared against a previous run.
+
+Usage:
+    python benchmark.py                                  # all suites
+    python benchmark.py --suites splitter,assembly --output results.json
+    python benchmark.py --compare baseline.json          # flag regressions
+"""
+
+import os
+import io
+import sys
+import json
+import math
+import time
+import wave
+import random
+import shutil
+import hashlib
+import platform
+import argparse
+import tempfile
+import subprocess
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BACKEND_DIR)
+sys.path.insert(0, BACKEND_DIR)
+
+SUITES = ('extraction', 'splitter', 'assembly', 'postprocess', 'upload')
+SEED = 1205
+TXT_SIZES = (10 * 1024, 100 * 1024, 1024 * 1024, 8 * 1024 * 1024)  # Bytes
+PDF_PAGES = (10, 100, 400)
+DOCX_PARAGRAPHS = (100, 1000, 5000)
+SPLITTER_SIZES = (100 * 1024, 1024 * 1024, 8 * 1024 * 1024)  # Characters
+SPLITTER_MAX_CHARS = (500, 1000, 5000)
+ASSEMBLY_CHUNKS = (10, 100, 1000)
+POSTPROCESS_SPEEDS = (1.0, 0.75, 1.5, 2.0)
+POSTPROCESS_CHUNK_CHARS = 1000
+STUB_SAMPLE_RATE = 16000
+STUB_SECONDS_PER_CHAR = 0.06  # Roughly conversational speech
+REGRESSION_THRESHOLD = 0.10  # Relative change flagged by --compare
+
+_WORDS = ("the reader converts documents into speech so that every page can be heard "
+          "accessibility matters for people with low vision dyslexia or fatigue and "
+          "long texts such as books papers and manuals benefit from natural pacing").split()
+
+
+def generate_text(size, seed=SEED):
+    """Deterministic English-like text of roughly size characters, with abbreviations and numbers"""
+    rng = random.Random(seed)
+    parts = []
+    length = 0
+    while length < size:
+        words = [rng.choice(_WORDS) for _ in range(rng.randint(6, 24))]
+        if rng.random() < 0.1:
+            words.insert(rng.randint(0, len(words)), rng.choice(['e.g.', 'Dr.', 'approx.', '3.14', 'U.S.']))
+        sentence = ' '.join(words).capitalize() + rng.choice(['.', '.', '.', '?', '!'])
+        if rng.random() < 0.15:
+            sentence += '\n\n'
+        parts.append(sentence)
+        length += len(sentence) + 1
+    return ' '.join(parts)[:size]
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of a list of numbers"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = min(len(ordered), max(1, math.ceil(pct / 100.0 * len(ordered))))
+    return ordered[rank - 1]
+
+
+def summarize(samples):
+    """Summary statistics (seconds) of repeated timings"""
+    return {
+        'runs': len(samples),
+        'min': min(samples),
+        'mean': sum(samples) / len(samples),
+        'p50': percentile(samples, 50),
+        'p99': percentile(samples, 99),
+    }
+
+
+def time_runs(func, repeat):
+    """Run func repeat times; returns (timings, last result)"""
+    timings = []
+    result = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func()
+        timings.append(time.perf_counter() - started)
+    return timings, result
+
+
+# ---------------------------------------------------------------- corpus
+
+def _pdf_escape(line):
+    return line.replace('\\', '\\\\').replace('(', '\\(').replace(')', '\\)')
+
+
+def write_pdf(path, pages, lines_per_page=40, chars_per_line=90):
+    """Write a minimal text PDF (Helvetica, one content stream per page)"""
+    objects = [b'<< /Type /Catalog /Pages 2 0 R >>', None,
+               b'<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>']
+    page_ids = []
+    for page_number in range(pages):
+        text = generate_text(lines_per_page * chars_per_line, seed=SEED + page_number)
+        lines = [text[i:i + chars_per_line] for i in range(0, len(text), chars_per_line)]
+        stream = ['BT /F1 10 Tf 40 800 Td 12 TL']
+        stream += [f'({_pdf_escape(line)}) Tj T*' for line in lines]
+        stream.append('ET')
+        content = '\n'.join(stream).encode('latin-1')
+        objects.append(b'<< /Length %d >>\nstream\n' % len(content) + content + b'\nendstream')
+        content_id = len(objects)
+        objects.append(b'<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] '
+                       b'/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>' % content_id)
+        page_ids.append(len(objects))
+    kids = ' '.join(f'{page_id} 0 R' for page_id in page_ids).encode()
+    objects[1] = b'<< /Type /Pages /Kids [' + kids + b'] /Count %d >>' % pages
+
+    with open(path, 'wb') as pdf:
+        pdf.write(b'%PDF-1.4\n')
+        offsets = []
+        for number, body in enumerate(objects, start=1):
+            offsets.append(pdf.tell())
+            pdf.write(b'%d 0 obj\n' % number + body + b'\nendobj\n')
+        xref = pdf.tell()
+        pdf.write(b'xref\n0 %d\n0000000000 65535 f \n' % (len(objects) + 1))
+        for offset in offsets:
+            pdf.write(b'%010d 00000 n \n' % offset)
+        pdf.write(b'trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n' % (len(objects) + 1, xref))
+
+
+def write_docx(path, paragraphs):
+    import docx
+    document = docx.Document()
+    for i in range(paragraphs):
+        document.add_paragraph(generate_text(400, seed=SEED + i))
+    document.save(path)
+
+
+def build_corpus(directory):
+    """
+    Generate documents of increasing size, plus copies of the sample files
+
+    Returns:
+        list: (name, path) pairs
+    """
+    corpus = []
+    for size in TXT_SIZES:
+        path = os.path.join(directory, f"generated_{size // 1024}k.txt")
+        with open(path, 'w', encoding='utf-8') as txt:
+            txt.write(generate_text(size))
+        corpus.append((os.path.basename(path), path))
+    for pages in PDF_PAGES:
+        path = os.path.join(directory, f"generated_{pages}p.pdf")
+        write_pdf(path, pages)
+        corpus.append((os.path.basename(path), path))
+    try:
+        for paragraphs in DOCX_PARAGRAPHS:
+            path = os.path.join(directory, f"generated_{paragraphs}para.docx")
+            write_docx(path, paragraphs)
+            corpus.append((os.path.basename(path), path))
+    except ImportError:
+        pass
+
+    # Real documents shipped with the repo (copied, since uploads/ is swept)
+    seen = set()
+    for folder in (os.path.join(REPO_DIR, 'documents'), os.path.join(BACKEND_DIR, 'uploads')):
+        if not os.path.isdir(folder):
+            continue
+        for name in sorted(os.listdir(folder)):
+            source = os.path.join(folder, name)
+            if not os.path.isfile(source) or not name.lower().endswith(('.txt', '.pdf', '.docx')):
+                continue
+            with open(source, 'rb') as f:
+                digest = hashlib.sha256(f.read()).hexdigest()
+            if digest in seen:
+                continue
+            seen.add(digest)
+            path = os.path.join(directory, f"sample_{name}")
+            shutil.copyfile(source, path)
+            corpus.append((f"sample_{name}", path))
+    return corpus
+
+
+# ---------------------------------------------------------------- stub engine
+
+def make_stub_engine(seconds_per_char=STUB_SECONDS_PER_CHAR, latency_per_char=0.0):
+    """A TTS engine that writes deterministic PCM proportional to chunk length"""
+    import tts_engine
+
+    class StubEngine(tts_engine.TTSEngine):
+        name = 'stub'
+        max_chars = 500
+
+        def initialize(self):
+            self.initialized = True
+            return True
+
+        def _synthesize_chunk(self, chunk, output_path):
+            if latency_per_char:
+                time.sleep(latency_per_char * len(chunk))
+            frames = int(len(chunk) * seconds_per_char * STUB_SAMPLE_RATE)
+            # A fixed square wave, so every run produces identical audio
+            period = b'\x00\x10' * 20 + b'\x00\xf0' * 20
+            pcm = (period * (frames // 40 + 1))[:frames * 2]
+            with wave.open(output_path, 'wb') as wav_file:
+                wav_file.setnchannels(1)
+                wav_file.setsampwidth(2)
+                wav_file.setframerate(STUB_SAMPLE_RATE)
+                wav_file.writeframes(pcm)
+
+    engine = StubEngine()
+    engine.initialize()
+    return engine
+
+
+def install_stub_engine(engine, cache_dir, max_concurrency=4):
+    """Register engine's class as the default TTS engine, with an empty chunk cache"""
+    import tts_engine
+    from audio_cache import ChunkCache
+
+    tts_engine.chunk_cache = ChunkCache(cache_dir, tts_engine.CHUNK_CACHE_MAX_BYTES)
+    tts_engine.registry.register(type(engine), max_concurrency=max_concurrency)
+    tts_engine.registry.warm_up(engine.name)
+    tts_engine.registry.default = engine.name
+    tts_engine.current_engine_type = engine.name
+    tts_engine.engine_state = tts_engine.ENGINE_READY
+    # app's background warm-up must not load real engines next to the stub
+    tts_engine.WARM_SPILLOVER_ENGINES = False
+
+
+# ---------------------------------------------------------------- suites
+
+def bench_extraction(workdir, corpus, repeat):
+    import text_processor
+
+    results = []
+    for name, path in corpus:
+        timings, text = time_runs(lambda: text_processor.extract_text(path), repeat)
+        stats = summarize(timings)
+        results.append({
+            'file': name,
+            'bytes': os.path.getsize(path),
+            'characters_extracted': len(text),
+            'seconds': stats,
+            'mb_per_second': os.path.getsize(path) / stats['p50'] / 1e6,
+        })
+    return results
+
+
+def bench_splitter(workdir, corpus, repeat):
+    import segmenter
+
+    results = []
+    for size in SPLITTER_SIZES:
+        text = generate_text(size)
+        for max_chars in SPLITTER_MAX_CHARS:
+            timings, chunks = time_runs(lambda: segmenter.split_text(text, max_chars), repeat)
+            stats = summarize(timings)
+            results.append({
+                'characters': len(text),
+                'max_chars': max_chars,
+                'chunks_produced': len(chunks),
+                'seconds': stats,
+                'mchars_per_second': len(text) / stats['p50'] / 1e6,
+            })
+    return results
+
+
+def bench_assembly(workdir, corpus, repeat):
+    from audio_assembly import AudioAssembler
+    from audio_encoder import available_formats
+
+    engine = make_stub_engine()
+    chunk_dir = os.path.join(workdir, 'assembly_chunks')
+    os.makedirs(chunk_dir, exist_ok=True)
+    sentences = [generate_text(300, seed=SEED + i) for i in range(max(ASSEMBLY_CHUNKS))]
+    chunk_paths = []
+    for i, sentence in enumerate(sentences):
+        path = os.path.join(chunk_dir, f"chunk_{i}.wav")
+        engine._synthesize_chunk(sentence, path)
+        chunk_paths.append(path)
+
+    results = []
+    for output_format in [name for name in ('wav', 'mp3', 'opus') if name in available_formats()]:
+        output_path = os.path.join(workdir, f"assembled.{output_format}")
+        for count in ASSEMBLY_CHUNKS:
+            def assemble():
+                with AudioAssembler(output_path) as assembler:
+                    for path in chunk_paths[:count]:
+                        assembler.append(path)
+                return assembler.data_bytes
+            timings, pcm_bytes = time_runs(assemble, repeat)
+            audio_seconds = pcm_bytes / (2 * STUB_SAMPLE_RATE)
+            stats = summarize(timings)
+            results.append({
+                'format': output_format,
+                'chunks': count,
+                'audio_seconds': audio_seconds,
+                'seconds': stats,
+                'audio_seconds_per_second': audio_seconds / stats['p50'],
+            })
+    return results
+
+
+def bench_postprocess(workdir, corpus, repeat):
+    from audio_assembly import read_pcm
+    from audio_processing import PostProcessor
+
+    engine = make_stub_engine()
+    chunk_path = os.path.join(workdir, 'postprocess_chunk.wav')
+    engine._synthesize_chunk(generate_text(POSTPROCESS_CHUNK_CHARS), chunk_path)
+    pcm, channels, sample_width, frame_rate = read_pcm(chunk_path)
+    params = (channels, sample_width, frame_rate)
+    audio_seconds = len(pcm) / (channels * sample_width * frame_rate)
+
+    results = []
+    for speed in POSTPROCESS_SPEEDS:
+        processor = PostProcessor(speed=speed)
+        timings, _ = time_runs(lambda: processor.process(pcm, params), repeat)
+        stats = summarize(timings)
+        results.append({
+            'speed': speed,
+            'audio_seconds': audio_seconds,
+            'seconds': stats,
+            'audio_seconds_per_second': audio_seconds / stats['p50'],
+        })
+    return results
+
+
+def bench_upload(workdir, corpus, repeat, requests=40, concurrency=4, document_chars=20000,
+                 output_format='wav', latency_per_char=0.0):
+    """End-to-end: POST /api/upload until the job completes, under concurrent load"""
+    app_dir = os.path.join(workdir, 'app')
+    os.makedirs(app_dir, exist_ok=True)
+    # app.py creates its folders relative to the working directory on import
+    previous_dir = os.getcwd()
+    os.chdir(app_dir)
+    try:
+        # Installed before app is imported, so its warm-up finds the engine ready
+        install_stub_engine(make_stub_engine(latency_per_char=latency_per_char),
+                            os.path.join(app_dir, 'chunk_cache'), max_concurrency=concurrency)
+        import app as app_module
+
+        base_text = generate_text(document_chars)
+        lock = threading.Lock()
+        upload_latencies = []
+        completion_latencies = []
+        statuses = {}
+
+        def upload(i):
+            client = app_module.app.test_client()
+            # A unique first line defeats deduplication, so every request is converted
+            body = f"Document number {i}.\n{base_text}".encode('utf-8')
+            started = time.perf_counter()
+            response = client.post('/api/upload', content_type='multipart/form-data', data={
+                'file': (io.BytesIO(body), f"bench_{i}.txt"),
+                'format': output_format,
+            })
+            uploaded = time.perf_counter()
+            completed = None
+            if response.status_code == 202:
+                job = app_module.job_queue.get(response.get_json()['job_id'])
+                job.wait()
+                completed = time.perf_counter()
+                status = job.state
+            else:
+                status = str(response.status_code)
+            with lock:
+                statuses[status] = statuses.get(status, 0) + 1
+                upload_latencies.append(uploaded - started)
+                if completed is not None and status == 'completed':
+                    completion_latencies.append(completed - started)
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            list(executor.map(upload, range(requests)))
+        elapsed = time.perf_counter() - started
+    finally:
+        os.chdir(previous_dir)
+
+    return [{
+        'requests': requests,
+        'concurrency': concurrency,
+        'document_characters': len(base_text),
+        'output_format': output_format,
+        'outcomes': statuses,
+        'upload_seconds': summarize(upload_latencies),
+        'completion_seconds': summarize(completion_latencies) if completion_latencies else None,
+        'documents_per_second': len(completion_latencies) / elapsed,
+        'wall_seconds': elapsed,
+    }]
+
+
+# ---------------------------------------------------------------- reporting
+
+def environment():
+    try:
+        commit = subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=REPO_DIR, capture_output=True,
+                                text=True, timeout=10).stdout.strip() or None
+    except Exception:
+        commit = None
+    return {
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        'commit': commit,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'processor': platform.processor(),
+        'cpu_count': os.cpu_count(),
+    }
+
+
+def _flatten(results, prefix=''):
+    """Map 'suite/case/metric' to p50 seconds, for comparing runs"""
+    flat = {}
+    for suite, cases in results.items():
+        if not isinstance(cases, list):
+            continue
+        for case in cases:
+            identity = ','.join(f"{key}={case[key]}" for key in
+                                ('file', 'characters', 'max_chars', 'format', 'chunks', 'concurrency')
+                                if key in case)
+            for metric in ('seconds', 'upload_seconds', 'completion_seconds'):
+                if isinstance(case.get(metric), dict):
+                    flat[f"{suite}/{identity}/{metric}"] = case[metric]['p50']
+    return flat
+
+
+def compare(current, baseline, threshold=REGRESSION_THRESHOLD):
+    """Print p50 changes against a baseline run; returns the number of regressions"""
+    now = _flatten(current['results'])
+    before = _flatten(baseline['results'])
+    regressions = 0
+    for key in sorted(now):
+        if key not in before or not before[key]:
+            continue
+        change = (now[key] - before[key]) / before[key]
+        flag = ''
+        if change > threshold:
+            flag = '  REGRESSION'
+            regressions += 1
+        elif change < -threshold:
+            flag = '  improved'
+        print(f"{key:<90} {before[key]:10.4f}s -> {now[key]:10.4f}s  {change:+7.1%}{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--suites', default=','.join(SUITES), help=f"Comma-separated subset of {', '.join(SUITES)}")
+    parser.add_argument('--repeat', type=int, default=5, help="Timed runs per case")
+    parser.add_argument('--requests', type=int, default=40, help="Uploads in the end-to-end suite")
+    parser.add_argument('--concurrency', type=int, default=4, help="Concurrent uploads")
+    parser.add_argument('--format', default='wav', help="Output format requested by uploads")
+    parser.add_argument('--stub-latency', type=float, default=0.0,
+                        help="Seconds of simulated synthesis per character in the stub engine")
+    parser.add_argument('--output', default=None, help="JSON results file (default: benchmark_<time>.json)")
+    parser.add_argument('--compare', default=None, help="Baseline JSON to compare p50 timings against")
+    parser.add_argument('--keep', action='store_true', help="Keep the generated corpus and outputs")
+    args = parser.parse_args()
+
+    suites = [suite.strip() for suite in args.suites.split(',') if suite.strip()]
+    unknown = set(suites) - set(SUITES)
+    if unknown:
+        parser.error(f"Unknown suites: {', '.join(sorted(unknown))}")
+
+    workdir = tempfile.mkdtemp(prefix='reader-benchmark-')
+    report = {'environment': environment(), 'settings': vars(args), 'results': {}}
+    try:
+        corpus = build_corpus(workdir) if 'extraction' in suites else []
+        runners = {
+            'extraction': lambda: bench_extraction(workdir, corpus, args.repeat),
+            'splitter': lambda: bench_splitter(workdir, corpus, args.repeat),
+            'assembly': lambda: bench_assembly(workdir, corpus, args.repeat),
+            'postprocess': lambda: bench_postprocess(workdir, corpus, args.repeat),
+            'upload': lambda: bench_upload(workdir, corpus, args.repeat, args.requests, args.concurrency,
+                                           output_format=args.format, latency_per_char=args.stub_latency),
+        }
+        for suite in suites:
+            print(f"Running {suite} benchmarks...")
+            try:
+                report['results'][suite] = runners[suite]()
+            except ImportError as e:
+                # Suites whose dependencies are not installed are recorded, not fatal
+                report['results'][suite] = {'skipped': f"missing dependency: {e.name or e}"}
+                print(f"  skipped: {report['results'][suite]['skipped']}")
+    finally:
+        if not args.keep:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    output = args.output or f"benchmark_{time.strftime('%Y%m%d_%H%M%S')}.json"
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {output}")
+
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            baseline = json.load(f)
+        if compare(report, baseline):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
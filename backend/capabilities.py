@@ -0,0 +1,111 @@
+"""
+Engine capability registry for the AI Accessibility Reader.
+Tracks which TTS engines are installed and whether the network is
+reachable. Results are cached and refreshed on a background thread, so
+health checks never wait on imports or network probes.
+"""
+
+import time
+import socket
+import threading
+import importlib.util
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Engines the registry knows about: (name, module to look for, needs network, label)
+KNOWN_ENGINES = [
+    ("pyttsx3", "pyttsx3", False, "pyttsx3 (offline)"),
+    ("gTTS", "gtts", True, "gTTS (online)"),
+    ("Coqui", "TTS", False, "Coqui TTS (offline)"),
+]
+
+
+class CapabilityRegistry:
+    """Cached, TTL-refreshed view of installed engines and connectivity"""
+    def __init__(self, ttl=60, probe_host=("translate.google.com", 443), probe_timeout=3):
+        self.ttl = ttl
+        self.probe_host = probe_host
+        self.probe_timeout = probe_timeout
+        self.installed = None  # name -> bool
+        self.online = None  # None until the first probe completes
+        self.checked_at = None
+        self._lock = threading.Lock()
+        self._refresher = None
+
+    def _check_installed(self):
+        # find_spec locates a module without importing it (Coqui pulls in torch)
+        return {name: importlib.util.find_spec(module) is not None
+                for name, module, _, _ in KNOWN_ENGINES}
+
+    def probe_network(self):
+        """Check connectivity with a single TCP connect"""
+        try:
+            with socket.create_connection(self.probe_host, timeout=self.probe_timeout):
+                return True
+        except OSError:
+            return False
+
+    def refresh(self):
+        installed = self._check_installed()
+        online = self.probe_network()
+        with self._lock:
+            self.installed = installed
+            self.online = online
+            self.checked_at = time.time()
+        logger.debug(f"Engine capabilities refreshed: installed={installed}, online={online}")
+
+    def _refresh_loop(self):
+        while True:
+            try:
+                self.refresh()
+            except Exception as e:
+                logger.warning(f"Capability refresh failed: {e}")
+            time.sleep(self.ttl)
+
+    def start(self):
+        """Start the background refresher (idempotent)"""
+        with self._lock:
+            # A refresher started before a fork (gunicorn --preload) is not
+            # running in the child, so check liveness rather than presence
+            if self._refresher is not None and self._refresher.is_alive():
+                return
+            self._refresher = threading.Thread(target=self._refresh_loop, name="capability-refresh", daemon=True)
+            self._refresher.start()
+
+    def is_online(self, wait=False):
+        """
+        Cached connectivity state
+
+        Args:
+            wait (bool): Probe synchronously if no result is cached yet;
+                only for callers off the request path
+
+        Returns:
+            bool or None: None if unknown
+        """
+        self.start()
+        if self.online is None and wait:
+            self.refresh()
+        return self.online
+
+    def available_engines(self):
+        """Labels of engines that can currently be used, from cached state"""
+        self.start()
+        with self._lock:
+            installed = self.installed
+            online = self.online
+        if installed is None:
+            # First call before the refresher finished; module lookup is cheap
+            installed = self._check_installed()
+        return [label for name, _, needs_network, label in KNOWN_ENGINES
+                if installed.get(name) and (online or not needs_network)]
+
+    def stats(self):
+        with self._lock:
+            return {
+                'installed': self.installed,
+                'online': self.online,
+                'checked_at': self.checked_at,
+                'ttl': self.ttl,
+            }
@@ -0,0 +1,161 @@
+"""
+Conversion checkpoints for the AI Accessibility Reader.
+Keeps the chunk audio of a conversion in a durable directory, with a
+journal of the chunks already completed, so a failed or interrupted
+conversion of the same document resumes from the first missing chunk.
+"""
+
+import os
+import json
+import shutil
+import hashlib
+import threading
+import logging
+
+logger = logging.getLogger(__name__)
+
+JOURNAL_NAME = 'journal.jsonl'
+
+
+def chunk_digest(chunk):
+    return hashlib.sha256(chunk.encode('utf-8')).hexdigest()
+
+
+def checkpoint_id(key, header):
+    """Directory name for a conversion of key with the engine settings in header"""
+    payload = json.dumps({'key': key, 'header': header}, sort_keys=True)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class Checkpoint:
+    """
+    Durable chunk directory and journal of one conversion
+
+    The journal's first line describes the conversion (engine, settings,
+    chunk format); each further line records one chunk whose audio is
+    complete, by index and text digest. Lines are fsynced as they are
+    written, so after a crash every journaled chunk is on disk, and a
+    torn last line is simply ignored.
+    """
+    def __init__(self, directory, header):
+        self.directory = directory
+        self.header = header
+        self.completed = {}  # index -> text digest of chunks done in earlier attempts
+        self.restored = 0
+        self._journal = None
+
+    def open(self):
+        os.makedirs(self.directory, exist_ok=True)
+        journal_path = os.path.join(self.directory, JOURNAL_NAME)
+        if os.path.exists(journal_path):
+            with open(journal_path, 'r', encoding='utf-8') as journal:
+                next(journal, None)  # Header
+                for line in journal:
+                    try:
+                        entry = json.loads(line)
+                        self.completed[entry['index']] = entry['digest']
+                    except (ValueError, KeyError, TypeError):
+                        continue
+            self._journal = open(journal_path, 'a', encoding='utf-8')
+            if self.completed:
+                logger.info(f"Checkpoint {os.path.basename(self.directory)[:12]} has "
+                            f"{len(self.completed)} completed chunks")
+        else:
+            self._journal = open(journal_path, 'w', encoding='utf-8')
+            self._append(self.header)
+
+    def _append(self, entry):
+        self._journal.write(json.dumps(entry) + '\n')
+        self._journal.flush()
+        os.fsync(self._journal.fileno())
+
+    def restore(self, index, chunk, path):
+        """
+        Whether chunk's audio from an earlier attempt is already at path
+
+        The digest check catches documents that chunk differently this time
+        (e.g. after a segmenter change); such chunks are synthesized again.
+        """
+        if self.completed.get(index) != chunk_digest(chunk):
+            return False
+        if not os.path.exists(path) or os.path.getsize(path) == 0:
+            return False
+        self.restored += 1
+        return True
+
+    def mark_done(self, index, chunk):
+        """Journal a chunk whose audio is complete at its path"""
+        digest = chunk_digest(chunk)
+        if self.completed.get(index) == digest:
+            return
+        self._append({'index': index, 'digest': digest, 'chars': len(chunk)})
+        self.completed[index] = digest
+
+    def close(self):
+        if self._journal is not None and not self._journal.closed:
+            self._journal.close()
+
+
+class CheckpointStore:
+    """Checkpoint directories of unfinished conversions, one conversion each at a time"""
+    def __init__(self, directory):
+        self.directory = directory
+        self.resumed_conversions = 0
+        self.restored_chunks = 0
+        self._active = set()
+        self._lock = threading.Lock()
+
+    def open(self, key, header):
+        """
+        Open (or create) the checkpoint of a conversion
+
+        Args:
+            key (str): Identifies the input, e.g. the upload's content hash
+            header (dict): Engine name, voice settings and anything else that
+                changes chunk boundaries or chunk audio
+
+        Returns:
+            Checkpoint or None: None if another conversion is using it
+        """
+        name = checkpoint_id(key, header)
+        with self._lock:
+            if name in self._active:
+                return None
+            self._active.add(name)
+        checkpoint = Checkpoint(os.path.join(self.directory, name), header)
+        try:
+            checkpoint.open()
+        except (OSError, ValueError) as e:
+            logger.warning(f"Could not open checkpoint {name[:12]}: {e}")
+            checkpoint.close()
+            with self._lock:
+                self._active.discard(name)
+            return None
+        return checkpoint
+
+    def release(self, checkpoint, keep):
+        """Close a checkpoint; keep it for a later attempt or delete it once the audio is done"""
+        checkpoint.close()
+        if keep:
+            logger.info(f"Keeping checkpoint {os.path.basename(checkpoint.directory)[:12]} "
+                        f"({len(checkpoint.completed)} chunks) for a later attempt")
+        else:
+            shutil.rmtree(checkpoint.directory, ignore_errors=True)
+        with self._lock:
+            if checkpoint.restored:
+                self.resumed_conversions += 1
+                self.restored_chunks += checkpoint.restored
+            self._active.discard(os.path.basename(checkpoint.directory))
+
+    def stats(self):
+        try:
+            stored = sum(1 for entry in os.scandir(self.directory) if entry.is_dir())
+        except OSError:
+            stored = 0
+        with self._lock:
+            return {
+                'active': len(self._active),
+                'stored': stored,
+                'resumed_conversions': self.resumed_conversions,
+                'restored_chunks': self.restored_chunks,
+            }
@@ -0,0 +1,103 @@
+"""
+Document deduplication for the AI Accessibility Reader.
+Remembers which uploads (by content hash) were already converted with which
+engine settings, and which conversions are currently in flight.
+"""
+
+import os
+import json
+import hashlib
+import threading
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+def document_key(kind, digest, signature):
+    """
+    Build the lookup key for a converted document
+
+    Args:
+        kind (str): 'file' for raw upload bytes, 'text' for extracted text
+        digest (str): SHA-256 hex digest of the bytes or text
+        signature (dict): Engine name and voice settings used for synthesis
+    """
+    payload = json.dumps({'kind': kind, 'digest': digest, 'signature': signature}, sort_keys=True)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def text_digest(text):
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+class DocumentIndex:
+    """Persistent map of finished conversions plus single-flight tracking"""
+    def __init__(self, index_path):
+        self.index_path = index_path
+        self._completed = None
+        self._in_flight = {}
+        self._lock = threading.Lock()
+
+    def _load(self):
+        """Read the persisted index on first use (caller holds the lock)"""
+        if self._completed is not None:
+            return
+        self._completed = {}
+        if os.path.exists(self.index_path):
+            try:
+                with open(self.index_path, 'r', encoding='utf-8') as index_file:
+                    self._completed = json.load(index_file)
+            except (OSError, ValueError) as e:
+                logger.warning(f"Ignoring unreadable document index {self.index_path}: {e}")
+
+    def _save(self):
+        """Persist the index atomically (caller holds the lock)"""
+        temp_path = f"{self.index_path}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as index_file:
+            json.dump(self._completed, index_file)
+        os.replace(temp_path, self.index_path)
+
+    def lookup(self, key):
+        """Return the stored result for a finished conversion, if any"""
+        with self._lock:
+            self._load()
+            result = self._completed.get(key)
+            return dict(result) if result else None
+
+    def record(self, keys, result):
+        """Remember a finished conversion under every key that identifies it"""
+        with self._lock:
+            self._load()
+            for key in keys:
+                self._completed[key] = result
+            try:
+                self._save()
+            except OSError as e:
+                logger.warning(f"Failed to persist document index: {e}")
+
+    def forget(self, key):
+        """Drop an entry whose audio no longer exists"""
+        with self._lock:
+            self._load()
+            if self._completed.pop(key, None) is not None:
+                self._save()
+
+    def claim(self, key, job_id):
+        """
+        Register job_id as the one conversion in flight for key
+
+        Returns:
+            str or None: The id of the job that already owns key, or None if
+            the claim succeeded
+        """
+        with self._lock:
+            owner = self._in_flight.get(key)
+            if owner is not None:
+                return owner
+            self._in_flight[key] = job_id
+            return None
+
+    def release(self, key, job_id):
+        with self._lock:
+            if self._in_flight.get(key) == job_id:
+                del self._in_flight[key]
@@ -0,0 +1,313 @@
+"""
+Engine registry for the AI Accessibility Reader.
+TTS engines are registered as plugins with declared capabilities and a
+concurrency limit. Each engine has its own semaphore and keeps a pool of
+initialized instances per (model, voice) variant; when the preferred
+engine is saturated, requests spill over to another warm engine.
+"""
+
+import threading
+import contextlib
+import logging
+from collections import OrderedDict
+import metrics
+
+logger = logging.getLogger(__name__)
+
+# Engine states
+PENDING = 'pending'
+READY = 'ready'
+FAILED = 'failed'
+
+spillovers_total = metrics.registry.register(metrics.Counter(
+    'reader_engine_spillovers_total', 'Conversions moved to another engine because the preferred one was busy',
+    labels=('source', 'target')))
+
+
+class EngineUnavailable(RuntimeError):
+    """Raised when a requested engine, model or voice cannot be used"""
+
+
+class EngineVariant:
+    """Initialized instances of one engine configured with one model and voice"""
+    def __init__(self, slot, model, voice):
+        self.slot = slot
+        self.model = model
+        self.voice = voice
+        self.settings = None  # voice_settings() of the loaded instances
+        self.shared = {}  # Resources shared by all instances (e.g. a synthesis process pool)
+        self.checked_out = 0
+        self._idle = []
+        self._lock = threading.Lock()
+
+    def reserve(self):
+        """Count a caller about to check out an instance, so the variant is not evicted meanwhile"""
+        with self._lock:
+            self.checked_out += 1
+
+    def checkout(self):
+        """An instance for a caller that has reserved one"""
+        with self._lock:
+            if self._idle:
+                return self._idle.pop()
+        try:
+            return self._create()
+        except Exception:
+            with self._lock:
+                self.checked_out -= 1
+            raise
+
+    def checkin(self, engine):
+        with self._lock:
+            self.checked_out -= 1
+            self._idle.append(engine)
+
+    def _create(self):
+        engine = self.slot.engine_class()
+        engine.configure(model=self.model, voice=self.voice)
+        if not engine.initialize():
+            raise EngineUnavailable(f"{self.slot.name} engine failed to initialize"
+                                    f" (model={self.model}, voice={self.voice})")
+        if self.slot.prepare:
+            self.slot.prepare(engine, self)
+        self.settings = engine.voice_settings()
+        logger.info(f"Loaded {self.slot.name} instance (model={self.model}, voice={self.voice})")
+        return engine
+
+    def idle(self):
+        with self._lock:
+            return self.checked_out == 0
+
+    def close(self):
+        """Release the idle instances and shared resources of an evicted variant"""
+        with self._lock:
+            engines, self._idle = self._idle, []
+            shared, self.shared = self.shared, {}
+        for engine in engines:
+            engine.close()
+        # Pools hold worker processes, some with a loaded model of their own
+        for name, resource in shared.items():
+            release = getattr(resource, 'shutdown', None) or getattr(resource, 'close', None)
+            try:
+                if release:
+                    release()
+            except Exception as e:
+                logger.warning(f"Could not release {self.slot.name} {name}: {e}")
+
+
+class EngineSlot:
+    """Registration of one engine: its limits, state and variants"""
+    def __init__(self, engine_class, max_concurrency, max_waiting, max_variants, spillover, prepare):
+        self.engine_class = engine_class
+        self.name = engine_class.name
+        self.max_concurrency = max_concurrency
+        self.max_waiting = max_waiting
+        self.max_variants = max_variants
+        self.spillover = spillover
+        self.prepare = prepare
+        self.state = PENDING
+        self.error = None
+        self.active = 0
+        self.waiting = 0
+        self._semaphore = threading.BoundedSemaphore(max_concurrency)
+        self._variants = OrderedDict()
+        self._lock = threading.Lock()
+
+    def try_enter(self):
+        if not self._semaphore.acquire(blocking=False):
+            return False
+        with self._lock:
+            self.active += 1
+        return True
+
+    def enter(self):
+        with self._lock:
+            self.waiting += 1
+        try:
+            self._semaphore.acquire()
+        finally:
+            with self._lock:
+                self.waiting -= 1
+        with self._lock:
+            self.active += 1
+
+    def leave(self):
+        with self._lock:
+            self.active -= 1
+        self._semaphore.release()
+
+    def checkout(self, model, voice):
+        """
+        Check out an instance of the (model, voice) variant
+
+        The least recently used idle variant is evicted if there are too
+        many. The lookup reserves the variant under the slot lock, so it can
+        never be evicted between being found and being checked out.
+
+        Returns:
+            tuple: (variant, engine); return the engine with variant.checkin()
+        """
+        key = (model, voice)
+        evicted = []
+        with self._lock:
+            variant = self._variants.get(key)
+            if variant is None:
+                variant = self._variants[key] = EngineVariant(self, model, voice)
+            self._variants.move_to_end(key)
+            variant.reserve()
+            while len(self._variants) > self.max_variants:
+                stale_key = next((k for k, v in self._variants.items() if k != key and v.idle()), None)
+                if stale_key is None:
+                    break
+                evicted.append(self._variants.pop(stale_key))
+                logger.info(f"Unloaded {self.name} variant model={stale_key[0]} voice={stale_key[1]}")
+        # Outside the lock: shutting a pool down can take a while
+        for stale in evicted:
+            stale.close()
+        return variant, variant.checkout()
+
+    def loaded_variant(self, model, voice):
+        with self._lock:
+            return self._variants.get((model, voice))
+
+    def describe(self):
+        with self._lock:
+            variants = [{'model': v.model, 'voice': v.voice, 'settings': v.settings}
+                        for v in self._variants.values() if v.settings is not None]
+        return {
+            'name': self.name,
+            'state': self.state,
+            'error': self.error,
+            'capabilities': self.engine_class.capabilities(),
+            'max_concurrency': self.max_concurrency,
+            'active': self.active,
+            'waiting': self.waiting,
+            'spillover': self.spillover,
+            'variants': variants,
+        }
+
+
+class EngineRegistry:
+    """Registered engines in order of preference"""
+    def __init__(self, prepare=None):
+        self.prepare = prepare  # Called as prepare(engine, variant) on each new instance
+        self.default = None
+        self._slots = OrderedDict()
+
+    def register(self, engine_class, max_concurrency=1, max_waiting=2, max_variants=2, spillover=True):
+        """
+        Register an engine plugin
+
+        Args:
+            engine_class (type): TTSEngine subclass; its name is the registry key
+            max_concurrency (int): Conversions the engine runs at once
+            max_waiting (int): Conversions queued on the engine before new ones spill over
+            max_variants (int): (model, voice) combinations kept loaded at once
+            spillover (bool): Whether other engines' overflow may be sent here
+        """
+        self._slots[engine_class.name.lower()] = EngineSlot(
+            engine_class, max_concurrency, max_waiting, max_variants, spillover, self.prepare)
+
+    def names(self):
+        return [slot.name for slot in self._slots.values()]
+
+    def get(self, name):
+        """
+        Look up an engine by name (case-insensitive)
+
+        Raises:
+            EngineUnavailable: If no such engine is registered
+        """
+        slot = self._slots.get(str(name).lower())
+        if slot is None:
+            raise EngineUnavailable(f"Unknown TTS engine '{name}'. Available: {', '.join(self.names())}")
+        return slot
+
+    def validate(self, name=None, model=None, voice=None):
+        """Check a per-request selection against the engine's declared capabilities"""
+        slot = self.get(name or self.default) if (name or self.default) else None
+        if slot is None:
+            if model or voice:
+                raise EngineUnavailable("Choose an engine to select a model or voice")
+            return
+        capabilities = slot.engine_class.capabilities()
+        if model and model not in (capabilities['models'] or []):
+            raise EngineUnavailable(f"{slot.name} does not offer model '{model}'")
+        if voice and not capabilities['voice_selection']:
+            raise EngineUnavailable(f"{slot.name} does not support voice selection")
+
+    def warm_up(self, name, model=None, voice=None):
+        """
+        Load one instance of an engine variant and mark the engine ready
+
+        Returns:
+            dict: The variant's voice settings
+
+        Raises:
+            EngineUnavailable: If the engine cannot be initialized
+        """
+        slot = self.get(name)
+        try:
+            variant, engine = slot.checkout(model, voice)
+        except Exception as e:
+            if model is None and voice is None:
+                slot.state = FAILED
+                slot.error = str(e)
+            raise EngineUnavailable(str(e)) from e
+        variant.checkin(engine)
+        slot.state = READY
+        slot.error = None
+        return variant.settings
+
+    def settings(self, name=None, model=None, voice=None):
+        """Voice settings of a variant that is already loaded, or None"""
+        name = name or self.default
+        if name is None:
+            return None
+        variant = self.get(name).loaded_variant(model, voice)
+        return variant.settings if variant is not None else None
+
+    def _choose(self, name, spillover):
+        """Enter the semaphore of the engine that will run a conversion"""
+        primary = self.get(name or self.default)
+        if primary.try_enter():
+            return primary
+        if spillover and primary.waiting >= primary.max_waiting:
+            for slot in self._slots.values():
+                if slot is primary or not slot.spillover or slot.state != READY:
+                    continue
+                if slot.try_enter():
+                    spillovers_total.inc(source=primary.name, target=slot.name)
+                    logger.info(f"{primary.name} is saturated; spilling over to {slot.name}")
+                    return slot
+        primary.enter()
+        return primary
+
+    @contextlib.contextmanager
+    def acquire(self, name=None, model=None, voice=None):
+        """
+        Borrow an engine instance for one conversion
+
+        Without an explicit engine the default engine is used, spilling over
+        to another ready engine (with its default model and voice) when the
+        default already has max_waiting conversions queued.
+
+        Yields:
+            TTSEngine: An initialized instance, exclusive to the caller
+        """
+        if name is None and self.default is None:
+            raise EngineUnavailable("No TTS engine available")
+        slot = self._choose(name, spillover=name is None and model is None and voice is None)
+        try:
+            if slot.name.lower() != str(name or self.default).lower():
+                model = voice = None  # A spillover engine runs with its own defaults
+            variant, engine = slot.checkout(model, voice)
+            try:
+                yield engine
+            finally:
+                variant.checkin(engine)
+        finally:
+            slot.leave()
+
+    def describe(self):
+        return [slot.describe() for slot in self._slots.values()]
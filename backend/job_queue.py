@@ -0,0 +1,207 @@
+"""
+Background job queue for the AI Accessibility Reader.
+Runs text extraction and speech synthesis on a bounded pool of worker
+threads so HTTP requests return immediately. Waiting jobs start shortest
+first, with aging, and each client is limited in how many run at once.
+"""
+
+import threading
+import time
+import uuid
+import logging
+import metrics
+
+logger = logging.getLogger(__name__)
+
+# Job states
+QUEUED = 'queued'
+RUNNING = 'running'
+COMPLETED = 'completed'
+FAILED = 'failed'
+
+
+class QueueFullError(Exception):
+    """Raised when the job queue cannot accept more work"""
+
+
+class Job:
+    """A single unit of background work and its progress"""
+    def __init__(self, func, args, job_id=None, cost=0, client=None):
+        self.id = job_id or str(uuid.uuid4())
+        self.func = func
+        self.args = args
+        self.cost = cost  # Estimated characters to synthesize
+        self.client = client
+        self.state = QUEUED
+        self.chunks_done = 0
+        self.chunks_total = 0
+        self.result = None
+        self.error = None
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self._done = threading.Event()
+
+    def update_progress(self, chunks_done, chunks_total):
+        """Progress callback handed to the TTS engine"""
+        self.chunks_done = chunks_done
+        self.chunks_total = chunks_total
+
+    @property
+    def finished(self):
+        return self.state in (COMPLETED, FAILED)
+
+    def wait(self, timeout=None):
+        """Block until the job finishes; returns False on timeout"""
+        return self._done.wait(timeout)
+
+    def to_dict(self):
+        data = {
+            'job_id': self.id,
+            'state': self.state,
+            'progress': {
+                'chunks_done': self.chunks_done,
+                'chunks_total': self.chunks_total,
+            },
+            'created_at': self.created_at,
+            'started_at': self.started_at,
+            'finished_at': self.finished_at,
+        }
+        if self.state == COMPLETED and self.result:
+            data.update(self.result)
+        if self.state == FAILED:
+            data['error'] = self.error
+        return data
+
+
+class JobQueue:
+    """
+    Bounded queue served by a fixed number of worker threads
+
+    A free worker takes the waiting job with the lowest estimated cost,
+    less aging per second waited, so a short document does not wait
+    behind a book while the book still starts eventually. Jobs of a client
+    already running max_per_client jobs stay queued while another client
+    has a job that could start; otherwise no worker is left idle.
+    """
+    def __init__(self, num_workers=2, max_queue_size=16, job_ttl=3600, aging=1000, max_per_client=None):
+        self.num_workers = num_workers
+        self.max_queue_size = max_queue_size
+        self.job_ttl = job_ttl
+        self.aging = aging  # Characters of estimated cost forgiven per second of waiting
+        self.max_per_client = max_per_client
+        self._waiting = []
+        self._running_by_client = {}
+        self._jobs = {}
+        self._lock = threading.Lock()
+        self._cond = threading.Condition(self._lock)
+        self._workers = []
+
+    def _start_workers(self):
+        # Workers are started lazily so importing the module has no side effects
+        if self._workers:
+            return
+        for i in range(self.num_workers):
+            worker = threading.Thread(target=self._worker_loop, name=f"job-worker-{i}", daemon=True)
+            worker.start()
+            self._workers.append(worker)
+
+    def submit(self, func, *args, job_id=None, cost=0, client=None):
+        """
+        Queue func(job, *args) for background execution
+
+        Args:
+            cost (int): Estimated size of the job (characters to synthesize)
+            client (str): Who submitted it, for the per-client limit
+
+        Returns:
+            Job: The queued job
+
+        Raises:
+            QueueFullError: If the queue is at capacity
+        """
+        job = Job(func, args, job_id, cost=cost, client=client)
+        with self._cond:
+            self._start_workers()
+            self._prune()
+            if len(self._waiting) >= self.max_queue_size:
+                raise QueueFullError("Job queue is full, please retry later")
+            self._waiting.append(job)
+            self._jobs[job.id] = job
+            waiting = len(self._waiting)
+            self._cond.notify()
+        logger.info(f"Queued job {job.id} (cost {cost}, {waiting} waiting)")
+        return job
+
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def stats(self):
+        with self._lock:
+            states = {}
+            for job in self._jobs.values():
+                states[job.state] = states.get(job.state, 0) + 1
+            return {
+                'workers': self.num_workers,
+                'queue_depth': len(self._waiting),
+                'max_queue_size': self.max_queue_size,
+                'clients_running': len(self._running_by_client),
+                'jobs': states,
+            }
+
+    def _prune(self):
+        """Forget finished jobs older than job_ttl (caller holds the lock)"""
+        cutoff = time.time() - self.job_ttl
+        expired = [job_id for job_id, job in self._jobs.items()
+                   if job.finished and job.finished_at < cutoff]
+        for job_id in expired:
+            del self._jobs[job_id]
+
+    def _priority(self, job, now):
+        return job.cost - self.aging * (now - job.created_at)
+
+    def _take(self):
+        """Wait for the next job a worker may start and mark its client busy"""
+        with self._cond:
+            while True:
+                now = time.time()
+                # Every waiting client at its cap (e.g. one client behind a proxy): the cap yields
+                startable = [job for job in self._waiting
+                             if self.max_per_client is None
+                             or self._running_by_client.get(job.client, 0) < self.max_per_client] or self._waiting
+                if startable:
+                    job = min(startable, key=lambda job: self._priority(job, now))
+                    self._waiting.remove(job)
+                    self._running_by_client[job.client] = self._running_by_client.get(job.client, 0) + 1
+                    return job
+                self._cond.wait()
+
+    def _release(self, job):
+        with self._cond:
+            count = self._running_by_client.get(job.client, 0) - 1
+            if count > 0:
+                self._running_by_client[job.client] = count
+            else:
+                self._running_by_client.pop(job.client, None)
+            self._cond.notify_all()
+
+    def _worker_loop(self):
+        while True:
+            job = self._take()
+            job.state = RUNNING
+            job.started_at = time.time()
+            metrics.queue_wait_seconds.observe(job.started_at - job.created_at)
+            try:
+                job.result = job.func(job, *job.args)
+                job.state = COMPLETED
+                logger.info(f"Job {job.id} completed in {time.time() - job.started_at:.2f}s")
+            except Exception as e:
+                job.error = str(e)
+                job.state = FAILED
+                logger.error(f"Job {job.id} failed: {job.error}")
+            finally:
+                job.finished_at = time.time()
+                metrics.jobs_total.inc(state=job.state)
+                job._done.set()
+                self._release(job)
@@ -0,0 +1,220 @@
+"""
+Pipeline metrics for the AI Accessibility Reader.
+Counters and histograms for each processing stage, rendered in the
+Prometheus text exposition format, plus an on-demand profiler hook.
+"""
+
+import os
+import time
+import threading
+import contextlib
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Default histogram buckets (seconds)
+TIME_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600, 1800)
+RATE_BUCKETS = (10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 25000)  # Characters per second
+RTF_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2, 5, 10)  # Synthesis time / audio duration
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(names, values, extra=()):
+    pairs = list(zip(names, values)) + list(extra)
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in pairs) + '}'
+
+
+def _format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    """Monotonic counter, optionally split by labels"""
+    kind = 'counter'
+
+    def __init__(self, name, description, labels=()):
+        self.name = name
+        self.description = description
+        self.labels = tuple(labels)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1, **labels):
+        key = tuple(labels.get(name, '') for name in self.labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def samples(self):
+        with self._lock:
+            items = list(self._values.items())
+        for key, value in items:
+            yield f"{self.name}{_format_labels(self.labels, key)} {_format_value(value)}"
+
+
+class Gauge(Counter):
+    """Value that can go up and down"""
+    kind = 'gauge'
+
+    def set(self, value, **labels):
+        key = tuple(labels.get(name, '') for name in self.labels)
+        with self._lock:
+            self._values[key] = value
+
+
+class Histogram:
+    """Cumulative-bucket histogram, optionally split by labels"""
+    kind = 'histogram'
+
+    def __init__(self, name, description, labels=(), buckets=TIME_BUCKETS):
+        self.name = name
+        self.description = description
+        self.labels = tuple(labels)
+        self.buckets = tuple(sorted(buckets)) + (float('inf'),)
+        self._series = {}  # label values -> [bucket counts, sum, count]
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = tuple(labels.get(name, '') for name in self.labels)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * len(self.buckets), 0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[0][i] += 1
+                    break
+            series[1] += value
+            series[2] += 1
+
+    @contextlib.contextmanager
+    def time(self, **labels):
+        """Observe the wall time of a with-block"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def samples(self):
+        with self._lock:
+            items = [(key, (list(counts), total, count)) for key, (counts, total, count) in self._series.items()]
+        for key, (counts, total, count) in items:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                labels = _format_labels(self.labels, key, [('le', _format_value(bound))])
+                yield f"{self.name}_bucket{labels} {cumulative}"
+            yield f"{self.name}_sum{_format_labels(self.labels, key)} {_format_value(total)}"
+            yield f"{self.name}_count{_format_labels(self.labels, key)} {count}"
+
+
+class Registry:
+    """Collection of metrics rendered together on /metrics"""
+    def __init__(self):
+        self._metrics = []
+        self._collectors = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def add_collector(self, collector):
+        """Register a callable run before each render, e.g. to refresh gauges"""
+        self._collectors.append(collector)
+
+    def render(self):
+        """Metrics in the Prometheus text format (version 0.0.4)"""
+        for collector in self._collectors:
+            try:
+                collector()
+            except Exception as e:
+                logger.warning(f"Metrics collector failed: {e}")
+        lines = []
+        for metric in self._metrics:
+            lines.append(f"# HELP {metric.name} {metric.description}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.samples())
+        return '\n'.join(lines) + '\n'
+
+
+registry = Registry()
+
+stage_seconds = registry.register(Histogram(
+    'reader_stage_seconds', 'Time spent in each pipeline stage', labels=('stage', 'engine')))
+chunk_seconds = registry.register(Histogram(
+    'reader_chunk_seconds', 'Time to produce the audio of one chunk', labels=('engine',)))
+synthesis_chars_per_second = registry.register(Histogram(
+    'reader_synthesis_chars_per_second', 'Characters synthesized per second, per document',
+    labels=('engine',), buckets=RATE_BUCKETS))
+real_time_factor = registry.register(Histogram(
+    'reader_real_time_factor', 'Synthesis time divided by audio duration, per document',
+    labels=('engine',), buckets=RTF_BUCKETS))
+queue_wait_seconds = registry.register(Histogram(
+    'reader_queue_wait_seconds', 'Time jobs wait in the queue before a worker picks them up'))
+chunks_total = registry.register(Counter(
+    'reader_chunks_total', 'Chunks synthesized', labels=('engine',)))
+characters_total = registry.register(Counter(
+    'reader_characters_total', 'Characters synthesized', labels=('engine',)))
+audio_seconds_total = registry.register(Counter(
+    'reader_audio_seconds_total', 'Seconds of audio produced', labels=('engine',)))
+silence_trimmed_seconds_total = registry.register(Counter(
+    'reader_silence_trimmed_seconds_total', 'Seconds of leading and trailing chunk silence removed',
+    labels=('engine',)))
+postprocessed_seconds_total = registry.register(Counter(
+    'reader_postprocessed_seconds_total', 'Seconds of chunk audio entering and leaving post-processing',
+    labels=('engine', 'direction')))
+chunk_retries_total = registry.register(Counter(
+    'reader_chunk_retries_total', 'Chunk (or batch) synthesis attempts retried after a failure', labels=('engine',)))
+chunks_resumed_total = registry.register(Counter(
+    'reader_chunks_resumed_total', 'Chunks reused from the checkpoint of an earlier, failed attempt',
+    labels=('engine',)))
+jobs_total = registry.register(Counter(
+    'reader_jobs_total', 'Finished background jobs', labels=('state',)))
+
+
+def time_stage(stage, engine=''):
+    """Context manager recording the duration of a pipeline stage"""
+    return stage_seconds.time(stage=stage, engine=engine)
+
+
+class CProfileHook:
+    """Profiles a block with cProfile and writes a .prof file (snakeviz, pstats, flameprof)"""
+    def __init__(self, directory):
+        self.directory = directory
+
+    @contextlib.contextmanager
+    def __call__(self, name):
+        import cProfile
+        os.makedirs(self.directory, exist_ok=True)
+        path = os.path.join(self.directory, f"{name}.prof")
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            yield path
+        finally:
+            profiler.disable()
+            profiler.dump_stats(path)
+            logger.info(f"Profile written to {path}")
+
+
+# Callable(name) -> context manager; replace with set_profiler() to plug in another profiler
+_profiler = None
+
+
+def set_profiler(profiler):
+    global _profiler
+    _profiler = profiler
+
+
+def profiled(name, enabled=True):
+    """Run a block under the configured profiler, if any and if enabled"""
+    if not enabled or _profiler is None:
+        return contextlib.nullcontext()
+    return _profiler(name)
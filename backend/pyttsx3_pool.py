@@ -0,0 +1,131 @@
+"""
+pyttsx3 driver pool for the AI Accessibility Reader.
+Keeps pre-configured pyttsx3 engines alive between chunks. Each engine is
+owned by a dedicated thread, since system speech drivers (SAPI5, NSSpeech,
+eSpeak) are not safe to drive from arbitrary threads.
+"""
+
+import queue
+import threading
+import logging
+import metrics
+
+logger = logging.getLogger(__name__)
+
+drivers_recycled_total = metrics.registry.register(metrics.Counter(
+    'reader_pyttsx3_drivers_recycled_total', 'pyttsx3 drivers replaced after failing or hanging'))
+
+
+class DriverError(Exception):
+    """Raised when a pooled driver fails or stops responding"""
+
+
+class _Request:
+    def __init__(self, text, output_path):
+        self.text = text
+        self.output_path = output_path
+        self.error = None
+        self.done = threading.Event()
+
+
+class Pyttsx3Driver:
+    """One pyttsx3 engine and the thread that owns it"""
+    def __init__(self, voice_id, rate, volume):
+        self.voice_id = voice_id
+        self.rate = rate
+        self.volume = volume
+        self.alive = True
+        self._requests = queue.Queue()
+        self._ready = threading.Event()
+        self._start_error = None
+        self._thread = threading.Thread(target=self._run, name="pyttsx3-driver", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        try:
+            import pyttsx3
+
+            # pyttsx3.init() returns one shared engine per driver; build our own
+            engine = pyttsx3.Engine()
+            if self.voice_id:
+                engine.setProperty('voice', self.voice_id)
+            engine.setProperty('rate', self.rate)
+            engine.setProperty('volume', self.volume)
+        except Exception as e:
+            self._start_error = e
+            self.alive = False
+            return
+        finally:
+            self._ready.set()
+
+        while True:
+            request = self._requests.get()
+            if request is None:
+                break
+            try:
+                engine.save_to_file(request.text, request.output_path)
+                engine.runAndWait()
+            except Exception as e:
+                request.error = e
+            request.done.set()
+
+        try:
+            engine.stop()
+        except Exception:
+            pass
+
+    def synthesize(self, text, output_path, timeout=None):
+        """Synthesize text to output_path on the driver thread"""
+        self._ready.wait(timeout)
+        if self._start_error is not None:
+            raise DriverError(f"pyttsx3 driver failed to start: {self._start_error}")
+
+        request = _Request(text, output_path)
+        self._requests.put(request)
+        if not request.done.wait(timeout):
+            # The thread is stuck inside the speech driver; abandon it
+            self.alive = False
+            raise DriverError(f"pyttsx3 driver timed out after {timeout}s")
+        if request.error is not None:
+            self.alive = False
+            raise DriverError(f"pyttsx3 driver failed: {request.error}")
+
+    def close(self):
+        self.alive = False
+        self._requests.put(None)
+
+
+class Pyttsx3DriverPool:
+    """Fixed-size pool of drivers; failed drivers are replaced automatically"""
+    def __init__(self, size, voice_id, rate, volume, timeout=None):
+        self.size = size
+        self.voice_id = voice_id
+        self.rate = rate
+        self.volume = volume
+        self.timeout = timeout
+        self._idle = queue.Queue()
+        for _ in range(size):
+            self._idle.put(self._new_driver())
+
+    def _new_driver(self):
+        return Pyttsx3Driver(self.voice_id, self.rate, self.volume)
+
+    def synthesize(self, text, output_path):
+        """Borrow a driver, synthesize, and return (or replace) the driver"""
+        driver = self._idle.get()
+        try:
+            driver.synthesize(text, output_path, self.timeout)
+        finally:
+            if not driver.alive:
+                logger.warning("Recycling failed pyttsx3 driver")
+                driver.close()
+                driver = self._new_driver()
+                drivers_recycled_total.inc()
+            self._idle.put(driver)
+
+    def close(self):
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                break
@@ -0,0 +1,128 @@
+"""
+Synthesis scheduling for the AI Accessibility Reader.
+Conversions running at the same time take turns chunk by chunk. Each turn
+goes to the conversion with the least text left (shortest job first),
+with waiting time counted in its favour so long books are never starved,
+and no client holds more than its share of turns while others wait.
+"""
+
+import time
+import threading
+import contextlib
+import logging
+import metrics
+
+logger = logging.getLogger(__name__)
+
+turn_wait_seconds = metrics.registry.register(metrics.Histogram(
+    'reader_turn_wait_seconds', 'Time a conversion waits for its turn to synthesize the next chunk'))
+
+
+class Ticket:
+    """One conversion's place in the schedule"""
+    def __init__(self, scheduler, name, client, cost):
+        self.scheduler = scheduler
+        self.name = name
+        self.client = client
+        self.remaining = cost  # Estimated characters left to synthesize
+        self.done = 0  # Characters synthesized so far
+        self.turns = 0
+        self.waited = 0.0  # Seconds spent waiting for turns
+        self.waiting_since = None
+
+    def update(self, cost):
+        """Replace the estimate of the conversion's total characters, e.g. as extracted text arrives"""
+        self.remaining = max(0, cost - self.done)
+
+    def consumed(self, characters):
+        """Count characters synthesized during a turn against the estimate"""
+        self.done += characters
+        self.remaining = max(0, self.remaining - characters)
+
+    @contextlib.contextmanager
+    def turn(self):
+        """Block until it is this conversion's turn, then hold one synthesis slot"""
+        self.scheduler._enter(self)
+        try:
+            yield
+        finally:
+            self.scheduler._leave(self)
+
+
+class ChunkScheduler:
+    """
+    Grants synthesis slots to concurrently running conversions
+
+    Args:
+        slots (int): Chunks synthesized at once across all conversions
+        aging (float): Characters of estimated cost forgiven per second of
+            waiting; bounds how long a long conversion can be passed over
+        max_turns_per_client (int): Slots one client may hold while another
+            client's conversion is waiting (None for no limit)
+    """
+    def __init__(self, slots=2, aging=10000, max_turns_per_client=1):
+        self.slots = slots
+        self.aging = aging
+        self.max_turns_per_client = max_turns_per_client
+        self.active = 0
+        self._active_by_client = {}
+        self._waiting = []
+        self._cond = threading.Condition()
+
+    def ticket(self, name, client=None, cost=0):
+        return Ticket(self, name, client, cost)
+
+    def _priority(self, ticket, now):
+        return ticket.remaining - self.aging * (now - ticket.waiting_since)
+
+    def _eligible(self, ticket):
+        """Whether ticket's client is under its cap, or nobody else is waiting (caller holds the lock)"""
+        if self.max_turns_per_client is None:
+            return True
+        if self._active_by_client.get(ticket.client, 0) < self.max_turns_per_client:
+            return True
+        return all(other.client == ticket.client for other in self._waiting)
+
+    def _next(self):
+        """The waiting ticket that gets the next free slot (caller holds the lock)"""
+        now = time.monotonic()
+        # If every waiting client is at its cap, a free slot still goes to someone
+        eligible = [ticket for ticket in self._waiting if self._eligible(ticket)] or self._waiting
+        return min(eligible, key=lambda ticket: self._priority(ticket, now), default=None)
+
+    def _enter(self, ticket):
+        with self._cond:
+            ticket.waiting_since = time.monotonic()
+            self._waiting.append(ticket)
+            try:
+                while self.active >= self.slots or self._next() is not ticket:
+                    self._cond.wait()
+            finally:
+                self._waiting.remove(ticket)
+            self.active += 1
+            self._active_by_client[ticket.client] = self._active_by_client.get(ticket.client, 0) + 1
+            ticket.turns += 1
+            waited = time.monotonic() - ticket.waiting_since
+            ticket.waited += waited
+            # Another waiter may be eligible for a remaining slot
+            self._cond.notify_all()
+        turn_wait_seconds.observe(waited)
+
+    def _leave(self, ticket):
+        with self._cond:
+            self.active -= 1
+            count = self._active_by_client.get(ticket.client, 0) - 1
+            if count > 0:
+                self._active_by_client[ticket.client] = count
+            else:
+                self._active_by_client.pop(ticket.client, None)
+            self._cond.notify_all()
+
+    def stats(self):
+        with self._cond:
+            return {
+                'slots': self.slots,
+                'active': self.active,
+                'waiting': len(self._waiting),
+                'clients_active': len(self._active_by_client),
+            }
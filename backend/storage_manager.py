@@ -0,0 +1,304 @@
+"""
+Storage lifecycle management for the AI Accessibility Reader.
+Keeps generated audio within size and age quotas (evicting the least
+recently played files first) and sweeps orphaned uploads, abandoned
+stream data, leftover chunk directories from interrupted conversions
+and checkpoints that were never resumed.
+"""
+
+import os
+import time
+import shutil
+import tempfile
+import threading
+import logging
+from checkpoint import JOURNAL_NAME
+
+logger = logging.getLogger(__name__)
+
+# Prefix of the temporary chunk directories created during synthesis
+CHUNK_TEMP_PREFIX = "reader-chunks-"
+STREAM_SUFFIX = ".pcm"  # Raw PCM behind progressive audio streams
+
+
+class StorageManager:
+    """
+    Enforces quotas on audio and uploads from a background sweeper
+
+    Last access of an audio file is its atime, which touch() sets
+    explicitly on every download, so it works on noatime mounts and
+    survives restarts. Files reported by in_use(filename), or accessed
+    within access_grace seconds, are never removed. Sidecar files (e.g.
+    <file_id>.align.json) are removed together with their audio. Stream
+    data counts towards max_audio_bytes but is only removed once it has
+    not been written to for stream_max_age seconds.
+    """
+    def __init__(self, audio_dir, upload_dir, max_audio_bytes, max_audio_age, upload_max_age,
+                 temp_max_age, sweep_interval=300, access_grace=600, in_use=None,
+                 keep=('documents.json',), checkpoint_dir=None, checkpoint_max_age=None, sidecars=(),
+                 stream_dir=None, stream_max_age=None):
+        self.audio_dir = audio_dir
+        self.upload_dir = upload_dir
+        self.max_audio_bytes = max_audio_bytes
+        self.max_audio_age = max_audio_age
+        self.upload_max_age = upload_max_age
+        self.temp_max_age = temp_max_age
+        self.checkpoint_dir = checkpoint_dir
+        self.checkpoint_max_age = checkpoint_max_age
+        self.stream_dir = stream_dir
+        self.stream_max_age = stream_max_age
+        self.sweep_interval = sweep_interval
+        self.access_grace = access_grace
+        self.in_use = in_use or (lambda filename: False)
+        self.keep = set(keep)
+        self.sidecars = tuple(sidecars)  # Suffixes of files that live and die with an audio file
+        self.evicted_files = 0
+        self.evicted_bytes = 0
+        self.swept_uploads = 0
+        self.swept_temp_dirs = 0
+        self.swept_checkpoints = 0
+        self.swept_streams = 0
+        self.last_sweep = None
+        self._lock = threading.Lock()
+        self._sweeper = None
+
+    def start(self):
+        """Start the background sweeper (idempotent)"""
+        with self._lock:
+            if self._sweeper is not None:
+                return
+            self._sweeper = threading.Thread(target=self._sweep_loop, name="storage-sweeper", daemon=True)
+            self._sweeper.start()
+
+    def _sweep_loop(self):
+        while True:
+            try:
+                self.sweep()
+            except Exception as e:
+                logger.warning(f"Storage sweep failed: {e}")
+            time.sleep(self.sweep_interval)
+
+    def touch(self, path):
+        """Record an access to an audio file (keeps mtime, so ETags stay valid)"""
+        try:
+            stat = os.stat(path)
+            os.utime(path, ns=(time.time_ns(), stat.st_mtime_ns))
+        except OSError:
+            pass
+
+    def _audio_files(self):
+        """(last_access, size, filename) for each finished audio file"""
+        files = []
+        with os.scandir(self.audio_dir) as entries:
+            for entry in entries:
+                if not entry.is_file() or entry.name in self.keep or self._is_sidecar(entry.name):
+                    continue
+                try:
+                    stat = entry.stat()
+                except OSError:
+                    continue
+                files.append((max(stat.st_atime, stat.st_mtime), stat.st_size, entry.name))
+        return files
+
+    def _is_sidecar(self, filename):
+        if filename.endswith('.tmp'):
+            filename = filename[:-len('.tmp')]  # Sidecar still being written
+        return bool(self.sidecars) and filename.endswith(self.sidecars)
+
+    def _removable(self, filename, last_access, now):
+        return now - last_access >= self.access_grace and not self.in_use(filename)
+
+    def _remove(self, path):
+        try:
+            os.remove(path)
+            return True
+        except OSError as e:
+            logger.warning(f"Could not remove {path}: {e}")
+            return False
+
+    def sweep(self):
+        """Apply all quotas once"""
+        now = time.time()
+        with self._lock:
+            self._sweep_streams(now)
+            self._sweep_audio(now)
+            self._sweep_uploads(now)
+            self._sweep_temp_dirs(now)
+            self._sweep_checkpoints(now)
+            self.last_sweep = now
+
+    def _sweep_audio(self, now):
+        files = sorted(self._audio_files())  # Least recently accessed first
+        # Live streams cannot be evicted, but their data takes up the same disk
+        total = sum(size for _, size, _ in files) + self._stream_usage()[1]
+        stems = {os.path.splitext(filename)[0] for _, _, filename in files}
+        for last_access, size, filename in files:
+            expired = self.max_audio_age is not None and now - last_access > self.max_audio_age
+            over_quota = self.max_audio_bytes is not None and total > self.max_audio_bytes
+            if not (expired or over_quota):
+                continue
+            if not self._removable(filename, last_access, now):
+                continue
+            if self._remove(os.path.join(self.audio_dir, filename)):
+                total -= size
+                self.evicted_files += 1
+                self.evicted_bytes += size
+                logger.info(f"Evicted audio {filename} ({size} bytes, "
+                            f"{'expired' if expired else 'over quota'})")
+                self._remove_sidecars(os.path.splitext(filename)[0])
+                stems.discard(os.path.splitext(filename)[0])
+        self._sweep_orphaned_sidecars(now, stems)
+
+    def _remove_sidecars(self, stem):
+        for suffix in self.sidecars:
+            path = os.path.join(self.audio_dir, stem + suffix)
+            if os.path.exists(path):
+                self._remove(path)
+
+    def _sweep_orphaned_sidecars(self, now, stems):
+        # Left behind by failed conversions, or written before their audio exists
+        if not self.sidecars:
+            return
+        with os.scandir(self.audio_dir) as entries:
+            for entry in entries:
+                if not entry.is_file() or not self._is_sidecar(entry.name):
+                    continue
+                if entry.name.split('.', 1)[0] in stems:
+                    continue
+                try:
+                    last_access = entry.stat().st_mtime
+                except OSError:
+                    continue
+                if self._removable(entry.name, last_access, now):
+                    self._remove(entry.path)
+
+    def _sweep_uploads(self, now):
+        # Uploads normally vanish when their job ends; old ones were left behind by crashes
+        with os.scandir(self.upload_dir) as entries:
+            for entry in entries:
+                try:
+                    if not entry.is_file() or now - entry.stat().st_mtime <= self.upload_max_age:
+                        continue
+                except OSError:
+                    continue
+                if self.in_use(entry.name):
+                    continue
+                if self._remove(entry.path):
+                    self.swept_uploads += 1
+                    logger.info(f"Removed orphaned upload {entry.name}")
+
+    def _stream_files(self):
+        """DirEntry of each stream data file"""
+        if self.stream_dir is None:
+            return []
+        try:
+            with os.scandir(self.stream_dir) as entries:
+                return [entry for entry in entries
+                        if entry.name.endswith(STREAM_SUFFIX) and entry.is_file()]
+        except FileNotFoundError:
+            return []
+
+    def _stream_usage(self):
+        files = 0
+        size = 0
+        for entry in self._stream_files():
+            try:
+                size += entry.stat().st_size
+                files += 1
+            except OSError:
+                continue
+        return files, size
+
+    def _sweep_streams(self, now):
+        # Streams are appended to after every chunk and deleted when their job
+        # ends, so old ones were left behind by restarts or crashes
+        if self.stream_max_age is None:
+            return
+        for entry in self._stream_files():
+            try:
+                if now - entry.stat().st_mtime <= self.stream_max_age:
+                    continue
+            except OSError:
+                continue
+            if self.in_use(entry.name):
+                continue
+            if self._remove(entry.path):
+                self.swept_streams += 1
+                logger.info(f"Removed abandoned stream data {entry.name}")
+
+    def _sweep_temp_dirs(self, now):
+        # A directory's mtime moves with every chunk written, so only abandoned ones age
+        temp_root = tempfile.gettempdir()
+        with os.scandir(temp_root) as entries:
+            for entry in entries:
+                if not entry.name.startswith(CHUNK_TEMP_PREFIX):
+                    continue
+                try:
+                    if not entry.is_dir() or now - entry.stat().st_mtime <= self.temp_max_age:
+                        continue
+                except OSError:
+                    continue
+                shutil.rmtree(entry.path, ignore_errors=True)
+                self.swept_temp_dirs += 1
+                logger.info(f"Removed abandoned chunk directory {entry.path}")
+
+    def _sweep_checkpoints(self, now):
+        # Each completed chunk is journaled, so a checkpoint in use never looks old
+        if self.checkpoint_dir is None or self.checkpoint_max_age is None:
+            return
+        try:
+            entries = list(os.scandir(self.checkpoint_dir))
+        except FileNotFoundError:
+            return
+        for entry in entries:
+            try:
+                if not entry.is_dir():
+                    continue
+                journal_path = os.path.join(entry.path, JOURNAL_NAME)
+                mtime = os.path.getmtime(journal_path) if os.path.exists(journal_path) else entry.stat().st_mtime
+            except OSError:
+                continue
+            if now - mtime <= self.checkpoint_max_age:
+                continue
+            shutil.rmtree(entry.path, ignore_errors=True)
+            self.swept_checkpoints += 1
+            logger.info(f"Removed stale checkpoint {entry.name}")
+
+    @staticmethod
+    def _usage(directory):
+        files = 0
+        size = 0
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                try:
+                    if entry.is_file():
+                        files += 1
+                        size += entry.stat().st_size
+                except OSError:
+                    continue
+        return files, size
+
+    def stats(self):
+        """Disk usage of managed directories, quotas and eviction counters"""
+        audio_files, audio_bytes = self._usage(self.audio_dir)
+        upload_files, upload_bytes = self._usage(self.upload_dir)
+        stream_files, stream_bytes = self._stream_usage()
+        disk = shutil.disk_usage(self.audio_dir)
+        return {
+            'audio_files': audio_files,
+            'audio_bytes': audio_bytes,
+            'max_audio_bytes': self.max_audio_bytes,
+            'upload_files': upload_files,
+            'upload_bytes': upload_bytes,
+            'stream_files': stream_files,
+            'stream_bytes': stream_bytes,
+            'disk_total_bytes': disk.total,
+            'disk_free_bytes': disk.free,
+            'evicted_files': self.evicted_files,
+            'evicted_bytes': self.evicted_bytes,
+            'swept_uploads': self.swept_uploads,
+            'swept_temp_dirs': self.swept_temp_dirs,
+            'swept_checkpoints': self.swept_checkpoints,
+            'swept_streams': self.swept_streams,
+            'last_sweep': self.last_sweep,
+        }
@@ -0,0 +1,90 @@
+"""
+Parallel chunk synthesis for the AI Accessibility Reader.
+Spreads chunks of one document across worker processes, each holding its
+own preloaded copy of an offline TTS engine.
+"""
+
+import multiprocessing
+import logging
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+logger = logging.getLogger(__name__)
+
+# Engine instance owned by the current worker process
+_worker_engine = None
+
+# Engine already loaded in the parent; inherited copy-on-write by forked workers
+_preloaded_engine = None
+
+
+def _init_worker(engine_class, settings, max_memory_mb):
+    """Load the engine once per worker process"""
+    global _worker_engine
+
+    if max_memory_mb:
+        try:
+            import resource
+            limit = max_memory_mb * 1024 * 1024
+            resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+        except (ImportError, ValueError, OSError) as e:
+            logger.warning(f"Could not limit synthesis worker memory: {e}")
+
+    if isinstance(_preloaded_engine, engine_class):
+        _worker_engine = _preloaded_engine
+        _worker_engine.reset_after_fork()
+        return
+
+    _worker_engine = engine_class()
+    _worker_engine.load_for_worker(settings)
+
+
+def _synthesize(chunk, output_path):
+    _worker_engine._synthesize_chunk(chunk, output_path)
+    return output_path
+
+
+class SynthesisPool:
+    """Process pool that synthesizes chunks with a preloaded engine per worker"""
+    def __init__(self, engine_class, settings, workers, max_in_flight=None, max_worker_memory_mb=None,
+                 start_method='spawn', preloaded_engine=None):
+        self.engine_class = engine_class
+        self.settings = settings
+        self.workers = workers
+        self.max_in_flight = max_in_flight or workers * 2
+        self.max_worker_memory_mb = max_worker_memory_mb
+        self.start_method = start_method
+        self.preloaded_engine = preloaded_engine
+        self._executor = None
+
+    def _create_executor(self):
+        global _preloaded_engine
+
+        # Spawn is the safe default since the parent runs Flask and job threads;
+        # fork trades that for sharing the already-loaded model's memory
+        if self.start_method == 'fork':
+            _preloaded_engine = self.preloaded_engine
+        logger.info(f"Starting {self.workers} {self.engine_class.name} synthesis workers ({self.start_method})")
+        return ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context(self.start_method),
+            initializer=_init_worker,
+            initargs=(self.engine_class, self.settings, self.max_worker_memory_mb),
+        )
+
+    def submit(self, chunk, output_path):
+        """Schedule one chunk; returns a Future resolving to output_path"""
+        if self._executor is None:
+            self._executor = self._create_executor()
+        try:
+            return self._executor.submit(_synthesize, chunk, output_path)
+        except BrokenProcessPool:
+            # A worker died (e.g. hit its memory limit); start a fresh pool
+            logger.warning("Synthesis pool is broken, restarting workers")
+            self._executor = self._create_executor()
+            return self._executor.submit(_synthesize, chunk, output_path)
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
@@ -4,9 +4,31 @@ Handles various file formats and extracts plain text.
 """
 
 import os
+import queue
+import codecs
+import signal
+import hashlib
+import logging
+import threading
+import multiprocessing
 import PyPDF2
 import docx
 from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+
+logger = logging.getLogger(__name__)
+
+TXT_BLOCK_SIZE = 64 * 1024  # Characters read per piece from plain text files
+PREFETCH_PIECES = 8  # Pages/paragraphs extracted ahead of the consumer
+
+# PDF extraction runs in worker processes, where a hung page can be timed out
+PDF_EXTRACTION_WORKERS = os.cpu_count() or 1
+PDF_PAGES_PER_TASK = 25  # Pages handed to a worker at a time
+PDF_PAGE_TIMEOUT = 30  # Seconds before a page is skipped
+
+_pdf_executor = None
+_pdf_executor_lock = threading.Lock()
 
 def extract_text(file_path):
     """
@@ -32,41 +54,293 @@ def extract_text(file_path):
     else:
         raise ValueError(f"Unsupported file format: {file_extension}")
 
+def iter_text(file_path):
+    """
+    Extract text incrementally from various file formats
+
+    Yields pages for PDF, paragraphs for DOCX and fixed-size blocks for TXT,
+    so callers can start working before the whole document is read.
+    Concatenating the pieces gives the same result as extract_text().
+
+    Args:
+        file_path (str): Path to the uploaded file
+
+    Yields:
+        str: Consecutive pieces of the document text
+
+    Raises:
+        ValueError: If file format is not supported
+    """
+    file_extension = Path(file_path).suffix.lower()
+    
+    if file_extension == '.txt':
+        return iter_txt_blocks(file_path)
+    elif file_extension == '.pdf':
+        return iter_pdf_pages(file_path)
+    elif file_extension == '.docx':
+        return iter_docx_paragraphs(file_path)
+    else:
+        raise ValueError(f"Unsupported file format: {file_extension}")
+
 def extract_from_txt(file_path):
     """Extract text from a plain text file"""
-    try:
-        with open(file_path, 'r', encoding='utf-8') as file:
-            return file.read()
-    except UnicodeDecodeError:
-        # Try with a different encoding if UTF-8 fails
-        with open(file_path, 'r', encoding='latin-1') as file:
-            return file.read()
+    return ''.join(iter_txt_blocks(file_path))
 
 def extract_from_pdf(file_path):
     """Extract text from a PDF file"""
-    text = ""
-    
+    return ''.join(iter_pdf_pages(file_path))
+
+def extract_from_docx(file_path):
+    """Extract text from a DOCX file"""
+    return ''.join(iter_docx_paragraphs(file_path))
+
+def _detect_txt_encoding(file_path):
+    """Return 'utf-8' if the whole file decodes as UTF-8, else 'latin-1'"""
+    decoder = codecs.getincrementaldecoder('utf-8')()
     try:
         with open(file_path, 'rb') as file:
-            pdf_reader = PyPDF2.PdfReader(file)
-            
-            for page_num in range(len(pdf_reader.pages)):
-                page = pdf_reader.pages[page_num]
-                text += page.extract_text() + "\n"
-                
-        return text
+            for block in iter(lambda: file.read(TXT_BLOCK_SIZE), b''):
+                decoder.decode(block)
+            decoder.decode(b'', final=True)
+        return 'utf-8'
+    except UnicodeDecodeError:
+        # Fall back to a different encoding if UTF-8 fails
+        return 'latin-1'
+
+def iter_txt_blocks(file_path):
+    """Yield a plain text file in blocks"""
+    encoding = _detect_txt_encoding(file_path)
+    with open(file_path, 'r', encoding=encoding) as file:
+        for block in iter(lambda: file.read(TXT_BLOCK_SIZE), ''):
+            yield block
+
+def iter_pdf_pages(file_path):
+    """
+    Yield the text of a PDF one page at a time
+
+    Pages are extracted in a process pool whatever the document's size: a
+    page that hangs the parser can only be stopped in a process of its
+    own, and a job worker thread cannot use alarms.
+    """
+    try:
+        with open(file_path, 'rb') as file:
+            page_count = len(PyPDF2.PdfReader(file).pages)
+        
+        for page_text in _iter_pdf_pages_parallel(file_path, page_count):
+            yield page_text + "\n"
+    except ValueError:
+        raise
     except Exception as e:
         raise ValueError(f"Error extracting text from PDF: {str(e)}")
 
-def extract_from_docx(file_path):
-    """Extract text from a DOCX file"""
+def _get_pdf_executor():
+    global _pdf_executor
+    with _pdf_executor_lock:
+        if _pdf_executor is None:
+            # Spawn rather than fork: the parent runs Flask and job threads
+            _pdf_executor = ProcessPoolExecutor(
+                max_workers=PDF_EXTRACTION_WORKERS,
+                mp_context=multiprocessing.get_context('spawn'),
+            )
+        return _pdf_executor
+
+def _discard_pdf_executor(executor):
+    """Replace a pool whose worker hung: later extractions get a fresh pool and the old processes are killed"""
+    global _pdf_executor
+    with _pdf_executor_lock:
+        if _pdf_executor is executor:
+            _pdf_executor = None
+    # A busy worker cannot be stopped through the public API
+    processes = list((getattr(executor, '_processes', None) or {}).values())
+    executor.shutdown(wait=False, cancel_futures=True)
+    for process in processes:
+        process.terminate()
+
+def _iter_pdf_pages_parallel(file_path, page_count):
+    """Extract page ranges in a process pool, yielding page texts in order"""
+    executor = _get_pdf_executor()
+    ranges = [(start, min(start + PDF_PAGES_PER_TASK, page_count))
+              for start in range(0, page_count, PDF_PAGES_PER_TASK)]
+    logger.info(f"Extracting {page_count} PDF pages in {len(ranges)} ranges across {PDF_EXTRACTION_WORKERS} workers")
+    
+    # Keep a couple of ranges per worker in flight so memory stays bounded
+    max_in_flight = PDF_EXTRACTION_WORKERS * 2
+    pending = []
+    next_range = 0
+    retried = set()
+    
+    def submit(start, stop):
+        return executor.submit(_extract_page_range, file_path, start, stop, PDF_PAGE_TIMEOUT)
+    
+    def resubmit_pending():
+        # Ranges queued on a discarded pool start over on the current one
+        nonlocal executor
+        executor = _get_pdf_executor()
+        pending[:] = [(start, stop, submit(start, stop)) for start, stop, _ in pending]
+    
+    try:
+        while pending or next_range < len(ranges):
+            while next_range < len(ranges) and len(pending) < max_in_flight:
+                start, stop = ranges[next_range]
+                pending.append((start, stop, submit(start, stop)))
+                next_range += 1
+            
+            start, stop, future = pending.pop(0)
+            # Backstop for platforms where the per-page alarm is unavailable
+            range_timeout = PDF_PAGE_TIMEOUT * (stop - start) + PDF_PAGE_TIMEOUT
+            try:
+                pages = future.result(timeout=range_timeout)
+            except FutureTimeoutError:
+                logger.warning(f"PDF pages {start + 1}-{stop} timed out and were skipped")
+                pages = [''] * (stop - start)
+                # The hung worker would otherwise hold a pool process for later extractions
+                future.cancel()
+                _discard_pdf_executor(executor)
+                resubmit_pending()
+            except BrokenProcessPool:
+                # The pool lost a worker, e.g. another extraction discarded it after a timeout
+                if (start, stop) in retried:
+                    raise
+                retried.add((start, stop))
+                _discard_pdf_executor(executor)
+                resubmit_pending()
+                pending.insert(0, (start, stop, submit(start, stop)))
+                continue
+            yield from pages
+    finally:
+        for _, _, future in pending:
+            future.cancel()
+
+class _PageTimeout(Exception):
+    pass
+
+def _raise_page_timeout(signum, frame):
+    raise _PageTimeout()
+
+def _extract_page_range(file_path, start, stop, page_timeout):
+    """Extract pages [start, stop) of a PDF (runs in a worker process)"""
+    use_alarm = hasattr(signal, 'SIGALRM')
+    if use_alarm:
+        signal.signal(signal.SIGALRM, _raise_page_timeout)
+    
+    texts = []
+    with open(file_path, 'rb') as file:
+        pdf_reader = PyPDF2.PdfReader(file)
+        for page_num in range(start, stop):
+            try:
+                if use_alarm:
+                    signal.alarm(page_timeout)
+                texts.append(pdf_reader.pages[page_num].extract_text() or '')
+            except _PageTimeout:
+                logger.warning(f"PDF page {page_num + 1} timed out after {page_timeout}s and was skipped")
+                texts.append('')
+            finally:
+                if use_alarm:
+                    signal.alarm(0)
+    return texts
+
+def iter_docx_paragraphs(file_path):
+    """Yield the text of a DOCX one paragraph at a time"""
     try:
         doc = docx.Document(file_path)
-        full_text = []
         
-        for para in doc.paragraphs:
-            full_text.append(para.text)
-            
-        return '\n'.join(full_text)
+        for i, para in enumerate(doc.paragraphs):
+            yield para.text if i == 0 else '\n' + para.text
     except Exception as e:
-        raise ValueError(f"Error extracting text from DOCX: {str(e)}")
\ No newline at end of file
+        raise ValueError(f"Error extracting text from DOCX: {str(e)}")
+
+def prefetch(pieces, max_pieces=PREFETCH_PIECES):
+    """
+    Run an extraction generator on a background thread
+
+    At most max_pieces are buffered, so extraction stays ahead of the
+    consumer (e.g. synthesis) without holding the whole document in memory.
+    Exceptions raised during extraction are re-raised to the consumer.
+    """
+    buffer = queue.Queue(maxsize=max_pieces)
+    stop = threading.Event()
+    done = object()
+    
+    def put(item):
+        while not stop.is_set():
+            try:
+                buffer.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+    
+    def produce():
+        try:
+            for piece in pieces:
+                if not put(piece):
+                    return
+            put(done)
+        except Exception as e:
+            put(e)
+    
+    threading.Thread(target=produce, name="text-prefetch", daemon=True).start()
+    try:
+        while True:
+            item = buffer.get()
+            if item is done:
+                return
+            if isinstance(item, Exception):
+                raise item
+            yield item
+    finally:
+        stop.set()
+
+class TextStream:
+    """
+    Iterable over extracted text pieces that records what passed through
+
+    Keeps the running length, a SHA-256 digest and a short preview, and
+    remembers any extraction error so it can be told apart from TTS errors.
+    """
+    def __init__(self, pieces, preview_chars=1000):
+        self._pieces = iter(pieces)
+        self._pending = []
+        self.preview_chars = preview_chars
+        self.preview = ''
+        self.length = 0
+        self.error = None
+        self._digest = hashlib.sha256()
+    
+    def _next_piece(self):
+        try:
+            return next(self._pieces)
+        except StopIteration:
+            raise
+        except Exception as e:
+            self.error = e
+            raise
+    
+    def has_text(self):
+        """Read ahead until a non-blank piece is found; False if there is none"""
+        while True:
+            for piece in self._pending:
+                if piece.strip():
+                    return True
+            try:
+                self._pending.append(self._next_piece())
+            except StopIteration:
+                return False
+    
+    def __iter__(self):
+        while True:
+            if self._pending:
+                piece = self._pending.pop(0)
+            else:
+                try:
+                    piece = self._next_piece()
+                except StopIteration:
+                    return
+            self.length += len(piece)
+            self._digest.update(piece.encode('utf-8'))
+            if len(self.preview) < self.preview_chars:
+                self.preview += piece[:self.preview_chars - len(self.preview)]
+            yield piece
+    
+    def hexdigest(self):
+        return self._digest.hexdigest()
\ No newline at end of file
@@ -0,0 +1,179 @@
+"""
+Extracted text storage for the AI Accessibility Reader.
+Persists each document's text as UTF-8 next to its audio, with a small
+binary offsets table, so any slice (or page) can be read from a
+memory-mapped file without loading the whole document.
+"""
+
+import os
+import mmap
+import struct
+from array import array
+
+TEXT_SUFFIX = '.text'  # <file_id>.text: the extracted text, UTF-8
+TEXT_INDEX_SUFFIX = '.text.idx'  # <file_id>.text.idx: offsets table
+BLOCK_CHARS = 4096  # Characters between recorded byte offsets
+
+# Index layout: header, then one uint64 byte offset per block, then one
+# uint64 character offset per page start
+_MAGIC = b'RTX1'
+_HEADER = struct.Struct('<4sIQQII')  # magic, block chars, total chars, total bytes, blocks, pages
+_OFFSET = struct.Struct('<Q')
+
+
+class TextWriter:
+    """
+    Writes a document's text as it is extracted
+
+    Pieces are encoded and appended as they arrive, so only the offsets
+    table (8 bytes per BLOCK_CHARS characters, and per page) is kept in
+    memory. Nothing is visible under the final names until close().
+    """
+    def __init__(self, text_path, index_path, page_breaks=False, block_chars=BLOCK_CHARS):
+        self.text_path = text_path
+        self.index_path = index_path
+        self.page_breaks = page_breaks  # Each piece of text starts a page (PDF)
+        self.block_chars = block_chars
+        self.chars = 0
+        self.bytes = 0
+        self.closed = False
+        self._blocks = array('Q', [0])  # Byte offset of each block start
+        self._pages = array('Q')  # Character offset of each page start
+        self._file = open(f"{text_path}.tmp", 'wb')
+
+    def write(self, piece):
+        """Append the next piece of extracted text"""
+        if self.page_breaks:
+            self._pages.append(self.chars)
+        data = piece.encode('utf-8')
+        ascii_only = len(data) == len(piece)
+        # Record where each block boundary inside this piece falls in bytes
+        boundary = len(self._blocks) * self.block_chars
+        start = 0
+        offset = self.bytes
+        while boundary <= self.chars + len(piece):
+            cut = boundary - self.chars
+            offset += cut - start if ascii_only else len(piece[start:cut].encode('utf-8'))
+            self._blocks.append(offset)
+            start = cut
+            boundary += self.block_chars
+        self._file.write(data)
+        self.chars += len(piece)
+        self.bytes += len(data)
+
+    def track(self, pieces):
+        """Pass text pieces through, writing each one; closes the writer when they run out"""
+        for piece in pieces:
+            self.write(piece)
+            yield piece
+        self.close()
+
+    def close(self):
+        """Write the offsets table and publish both files"""
+        if self.closed:
+            return
+        self.closed = True
+        self._file.close()
+        with open(f"{self.index_path}.tmp", 'wb') as index_file:
+            index_file.write(_HEADER.pack(_MAGIC, self.block_chars, self.chars, self.bytes,
+                                          len(self._blocks), len(self._pages)))
+            for table in (self._blocks, self._pages):
+                index_file.write(struct.pack(f'<{len(table)}Q', *table))
+        os.replace(f"{self.text_path}.tmp", self.text_path)
+        os.replace(f"{self.index_path}.tmp", self.index_path)
+
+    def abort(self):
+        """Discard a partially written document"""
+        self.closed = True
+        self._file.close()
+        for path in (f"{self.text_path}.tmp", f"{self.index_path}.tmp"):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+
+class TextStore:
+    """Stored texts in a directory, read in slices"""
+    def __init__(self, directory):
+        self.directory = directory
+
+    def paths(self, document_id):
+        base = os.path.join(self.directory, document_id)
+        return base + TEXT_SUFFIX, base + TEXT_INDEX_SUFFIX
+
+    def writer(self, document_id, page_breaks=False):
+        text_path, index_path = self.paths(document_id)
+        return TextWriter(text_path, index_path, page_breaks=page_breaks)
+
+    def exists(self, document_id):
+        return all(os.path.exists(path) for path in self.paths(document_id))
+
+    def read(self, document_id, offset=0, limit=BLOCK_CHARS, page=None):
+        """
+        Read a slice of a stored text
+
+        Only the index header, two table entries and the requested bytes
+        are read, so the cost depends on limit, not on the document size.
+
+        Args:
+            document_id (str): Document (job) id
+            offset (int): First character to return
+            limit (int): Most characters to return
+            page (int, optional): Read from the start of this page (1-based)
+                instead of offset, stopping at its end
+
+        Returns:
+            dict: text, offset, next_offset (None at the end), total_chars,
+            pages and, with page, the page read
+
+        Raises:
+            FileNotFoundError: If no text is stored for document_id
+            ValueError: If offset, limit or page is out of range
+        """
+        text_path, index_path = self.paths(document_id)
+        with open(index_path, 'rb') as index_file:
+            magic, block_chars, total_chars, total_bytes, blocks, pages = \
+                _HEADER.unpack(index_file.read(_HEADER.size))
+            if magic != _MAGIC:
+                raise ValueError(f"Unrecognized text index for {document_id}")
+
+            def table(position):
+                index_file.seek(_HEADER.size + position * _OFFSET.size)
+                return _OFFSET.unpack(index_file.read(_OFFSET.size))[0]
+
+            end = total_chars
+            if page is not None:
+                if not 1 <= page <= pages:
+                    raise ValueError(f"Page {page} out of range (1-{pages})")
+                offset = table(blocks + page - 1)
+                end = table(blocks + page) if page < pages else total_chars
+            if offset < 0 or limit <= 0:
+                raise ValueError("offset must be >= 0 and limit > 0")
+            offset = min(offset, total_chars)
+            end = min(end, offset + limit)
+
+            # Byte range covering the blocks that hold [offset, end)
+            first_block = offset // block_chars
+            last_block = end // block_chars + 1
+            start_byte = table(first_block)
+            end_byte = table(last_block) if last_block < blocks else total_bytes
+
+        text = ''
+        if end > offset:
+            with open(text_path, 'rb') as text_file:
+                with mmap.mmap(text_file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                    window = data[start_byte:end_byte].decode('utf-8')
+            skip = offset - first_block * block_chars
+            text = window[skip:skip + end - offset]
+
+        result = {
+            'text': text,
+            'offset': offset,
+            'next_offset': end if end < total_chars else None,
+            'total_chars': total_chars,
+            'pages': pages or None,
+        }
+        if page is not None:
+            result['page'] = page
+        return result
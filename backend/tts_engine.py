@@ -9,43 +9,452 @@ import logging
 import platform
 import subprocess
 import sys
+import threading
+import time
+import contextlib
+from collections import deque
+from itertools import islice
 from pathlib import Path
+from audio_cache import ChunkCache, make_key
+from synthesis_pool import SynthesisPool
+from pyttsx3_pool import Pyttsx3DriverPool
+from audio_assembly import AudioAssembler, write_wav
+from audio_processing import PostProcessor, numpy_available
+from capabilities import CapabilityRegistry
+from storage_manager import CHUNK_TEMP_PREFIX
+from engine_registry import EngineRegistry, EngineUnavailable
+from checkpoint import CheckpointStore
+from scheduler import ChunkScheduler
+import segmenter
+import metrics
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# Global TTS engine instance
-current_tts_engine = None
+# Default engine: the first registered engine that initializes
 current_engine_type = None
 
+# Initialization state, reported separately from liveness
+ENGINE_PENDING = 'pending'
+ENGINE_INITIALIZING = 'initializing'
+ENGINE_READY = 'ready'
+ENGINE_FAILED = 'failed'
+engine_state = ENGINE_PENDING
+engine_error = None
+_init_lock = threading.Lock()
+_warmup_thread = None
+_warming_up = False  # Survives fork, unlike the thread's liveness
+
+# Persistent cache of synthesized chunks shared by all engines
+CHUNK_CACHE_DIR = os.path.join(os.getcwd(), "chunk_cache")
+CHUNK_CACHE_MAX_BYTES = 2 * 1024 ** 3
+chunk_cache = ChunkCache(CHUNK_CACHE_DIR, CHUNK_CACHE_MAX_BYTES)
+
+# Chunk audio of unfinished conversions, kept so a retry resumes where the last attempt stopped
+CHECKPOINT_DIR = os.path.join(os.getcwd(), "checkpoints")
+checkpoints = CheckpointStore(CHECKPOINT_DIR)
+
+# Attempts per chunk (or batch) beyond the first before the conversion fails
+CHUNK_RETRIES = 2
+CHUNK_RETRY_DELAY = 1.0  # Seconds before the first retry; doubles on each further retry
+
+# Post-processing of chunk audio before encoding (needs NumPy; skipped without it)
+AUDIO_TRIM_SILENCE = True  # Trim the silence engines leave around each chunk
+AUDIO_NORMALIZE_LOUDNESS = True  # Even out loudness between chunks
+
+# Parallel synthesis for offline engines (0 or 1 keeps synthesis in-process)
+SYNTHESIS_WORKERS = 0
+SYNTHESIS_MAX_IN_FLIGHT = None  # Chunks queued to the pool at once (default: 2 per worker)
+SYNTHESIS_WORKER_MEMORY_MB = None  # Address-space limit per worker process
+# 'fork' shares the parent's loaded model copy-on-write instead of reloading it per worker
+SYNTHESIS_START_METHOD = 'spawn'
+
+# Persistent pyttsx3 drivers kept alive between chunks
+PYTTSX3_DRIVERS = 2
+PYTTSX3_CHUNK_TIMEOUT = 120  # Seconds before a stuck driver is recycled
+
+# Installed engines and connectivity, refreshed in the background
+CAPABILITY_TTL = 60  # Seconds between refreshes
+CONNECTIVITY_PROBE_TIMEOUT = 3
+capabilities = CapabilityRegistry(ttl=CAPABILITY_TTL, probe_timeout=CONNECTIVITY_PROBE_TIMEOUT)
+
+# Conversions take turns chunk by chunk: shortest remaining text first, with aging
+SYNTHESIS_SLOTS = 2  # Chunks synthesized at once across all conversions
+SCHEDULER_AGING = 10000  # Characters of remaining text forgiven per second a conversion waits
+SCHEDULER_MAX_TURNS_PER_CLIENT = 1  # Slots one client holds while another client waits
+scheduler = ChunkScheduler(slots=SYNTHESIS_SLOTS, aging=SCHEDULER_AGING,
+                           max_turns_per_client=SCHEDULER_MAX_TURNS_PER_CLIENT)
+
+# Per-engine concurrency (instances loaded at once) and spillover
+PYTTSX3_CONCURRENCY = 4  # Conversions in progress; the scheduler bounds actual synthesis
+GTTS_CONCURRENCY = 4  # Network-bound; instances are cheap
+COQUI_CONCURRENCY = 1  # Each instance holds a model in memory
+ENGINE_MAX_WAITING = 2  # Conversions queued on the default engine before others spill over
+WARM_SPILLOVER_ENGINES = True  # Load secondary engines after the default, so they can take overflow
+
+# Batched inference (Coqui); a window of this many batches is length-bucketed together
+COQUI_BATCH_SIZE = 4
+BATCH_WINDOW_BATCHES = 2
+
 class TTSEngine:
     """Base class for TTS engines"""
+    name = None
+    supports_parallel = False  # Whether chunks can be synthesized in worker processes
+    max_chars = 500  # Longest chunk handed to the engine
+    chunk_extension = ".wav"  # Format the engine writes chunks in
+    batch_size = 1  # Chunks per _synthesize_batch call when running in-process
+    models = None  # Models a request may choose from, if the engine offers a choice
+    voice_selection = False  # Whether a request may choose the voice
+    requires_network = False
+    
     def __init__(self):
         self.initialized = False
+        self.pool = None
+        self.requested_model = None
+        self.requested_voice = None
+    
+    @classmethod
+    def capabilities(cls):
+        """Declared features, used to validate per-request engine selection"""
+        return {
+            "models": cls.models,
+            "voice_selection": cls.voice_selection,
+            "requires_network": cls.requires_network,
+            "max_chars": cls.max_chars,
+            "parallel": cls.supports_parallel,
+            "batch_size": cls.batch_size,
+        }
+    
+    def configure(self, model=None, voice=None):
+        """Choose a model and voice; called before initialize()"""
+        self.requested_model = model
+        self.requested_voice = voice
     
     def initialize(self):
         raise NotImplementedError
     
-    def text_to_speech(self, text, output_path):
+    def text_to_speech(self, text, output_path, progress_callback=None, segment_callback=None, bitrate=None,
+                       checkpoint_key=None, alignment=None, ticket=None, speed=1.0):
+        if isinstance(text, str):
+            with metrics.time_stage('chunk', self.name):
+                chunks = self._split_text(text, max_chars=self.max_chars)
+            chunks_total = len(chunks)
+        else:
+            # Streamed text: the total grows as extraction produces more chunks
+            chunks = self._iter_chunks(text)
+            chunks_total = None
+        
+        produced = 0
+        characters = 0
+        # A streamed conversion is scheduled on an estimate; packed text refines it
+        estimate = ticket.done + ticket.remaining if ticket is not None and chunks_total is None else None
+        def counted(chunk_iter):
+            nonlocal produced, characters
+            for chunk in chunk_iter:
+                produced += 1
+                characters += len(chunk)
+                if estimate is not None:
+                    ticket.update(max(estimate, characters))
+                yield chunk
+            if estimate is not None:
+                ticket.update(characters)  # Extraction has ended, so the total is exact
+        
+        # With a checkpoint, chunk audio outlives a failed attempt; otherwise it is temporary
+        checkpoint = self._open_checkpoint(checkpoint_key) if checkpoint_key else None
+        if checkpoint is not None:
+            chunk_dir = contextlib.nullcontext(checkpoint.directory)
+        else:
+            chunk_dir = tempfile.TemporaryDirectory(prefix=CHUNK_TEMP_PREFIX)
+        
+        processor = post_processor(speed)
+        synthesis_time = 0.0
+        assembly_time = 0.0
+        succeeded = False
+        try:
+            with chunk_dir as temp_dir:
+                # Chunks are encoded into the output as they finish, never held in memory together
+                with AudioAssembler(output_path, bitrate=bitrate, processor=processor) as assembler:
+                    synthesized = self._synthesize_chunks(counted(chunks), temp_dir, self.chunk_extension,
+                                                          checkpoint, ticket)
+                    waited_from = time.perf_counter()
+                    turn_waits = ticket.waited if ticket is not None else 0.0
+                    for i, chunk, chunk_path in synthesized:
+                        # Time until the next chunk arrives covers synthesis (and, when streaming,
+                        # extraction) but not waiting for a turn behind other conversions
+                        chunk_time = time.perf_counter() - waited_from
+                        if ticket is not None:
+                            chunk_time -= ticket.waited - turn_waits
+                            turn_waits = ticket.waited
+                        synthesis_time += chunk_time
+                        metrics.chunk_seconds.observe(chunk_time, engine=self.name)
+                        
+                        if ticket is not None:
+                            ticket.consumed(len(chunk))
+                        
+                        started = time.perf_counter()
+                        pcm_start = assembler.data_bytes
+                        if os.path.exists(chunk_path) and os.path.getsize(chunk_path) > 0:
+                            if checkpoint is not None:
+                                checkpoint.mark_done(i, chunk)
+                            assembler.append(chunk_path)
+                            if segment_callback:
+                                segment_callback(i, chunk_path, assembler.last_audio)
+                        if alignment is not None:
+                            alignment.add_chunk(chunk, pcm_start, assembler.data_bytes)
+                        if progress_callback:
+                            progress_callback(i + 1, chunks_total or produced)
+                        waited_from = time.perf_counter()
+                        assembly_time += waited_from - started
+                    
+                    if assembler.chunks == 0:
+                        raise RuntimeError("No audio segments were generated")
+                    
+                    started = time.perf_counter()
+                    assembler.close()
+                    assembly_time += time.perf_counter() - started
+                    if alignment is not None:
+                        alignment.finish(assembler.params, assembler.byte_offset, assembler.byte_offsets)
+            succeeded = True
+        finally:
+            if checkpoint is not None:
+                if checkpoint.restored:
+                    logger.info(f"Resumed {checkpoint.restored} chunks from an earlier attempt")
+                    metrics.chunks_resumed_total.inc(checkpoint.restored, engine=self.name)
+                checkpoints.release(checkpoint, keep=not succeeded)
+        
+        self._record_metrics(produced, characters, synthesis_time, assembly_time, assembler)
+        if processor is not None and processor.frames_in:
+            frame_rate = assembler.params[2]
+            metrics.silence_trimmed_seconds_total.inc(processor.trimmed_frames / frame_rate, engine=self.name)
+            metrics.postprocessed_seconds_total.inc(processor.frames_in / frame_rate, engine=self.name,
+                                                    direction='in')
+            metrics.postprocessed_seconds_total.inc(processor.frames_out / frame_rate, engine=self.name,
+                                                    direction='out')
+    
+    def _in_turn(self, ticket, func):
+        """
+        func wrapped to hold one of the scheduler's synthesis slots while it
+        runs, so conversions interleave; only synthesis itself takes a turn,
+        not extraction, cache hits or retry backoff
+        """
+        if ticket is None:
+            return func
+        def run(*args):
+            with ticket.turn():
+                return func(*args)
+        return run
+    
+    def _open_checkpoint(self, checkpoint_key):
+        """Checkpoint for this engine's conversion of checkpoint_key, or None if unavailable"""
+        # Everything that changes chunk boundaries or chunk audio selects a different checkpoint
+        header = {
+            "engine": self.name,
+            "settings": self.voice_settings(),
+            "max_chars": self.max_chars,
+            "extension": self.chunk_extension,
+        }
+        checkpoint = checkpoints.open(checkpoint_key, header)
+        if checkpoint is None:
+            logger.info("Checkpoint busy; converting without one")
+        return checkpoint
+    
+    def _record_metrics(self, chunks, characters, synthesis_time, assembly_time, assembler):
+        metrics.stage_seconds.observe(synthesis_time, stage='synthesize', engine=self.name)
+        metrics.stage_seconds.observe(assembly_time, stage='assemble', engine=self.name)
+        metrics.chunks_total.inc(chunks, engine=self.name)
+        metrics.characters_total.inc(characters, engine=self.name)
+        if synthesis_time > 0:
+            metrics.synthesis_chars_per_second.observe(characters / synthesis_time, engine=self.name)
+        channels, sample_width, frame_rate = assembler.params
+        audio_seconds = assembler.data_bytes / (channels * sample_width * frame_rate)
+        metrics.audio_seconds_total.inc(audio_seconds, engine=self.name)
+        if audio_seconds > 0:
+            metrics.real_time_factor.observe(synthesis_time / audio_seconds, engine=self.name)
+    
+    def _split_text(self, text, max_chars):
+        return segmenter.split_text(text, max_chars)
+    
+    def _iter_chunks(self, pieces):
+        """Chunk text that arrives in pieces (e.g. PDF pages) as it is produced"""
+        return segmenter.iter_chunks(pieces, self.max_chars)
+    
+    def _synthesize_chunk(self, chunk, output_path):
         raise NotImplementedError
+    
+    def _synthesize_batch(self, chunks, output_paths):
+        """Synthesize several chunks at once; engines with batched inference override this"""
+        for chunk, output_path in zip(chunks, output_paths):
+            self._synthesize_chunk(chunk, output_path)
+    
+    def voice_settings(self):
+        """Settings that change the produced audio (part of the chunk cache key)"""
+        return {}
+    
+    def load_for_worker(self, settings):
+        """Prepare a copy of this engine inside a synthesis worker process"""
+        if not self.initialize():
+            raise RuntimeError(f"{self.name} engine failed to initialize in worker")
+    
+    def reset_after_fork(self):
+        """Drop per-process resources (threads, pools) inherited through fork"""
+        self.pool = None
+    
+    def close(self):
+        """Release resources owned by this instance (shared ones belong to its registry variant)"""
+        self.pool = None
+    
+    def _synthesize_chunks(self, chunks, temp_dir, extension, checkpoint=None, ticket=None):
+        """
+        Synthesize chunks into temp_dir, yielding (index, chunk, path) in order
+
+        chunks may be any iterable, including a lazy stream. Runs in-process
+        unless a synthesis pool is attached, in which case cache misses are
+        spread across the pool's worker processes. Chunks completed by an
+        earlier attempt (per checkpoint) are reused as they are. With a
+        scheduler ticket, each synthesis call waits for its turn.
+        """
+        def chunk_path(i):
+            return os.path.join(temp_dir, f"chunk_{i}{extension}")
+        
+        if self.pool is None and self.batch_size > 1:
+            yield from self._synthesize_batched(chunks, chunk_path, checkpoint, ticket)
+            return
+        
+        if self.pool is None:
+            for i, chunk in enumerate(chunks):
+                self._synthesize_cached(i, chunk, chunk_path(i), checkpoint, ticket)
+                yield i, chunk, chunk_path(i)
+            return
+        
+        settings = self.voice_settings()
+        pending = deque()  # (index, chunk, path, cache key, future or None for reused audio)
+        try:
+            for i, chunk in enumerate(chunks):
+                path = chunk_path(i)
+                key = make_key(chunk, self.name, settings)
+                future = None
+                if not self._reuse(i, chunk, key, path, checkpoint):
+                    future = self.pool.submit(chunk, path)
+                pending.append((i, chunk, path, key, future))
+                
+                # Hand back finished chunks in order, bounding outstanding work
+                while pending and (pending[0][4] is None or len(pending) >= self.pool.max_in_flight):
+                    yield self._collect_pooled(pending.popleft(), ticket)
+            
+            while pending:
+                yield self._collect_pooled(pending.popleft(), ticket)
+        finally:
+            for _, _, _, _, future in pending:
+                if future is not None:
+                    future.cancel()
+    
+    def _reuse(self, i, chunk, key, path, checkpoint):
+        """Put existing audio for chunk i at path, from the checkpoint or the chunk cache"""
+        if checkpoint is not None and checkpoint.restore(i, chunk, path):
+            return True
+        return chunk_cache.fetch(key, path)
+    
+    def _with_retries(self, description, func, *args):
+        """Call func(*args), retrying with backoff so one failure does not fail the document"""
+        for attempt in range(CHUNK_RETRIES + 1):
+            try:
+                return func(*args)
+            except Exception as e:
+                if attempt == CHUNK_RETRIES:
+                    raise
+                delay = CHUNK_RETRY_DELAY * 2 ** attempt
+                logger.warning(f"{self.name}: {description} failed ({str(e)}); retrying in {delay:.1f}s")
+                metrics.chunk_retries_total.inc(engine=self.name)
+                time.sleep(delay)
+    
+    def _synthesize_batched(self, chunks, chunk_path, checkpoint=None, ticket=None):
+        """
+        Synthesize cache misses in batches, yielding (index, chunk, path) in order
+
+        Chunks are taken a window at a time; within a window the misses are
+        sorted by length so each batch pads as little as possible.
+        """
+        settings = self.voice_settings()
+        window_size = self.batch_size * BATCH_WINDOW_BATCHES
+        chunk_iter = enumerate(chunks)
+        
+        while True:
+            window = list(islice(chunk_iter, window_size))
+            if not window:
+                return
+            
+            misses = []
+            for i, chunk in window:
+                key = make_key(chunk, self.name, settings)
+                if not self._reuse(i, chunk, key, chunk_path(i), checkpoint):
+                    misses.append((len(chunk), i, chunk, key))
+            
+            misses.sort(key=lambda miss: (miss[0], miss[1]))
+            for b in range(0, len(misses), self.batch_size):
+                batch = misses[b:b + self.batch_size]
+                self._with_retries(f"batch of {len(batch)} chunks", self._in_turn(ticket, self._synthesize_batch),
+                                   [chunk for _, _, chunk, _ in batch],
+                                   [chunk_path(i) for _, i, _, _ in batch])
+                for _, i, _, key in batch:
+                    path = chunk_path(i)
+                    if os.path.exists(path) and os.path.getsize(path) > 0:
+                        chunk_cache.store(key, path)
+            
+            for i, chunk in window:
+                yield i, chunk, chunk_path(i)
+    
+    def _collect_pooled(self, entry, ticket=None):
+        i, chunk, path, key, future = entry
+        if future is not None:
+            try:
+                self._in_turn(ticket, future.result)()
+            except Exception as e:
+                # Resubmit just this chunk; a crashed worker is replaced by the pool
+                logger.warning(f"{self.name}: chunk {i} failed in a worker ({str(e)})")
+                self._with_retries(f"chunk {i}", self._in_turn(ticket, lambda: self.pool.submit(chunk, path).result()))
+            if os.path.exists(path) and os.path.getsize(path) > 0:
+                chunk_cache.store(key, path)
+        return i, chunk, path
+    
+    def _synthesize_cached(self, i, chunk, output_path, checkpoint=None, ticket=None):
+        """Synthesize a chunk into output_path, reusing earlier or cached audio when possible"""
+        key = make_key(chunk, self.name, self.voice_settings())
+        if self._reuse(i, chunk, key, output_path, checkpoint):
+            return
+        
+        self._with_retries(f"chunk {i}", self._in_turn(ticket, self._synthesize_chunk), chunk, output_path)
+        
+        if os.path.exists(output_path) and os.path.getsize(output_path) > 0:
+            chunk_cache.store(key, output_path)
 
 class GTTSEngine(TTSEngine):
     """Google Text-to-Speech (requires internet)"""
+    name = "gTTS"
+    max_chars = 5000  # gTTS has character limits
+    chunk_extension = ".mp3"
+    voice_selection = True  # Voice is a language code, e.g. "en", "fr"
+    requires_network = True
+    
     def __init__(self):
         super().__init__()
         self.gtts = None
+        self.lang = 'en'
+        self.slow = False
     
     def initialize(self):
         try:
             from gtts import gTTS
-            import requests
             
-            # Test internet connection
-            requests.get("https://www.google.com", timeout=5)
+            # Skip the test synthesis when we already know we are offline
+            if capabilities.is_online(wait=True) is False:
+                logger.warning("gTTS initialization skipped: no internet connection")
+                return False
+            
+            self.lang = self.requested_voice or 'en'
             
             # Test gTTS with a simple phrase
-            test_tts = gTTS(text="test", lang='en')
+            test_tts = gTTS(text="test", lang=self.lang)
             with tempfile.NamedTemporaryFile(suffix='.mp3', delete=True) as temp_file:
                 test_tts.save(temp_file.name)
                 if os.path.exists(temp_file.name) and os.path.getsize(temp_file.name) > 0:
@@ -57,56 +466,30 @@ class GTTSEngine(TTSEngine):
             return False
         return False
     
-    def text_to_speech(self, text, output_path):
+    def _synthesize_chunk(self, chunk, output_path):
         from gtts import gTTS
-        from pydub import AudioSegment
-        
-        # Split text into chunks (gTTS has character limits)
-        chunks = self._split_text(text, max_chars=5000)
-        audio_segments = []
         
-        with tempfile.TemporaryDirectory() as temp_dir:
-            for i, chunk in enumerate(chunks):
-                temp_path = os.path.join(temp_dir, f"chunk_{i}.mp3")
-                tts = gTTS(text=chunk, lang='en', slow=False)
-                tts.save(temp_path)
-                audio_segments.append(AudioSegment.from_mp3(temp_path))
-            
-            # Combine segments
-            final_audio = sum(audio_segments)
-            final_audio.export(output_path, format="mp3", bitrate="192k")
+        tts = gTTS(text=chunk, lang=self.lang, slow=self.slow)
+        tts.save(output_path)
     
-    def _split_text(self, text, max_chars=5000):
-        if len(text) <= max_chars:
-            return [text]
-        
-        chunks = []
-        sentences = text.replace('\n', ' ').split('.')
-        current_chunk = ""
-        
-        for sentence in sentences:
-            sentence = sentence.strip()
-            if not sentence:
-                continue
-            sentence += '.'
-            
-            if len(current_chunk) + len(sentence) > max_chars:
-                if current_chunk.strip():
-                    chunks.append(current_chunk.strip())
-                current_chunk = sentence
-            else:
-                current_chunk += " " + sentence if current_chunk else sentence
-        
-        if current_chunk.strip():
-            chunks.append(current_chunk.strip())
-        
-        return chunks or [text[:max_chars]]
+    def voice_settings(self):
+        return {"lang": self.lang, "slow": self.slow}
 
 class PytttsxEngine(TTSEngine):
     """Offline TTS using pyttsx3 (system TTS)"""
+    name = "pyttsx3"
+    supports_parallel = True
+    max_chars = 1000
+    voice_selection = True  # Matched against system voice ids and names
+    
     def __init__(self):
         super().__init__()
         self.engine = None
+        self.drivers = None
+        self._drivers_lock = threading.Lock()
+        self.voice_id = None
+        self.rate = 200  # Speed of speech
+        self.volume = 0.9  # Volume level (0.0 to 1.0)
     
     def initialize(self):
         try:
@@ -116,22 +499,31 @@ class PytttsxEngine(TTSEngine):
             
             # Configure engine
             voices = self.engine.getProperty('voices')
+            if self.requested_voice:
+                wanted = self.requested_voice.lower()
+                matches = [voice for voice in voices or []
+                           if wanted in voice.id.lower() or wanted in voice.name.lower()]
+                if not matches:
+                    logger.warning(f"pyttsx3 has no voice matching '{self.requested_voice}'")
+                    return False
+                voices = matches
             if voices:
                 # Try to find an English voice
                 english_voice = None
                 for voice in voices:
-                    if 'en' in voice.id.lower() or 'english' in voice.name.lower():
+                    if self.requested_voice or 'en' in voice.id.lower() or 'english' in voice.name.lower():
                         english_voice = voice
                         break
                 
                 if english_voice:
-                    self.engine.setProperty('voice', english_voice.id)
+                    self.voice_id = english_voice.id
                 else:
-                    self.engine.setProperty('voice', voices[0].id)
+                    self.voice_id = voices[0].id
+                self.engine.setProperty('voice', self.voice_id)
             
             # Set speech rate and volume
-            self.engine.setProperty('rate', 200)  # Speed of speech
-            self.engine.setProperty('volume', 0.9)  # Volume level (0.0 to 1.0)
+            self.engine.setProperty('rate', self.rate)
+            self.engine.setProperty('volume', self.volume)
             
             # Test the engine
             with tempfile.NamedTemporaryFile(suffix='.wav', delete=True) as temp_file:
@@ -148,142 +540,88 @@ class PytttsxEngine(TTSEngine):
             return False
         return False
     
-    def text_to_speech(self, text, output_path):
-        import pyttsx3
-        import shutil
-        
-        # For Windows without ffmpeg, save directly as WAV and convert to MP3 manually
-        try:
-            from pydub import AudioSegment
-            has_pydub = True
-        except:
-            has_pydub = False
-        
-        # Split text into manageable chunks
-        chunks = self._split_text(text, max_chars=1000)
-        
-        with tempfile.TemporaryDirectory() as temp_dir:
-            wav_files = []
-            
-            for i, chunk in enumerate(chunks):
-                wav_path = os.path.join(temp_dir, f"chunk_{i}.wav")
-                
-                # Create a new engine instance for each chunk
-                engine = pyttsx3.init()
-                
-                # Configure engine
-                voices = engine.getProperty('voices')
-                if voices:
-                    english_voice = None
-                    for voice in voices:
-                        if 'en' in voice.id.lower() or 'english' in voice.name.lower():
-                            english_voice = voice
-                            break
-                    if english_voice:
-                        engine.setProperty('voice', english_voice.id)
-                    else:
-                        engine.setProperty('voice', voices[0].id)
-                
-                engine.setProperty('rate', 200)
-                engine.setProperty('volume', 0.9)
-                
-                # Generate audio
-                engine.save_to_file(chunk, wav_path)
-                engine.runAndWait()
-                engine.stop()
-                
-                if os.path.exists(wav_path) and os.path.getsize(wav_path) > 0:
-                    wav_files.append(wav_path)
-            
-            if not wav_files:
-                raise RuntimeError("No audio segments were generated")
-            
-            # Try to combine with pydub if available, otherwise just copy the first file
-            if has_pydub and len(wav_files) > 1:
-                try:
-                    # Try to combine segments
-                    audio_segments = [AudioSegment.from_wav(f) for f in wav_files]
-                    final_audio = sum(audio_segments)
-                    
-                    # Try to export as MP3, fallback to WAV
-                    try:
-                        final_audio.export(output_path, format="mp3", bitrate="192k")
-                    except:
-                        # If MP3 export fails, save as WAV
-                        wav_output = output_path.replace('.mp3', '.wav')
-                        final_audio.export(wav_output, format="wav")
-                        # Rename to requested path
-                        if wav_output != output_path:
-                            shutil.move(wav_output, output_path)
-                except Exception as e:
-                    logger.warning(f"Pydub processing failed: {e}, falling back to single file")
-                    # Just copy the first WAV file
-                    shutil.copy2(wav_files[0], output_path)
-            else:
-                # Just copy the first (or only) WAV file
-                shutil.copy2(wav_files[0], output_path)
-    
-    def _split_text(self, text, max_chars=1000):
-        if len(text) <= max_chars:
-            return [text]
-        
-        chunks = []
-        sentences = text.replace('\n', ' ').split('.')
-        current_chunk = ""
-        
-        for sentence in sentences:
-            sentence = sentence.strip()
-            if not sentence:
-                continue
-            sentence += '.'
-            
-            if len(current_chunk) + len(sentence) > max_chars:
-                if current_chunk.strip():
-                    chunks.append(current_chunk.strip())
-                current_chunk = sentence
-            else:
-                current_chunk += " " + sentence if current_chunk else sentence
-        
-        if current_chunk.strip():
-            chunks.append(current_chunk.strip())
-        
-        return chunks or [text[:max_chars]]
+    def _synthesize_chunk(self, chunk, output_path):
+        # Reuse pre-configured drivers instead of re-initializing per chunk
+        with self._drivers_lock:
+            if self.drivers is None:
+                self.drivers = Pyttsx3DriverPool(
+                    PYTTSX3_DRIVERS, self.voice_id, self.rate, self.volume,
+                    timeout=PYTTSX3_CHUNK_TIMEOUT
+                )
+        self.drivers.synthesize(chunk, output_path)
+    
+    def voice_settings(self):
+        return {"voice": self.voice_id, "rate": self.rate, "volume": self.volume}
+    
+    def reset_after_fork(self):
+        super().reset_after_fork()
+        # Driver threads do not survive fork; the child builds its own
+        self.drivers = None
+        self._drivers_lock = threading.Lock()
+    
+    def close(self):
+        super().close()
+        with self._drivers_lock:
+            if self.drivers is not None:
+                self.drivers.close()
+                self.drivers = None
+    
+    def load_for_worker(self, settings):
+        self.voice_id = settings["voice"]
+        self.rate = settings["rate"]
+        self.volume = settings["volume"]
+        self.initialized = True
 
 class CoquiTTSEngine(TTSEngine):
     """Coqui TTS (your original engine)"""
+    name = "Coqui"
+    supports_parallel = True
+    batch_size = COQUI_BATCH_SIZE
+    # VITS models first: only they synthesize a batch in one padded pass
+    models = [
+        "tts_models/en/ljspeech/vits",
+        "tts_models/en/ljspeech/tacotron2-DDC",
+        "tts_models/en/ljspeech/glow-tts",
+        "tts_models/en/vctk/vits"
+    ]
+    voice_selection = True  # Speaker of a multi-speaker model, e.g. "p225"
+    
     def __init__(self):
         super().__init__()
         self.tts_model = None
+        self.model_name = None
+        self.speaker = None
+        self._batching_supported = None  # Decided on first batch
     
     def initialize(self):
         try:
             from TTS.api import TTS
-            import requests
-            
-            # Check internet connection
-            requests.get("https://www.google.com", timeout=5)
             
             # Create cache directory
             cache_dir = os.path.join(os.getcwd(), "tts_cache")
             os.makedirs(cache_dir, exist_ok=True)
             
-            # Try different models
-            models = [
-                "tts_models/en/ljspeech/tacotron2-DDC",
-                "tts_models/en/ljspeech/glow-tts",
-                "tts_models/en/vctk/vits"
-            ]
+            # Try the requested model, or each model in turn
+            models = [self.requested_model] if self.requested_model else self.models
             
             for model_name in models:
                 try:
                     logger.info(f"Trying Coqui model: {model_name}")
                     self.tts_model = TTS(model_name=model_name, progress_bar=True, cache_dir=cache_dir)
                     
+                    # Multi-speaker models need a speaker; default to the first
+                    speakers = getattr(self.tts_model, "speakers", None) or []
+                    self.speaker = self.requested_voice or (speakers[0] if speakers else None)
+                    if self.speaker and self.speaker not in speakers:
+                        raise ValueError(f"model has no speaker '{self.speaker}'")
+                    
                     # Test the model
                     with tempfile.NamedTemporaryFile(suffix='.wav', delete=True) as temp_file:
-                        self.tts_model.tts_to_file(text="Hello test", file_path=temp_file.name)
+                        self.tts_model.tts_to_file(text="Hello test", file_path=temp_file.name,
+                                                   **self._speaker_kwargs())
                         if os.path.exists(temp_file.name) and os.path.getsize(temp_file.name) > 0:
                             self.initialized = True
+                            self.model_name = model_name
                             logger.info(f"Coqui TTS initialized with model: {model_name}")
                             return True
                 except Exception as e:
@@ -295,141 +633,344 @@ class CoquiTTSEngine(TTSEngine):
             return False
         return False
     
-    def text_to_speech(self, text, output_path):
-        from pydub import AudioSegment
+    def _synthesize_chunk(self, chunk, output_path):
+        self._synthesize_batch([chunk], [output_path])
+    
+    def _synthesize_batch(self, chunks, output_paths):
+        # Waveforms stay in memory and are written once, with no decode round-trip
+        sample_rate = self.tts_model.synthesizer.output_sample_rate
+        for waveform, output_path in zip(self._infer(chunks), output_paths):
+            write_wav(output_path, waveform, sample_rate)
+    
+    def _infer(self, chunks):
+        """Return one float waveform (NumPy array) per chunk"""
+        import numpy as np
         
-        chunks = self._split_text(text, max_chars=500)
-        audio_segments = []
+        if len(chunks) > 1 and self._batching_supported is not False:
+            try:
+                return self._infer_batched(chunks)
+            except Exception as e:
+                logger.warning(f"Batched Coqui inference unavailable, synthesizing per chunk: {str(e)}")
+                self._batching_supported = False
         
-        with tempfile.TemporaryDirectory() as temp_dir:
-            for i, chunk in enumerate(chunks):
-                wav_path = os.path.join(temp_dir, f"chunk_{i}.wav")
-                self.tts_model.tts_to_file(text=chunk, file_path=wav_path)
-                
-                if os.path.exists(wav_path) and os.path.getsize(wav_path) > 0:
-                    audio_segments.append(AudioSegment.from_wav(wav_path))
-            
-            final_audio = sum(audio_segments)
-            final_audio.export(output_path, format="mp3", bitrate="192k")
+        return [np.asarray(self.tts_model.tts(text=chunk, **self._speaker_kwargs()), dtype=np.float32)
+                for chunk in chunks]
+    
+    def _speaker_kwargs(self):
+        return {"speaker": self.speaker} if self.speaker else {}
     
-    def _split_text(self, text, max_chars=500):
-        if len(text) <= max_chars:
-            return [text]
+    def _infer_batched(self, chunks):
+        """Run several chunks through the model in one padded forward pass"""
+        import torch
         
-        chunks = []
-        sentences = text.replace('\n', ' ').split('.')
-        current_chunk = ""
+        model = self.tts_model.synthesizer.tts_model
+        # Only VITS accepts padded batches with per-item lengths
+        if type(model).__name__ != "Vits":
+            raise RuntimeError(f"{type(model).__name__} does not support batched inference")
         
-        for sentence in sentences:
-            sentence = sentence.strip()
-            if not sentence:
-                continue
-            sentence += '.'
-            
-            if len(current_chunk) + len(sentence) > max_chars:
-                if current_chunk.strip():
-                    chunks.append(current_chunk.strip())
-                current_chunk = sentence
-            else:
-                current_chunk += " " + sentence if current_chunk else sentence
+        device = next(model.parameters()).device
+        aux_input = {}
+        if getattr(model, "num_speakers", 0) > 1:
+            # Multi-speaker VITS (e.g. vctk) takes the speaker as an id per batch row
+            speaker_id = model.speaker_manager.name_to_id[self.speaker]
+            aux_input["speaker_ids"] = torch.full((len(chunks),), speaker_id, dtype=torch.long, device=device)
+        token_ids = [model.tokenizer.text_to_ids(chunk) for chunk in chunks]
+        lengths = torch.tensor([len(ids) for ids in token_ids], device=device)
+        padded = torch.zeros((len(chunks), int(lengths.max())), dtype=torch.long, device=device)
+        for row, ids in enumerate(token_ids):
+            padded[row, :len(ids)] = torch.tensor(ids, dtype=torch.long, device=device)
+        
+        with torch.no_grad():
+            outputs = model.inference(padded, aux_input=dict(aux_input, x_lengths=lengths))
         
-        if current_chunk.strip():
-            chunks.append(current_chunk.strip())
+        audio = outputs["model_outputs"].squeeze(1).cpu().numpy()
+        hop_length = model.config.audio.hop_length
+        sample_counts = outputs["y_mask"].sum(dim=(1, 2)).long().cpu().numpy() * hop_length
+        self._batching_supported = True
+        return [audio[row, :sample_counts[row]] for row in range(len(chunks))]
+    
+    def voice_settings(self):
+        settings = {"model": self.model_name}
+        if self.speaker:
+            settings["speaker"] = self.speaker
+        return settings
+    
+    def load_for_worker(self, settings):
+        from TTS.api import TTS
         
-        return chunks or [text[:max_chars]]
+        # Load the exact model the parent settled on, without probing or testing
+        cache_dir = os.path.join(os.getcwd(), "tts_cache")
+        self.model_name = settings["model"]
+        self.speaker = settings.get("speaker")
+        self.tts_model = TTS(model_name=self.model_name, progress_bar=False, cache_dir=cache_dir)
+        self.initialized = True
+
+def _prepare_instance(engine, variant):
+    """Attach the variant's shared synthesis process pool to a new engine instance"""
+    if SYNTHESIS_WORKERS > 1 and engine.supports_parallel:
+        if "synthesis_pool" not in variant.shared:
+            variant.shared["synthesis_pool"] = SynthesisPool(
+                type(engine), engine.voice_settings(), SYNTHESIS_WORKERS,
+                max_in_flight=SYNTHESIS_MAX_IN_FLIGHT,
+                max_worker_memory_mb=SYNTHESIS_WORKER_MEMORY_MB,
+                start_method=SYNTHESIS_START_METHOD,
+                preloaded_engine=engine
+            )
+        engine.pool = variant.shared["synthesis_pool"]
+
+# Engine plugins in order of preference (the first that initializes is the default)
+registry = EngineRegistry(prepare=_prepare_instance)
+registry.register(PytttsxEngine, max_concurrency=PYTTSX3_CONCURRENCY, max_waiting=ENGINE_MAX_WAITING)
+registry.register(GTTSEngine, max_concurrency=GTTS_CONCURRENCY, max_waiting=ENGINE_MAX_WAITING)
+# Loading another model for overflow would cost more memory than it saves in time
+registry.register(CoquiTTSEngine, max_concurrency=COQUI_CONCURRENCY, max_waiting=ENGINE_MAX_WAITING,
+                  spillover=False)
 
 def initialize_tts():
-    """Initialize TTS with multiple fallback engines"""
-    global current_tts_engine, current_engine_type
-    
-    # List of engines to try in order of preference
-    engines_to_try = [
-        ("pyttsx3", PytttsxEngine),
-        ("gTTS", GTTSEngine),
-        ("Coqui", CoquiTTSEngine),
-    ]
+    """Initialize TTS with multiple fallback engines (no-op if already initialized)"""
+    # Concurrent callers wait for the first initialization instead of repeating it
+    with _init_lock:
+        if engine_state == ENGINE_READY:
+            return
+        _initialize_tts_locked()
+
+def _initialize_tts_locked():
+    global current_engine_type, engine_state, engine_error
     
-    for engine_name, engine_class in engines_to_try:
+    engine_state = ENGINE_INITIALIZING
+    # Registered engines are tried in order of preference
+    for engine_name in registry.names():
         logger.info(f"Trying {engine_name} TTS engine...")
         try:
-            engine = engine_class()
-            if engine.initialize():
-                current_tts_engine = engine
-                current_engine_type = engine_name
-                logger.info(f"Successfully initialized {engine_name} TTS engine")
-                return
+            registry.warm_up(engine_name)
+            registry.default = engine_name
+            current_engine_type = engine_name
+            engine_state = ENGINE_READY
+            engine_error = None
+            logger.info(f"Successfully initialized {engine_name} TTS engine")
+            return
         except Exception as e:
             logger.warning(f"{engine_name} engine failed: {str(e)}")
             continue
     
-    raise RuntimeError("All TTS engines failed to initialize. Please check your system setup.")
+    engine_state = ENGINE_FAILED
+    engine_error = "All TTS engines failed to initialize. Please check your system setup."
+    raise RuntimeError(engine_error)
+
+def warm_spillover_engines():
+    """Load the remaining spillover-capable engines so they can absorb overflow"""
+    for slot_info in registry.describe():
+        name = slot_info["name"]
+        if name == current_engine_type or not slot_info["spillover"] or slot_info["state"] != "pending":
+            continue
+        try:
+            registry.warm_up(name)
+            logger.info(f"{name} engine ready for spillover")
+        except Exception as e:
+            logger.info(f"{name} engine not available for spillover: {str(e)}")
+
+def post_processor(speed=1.0):
+    """Chunk post-processing for one conversion, or None if there is nothing to do"""
+    processor = PostProcessor(trim=AUDIO_TRIM_SILENCE, normalize=AUDIO_NORMALIZE_LOUDNESS, speed=speed)
+    if not processor.active:
+        return None
+    if not numpy_available():
+        if speed != 1.0:
+            raise RuntimeError("Changing the speed needs NumPy, which is not installed")
+        logger.debug("NumPy is not installed; chunk audio is not post-processed")
+        return None
+    return processor
+
+def get_processing_settings():
+    """Post-processing steps applied to every conversion, as effectively configured"""
+    available = numpy_available()
+    return {
+        'trim_silence': AUDIO_TRIM_SILENCE and available,
+        'normalize_loudness': AUDIO_NORMALIZE_LOUDNESS and available,
+    }
+
+def start_background_initialization():
+    """Warm up the TTS engine on a background thread so no request waits for it (no-op while one runs)"""
+    global _warmup_thread, _warming_up
+    if _warmup_thread is not None and _warmup_thread.is_alive():
+        return _warmup_thread
+    
+    def warm_up():
+        global _warming_up
+        try:
+            initialize_tts()
+            logger.info(f"TTS engine warm-up complete: {get_current_engine()}")
+            if WARM_SPILLOVER_ENGINES:
+                warm_spillover_engines()
+        except Exception as e:
+            logger.error(f"TTS engine warm-up failed: {str(e)}")
+        finally:
+            _warming_up = False
+    
+    _warming_up = True
+    _warmup_thread = threading.Thread(target=warm_up, name="tts-warmup", daemon=True)
+    _warmup_thread.start()
+    return _warmup_thread
 
-def text_to_speech(text, output_path):
-    """Convert text to speech using the initialized engine"""
-    global current_tts_engine
+def _restart_warm_up_after_fork():
+    """
+    A worker forked mid warm-up (e.g. gunicorn --preload) inherits a held
+    init lock but not the thread holding it; start the warm-up over
+    """
+    global _init_lock, _warmup_thread, engine_state
+    if not _warming_up:
+        return
+    _init_lock = threading.Lock()
+    _warmup_thread = None
+    if engine_state == ENGINE_INITIALIZING:
+        engine_state = ENGINE_PENDING
+    start_background_initialization()
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_restart_warm_up_after_fork)
+
+def text_to_speech(text, output_path, progress_callback=None, segment_callback=None, bitrate=None,
+                   engine=None, model=None, voice=None, checkpoint_key=None, alignment=None, ticket=None,
+                   speed=1.0):
+    """
+    Convert text to speech using the initialized engine
+
+    Args:
+        text (str or iterable): Text to synthesize, or an iterable of text
+            pieces (e.g. from text_processor.iter_text) to synthesize as
+            they arrive
+        output_path (str): Where to write the audio file; its extension
+            selects the output format (.wav, .mp3, .opus, .flac)
+        progress_callback (callable, optional): Called as
+            progress_callback(chunks_done, chunks_total) after each chunk;
+            for streamed text chunks_total counts the chunks seen so far
+        segment_callback (callable, optional): Called as
+            segment_callback(index, chunk_path, audio) as soon as each
+            chunk's audio is written, for progressive streaming; audio is
+            (pcm, channels, sample_width, frame_rate) after post-processing,
+            or None when the chunk file was used unchanged
+        bitrate (str, optional): Target bitrate for lossy formats, e.g. "64k"
+        engine, model, voice (str, optional): Engine, model and voice to use;
+            by default the default engine, which may spill over to another
+            engine when busy
+        checkpoint_key (str, optional): Identifies the input (e.g. the
+            upload's content hash); completed chunks are kept under it when
+            the conversion fails, and the next conversion of the same input
+            with the same settings resumes from the first missing chunk
+        alignment (alignment.AlignmentBuilder, optional): Receives each
+            chunk's text and audio range, for the seek/highlight index; the
+            caller feeds it the extracted text
+        ticket (scheduler.Ticket, optional): Schedule slot from
+            scheduler.ticket(); each chunk then waits for its turn, so
+            shorter conversions overtake longer ones
+        speed (float, optional): Playback speed; chunks are time-stretched
+            (pitch unchanged) after synthesis, so cached chunk audio is reused
     
-    if not text or not text.strip():
+    Returns:
+        dict: Signature (engine name and voice settings) of the engine used
+    """
+    if isinstance(text, str) and (not text or not text.strip()):
         raise ValueError("No text provided for TTS conversion")
     
-    if current_tts_engine is None:
+    if engine_state != ENGINE_READY:
         logger.info("Initializing TTS engine...")
         initialize_tts()
     
-    if current_tts_engine is None:
-        raise RuntimeError("No TTS engine available")
-    
+    engine_name = engine or current_engine_type
     try:
-        logger.info(f"Converting text to speech using {current_engine_type} engine...")
-        logger.info(f"Text length: {len(text)} characters")
-        
-        current_tts_engine.text_to_speech(text, output_path)
+        with registry.acquire(engine, model, voice) as tts:
+            engine_name = tts.name
+            logger.info(f"Converting text to speech using {tts.name} engine...")
+            if isinstance(text, str):
+                logger.info(f"Text length: {len(text)} characters")
+            
+            tts.text_to_speech(text, output_path, progress_callback, segment_callback, bitrate,
+                               checkpoint_key=checkpoint_key, alignment=alignment, ticket=ticket, speed=speed)
+            signature = {"engine": tts.name, "settings": tts.voice_settings()}
         
         # Verify output file
         if os.path.exists(output_path) and os.path.getsize(output_path) > 0:
             logger.info(f"Audio saved successfully: {output_path} ({os.path.getsize(output_path)} bytes)")
         else:
             raise RuntimeError("Failed to create output audio file")
+        return signature
             
     except Exception as e:
-        logger.exception(f"TTS conversion failed with {current_engine_type} engine")
+        logger.exception(f"TTS conversion failed with {engine_name} engine")
         raise RuntimeError(f"Failed to convert text to speech: {str(e)}")
 
 def get_current_engine():
     """Get information about the current TTS engine"""
-    global current_engine_type, current_tts_engine
     return {
         "engine": current_engine_type,
-        "initialized": current_tts_engine is not None and current_tts_engine.initialized
+        "initialized": engine_state == ENGINE_READY
     }
 
-def get_available_engines():
-    """Get list of potentially available engines"""
-    available = []
-    
-    # Check pyttsx3
-    try:
-        import pyttsx3
-        available.append("pyttsx3 (offline)")
-    except ImportError:
-        pass
-    
-    # Check gTTS
-    try:
-        import gtts
-        import requests
-        requests.get("https://www.google.com", timeout=5)
-        available.append("gTTS (online)")
-    except:
-        pass
-    
-    # Check Coqui TTS
+def get_engine_status():
+    """Report readiness of the TTS engine without triggering initialization"""
+    return {
+        "state": engine_state,
+        "engine": current_engine_type,
+        "error": engine_error,
+    }
+
+def get_engines():
+    """Registered engines with their capabilities, limits, load and loaded variants"""
+    return registry.describe()
+
+def validate_selection(engine=None, model=None, voice=None):
+    """
+    Check a per-request engine/model/voice choice before queueing work
+
+    Raises:
+        ValueError: If the engine is unknown or does not offer the model or voice
+    """
     try:
-        import TTS
-        available.append("Coqui TTS (offline)")
-    except ImportError:
-        pass
-    
-    return available
+        registry.validate(engine, model, voice)
+    except EngineUnavailable as e:
+        raise ValueError(str(e))
+
+def get_engine_signature(initialize=False, engine=None, model=None, voice=None):
+    """
+    Identify an engine variant and the settings that shape its audio
+
+    Returns:
+        dict or None: None if the variant is not loaded yet (and initialize is False)
+    """
+    if engine_state != ENGINE_READY and initialize:
+        initialize_tts()
+    name = engine or current_engine_type
+    if name is None:
+        return None
+    settings = registry.settings(name, model, voice)
+    if settings is None and initialize and engine_state == ENGINE_READY:
+        try:
+            settings = registry.warm_up(name, model, voice)
+        except EngineUnavailable:
+            return None
+    if settings is None:
+        return None
+    return {"engine": registry.get(name).name, "settings": settings}
+
+def get_cache_stats():
+    """Get hit/miss counters and size of the chunk cache"""
+    return chunk_cache.stats()
+
+def get_scheduler_stats():
+    """Get synthesis slots in use and conversions waiting for a turn"""
+    return scheduler.stats()
+
+def get_checkpoint_stats():
+    """Get counts of stored and active conversion checkpoints and of resumed work"""
+    return checkpoints.stats()
+
+def get_available_engines():
+    """Get list of potentially available engines (cached; never blocks on the network)"""
+    return capabilities.available_engines()
+
+def get_capability_stats():
+    """Get the cached capability state and when it was last refreshed"""
+    return capabilities.stats()
 
 # Backward compatibility functions
 tts_model = None
@@ -439,27 +980,7 @@ def split_text_into_chunks(text, max_chars=500):
     if not text or not text.strip():
         return [""]
     
-    chunks = []
-    sentences = text.replace('\n', ' ').split('.')
-    current_chunk = ""
-    
-    for sentence in sentences:
-        sentence = sentence.strip()
-        if not sentence:
-            continue
-        sentence += '.'
-        
-        if len(current_chunk) + len(sentence) > max_chars:
-            if current_chunk.strip():
-                chunks.append(current_chunk.strip())
-            current_chunk = sentence
-        else:
-            current_chunk += " " + sentence if current_chunk else sentence
-    
-    if current_chunk.strip():
-        chunks.append(current_chunk.strip())
-    
-    return chunks or [text]
+    return segmenter.split_text(text, max_chars)
 
 if __name__ == "__main__":
     # Test the TTS engine
@@ -0,0 +1,201 @@
+"""
+Upload validation for the AI Accessibility Reader.
+Streams multipart uploads straight to disk in bounded blocks, hashing them
+on the way, and rejects files that exceed per-type size or page limits or
+whose leading bytes do not match their extension, before any extraction.
+"""
+
+import os
+import re
+import uuid
+import hashlib
+import zipfile
+import logging
+from werkzeug.exceptions import RequestEntityTooLarge, UnsupportedMediaType
+
+logger = logging.getLogger(__name__)
+
+# Per-type limits; max_pages is checked once the whole file has arrived
+UPLOAD_LIMITS = {
+    'txt': {'max_bytes': 20 * 1024 * 1024},
+    'pdf': {'max_bytes': 200 * 1024 * 1024, 'max_pages': 2000},
+    'docx': {'max_bytes': 50 * 1024 * 1024, 'max_pages': 2000,
+             'max_uncompressed_bytes': 500 * 1024 * 1024},  # Guards against zip bombs
+}
+MAGIC_BYTES = 1024  # Leading bytes inspected for the type check
+CHARS_PER_PAGE = 2000  # Typical text on a page, for estimating the cost of a conversion
+PARTIAL_PREFIX = '.partial-'
+
+_DOCX_PAGES_RE = re.compile(rb'<Pages>(\d+)</Pages>')
+
+
+class UploadTooLarge(RequestEntityTooLarge):
+    """Upload exceeds a size or page limit (413)"""
+
+
+class UnsupportedUpload(UnsupportedMediaType):
+    """Upload content does not match its extension (415)"""
+
+
+def file_extension(filename):
+    return filename.rsplit('.', 1)[1].lower() if filename and '.' in filename else ''
+
+
+def max_upload_bytes():
+    """Largest upload any type allows (used for MAX_CONTENT_LENGTH)"""
+    return max(limits['max_bytes'] for limits in UPLOAD_LIMITS.values())
+
+
+def matches_type(extension, head):
+    """Check an upload's leading bytes against what its extension promises"""
+    if extension == 'pdf':
+        # Readers accept the header anywhere in the first kilobyte
+        return b'%PDF-' in head
+    if extension == 'docx':
+        return head.startswith(b'PK\x03\x04')
+    if extension == 'txt':
+        # NUL bytes mean a binary file (or UTF-16, which extraction doesn't decode)
+        return b'\x00' not in head
+    return False
+
+
+class UploadSink:
+    """
+    Writable stream handed to the multipart parser for one uploaded file
+
+    Data goes to a partial file in the upload folder as it arrives, so no
+    copy is buffered in memory or a temp dir. Size and type are enforced
+    while streaming; claim() moves the file to its final name, and close()
+    deletes it if nobody did.
+    """
+    def __init__(self, directory, filename):
+        self.extension = file_extension(filename)
+        limits = UPLOAD_LIMITS.get(self.extension, {})
+        self.max_bytes = limits.get('max_bytes', max_upload_bytes())
+        self.path = os.path.join(directory, f"{PARTIAL_PREFIX}{uuid.uuid4()}")
+        self.size = 0
+        self.claimed = False
+        self._digest = hashlib.sha256()
+        self._head = b''
+        self._type_checked = False
+        self._file = open(self.path, 'w+b')
+
+    def _check_type(self):
+        self._type_checked = True
+        if self.extension in UPLOAD_LIMITS and not matches_type(self.extension, self._head):
+            self._discard()
+            raise UnsupportedUpload(f"File content does not look like a .{self.extension} file.")
+
+    def write(self, data):
+        self.size += len(data)
+        if self.size > self.max_bytes:
+            self._discard()
+            raise UploadTooLarge(f"File too large. .{self.extension} uploads are limited to "
+                                 f"{self.max_bytes // (1024 * 1024)} MB.")
+        if not self._type_checked:
+            self._head += data[:MAGIC_BYTES - len(self._head)]
+            if len(self._head) >= MAGIC_BYTES:
+                self._check_type()
+        self._digest.update(data)
+        return self._file.write(data)
+
+    def seek(self, offset, whence=0):
+        # The parser rewinds once the file part ends: the whole file is here
+        if not self._type_checked:
+            self._check_type()
+        return self._file.seek(offset, whence)
+
+    def read(self, size=-1):
+        return self._file.read(size)
+
+    def tell(self):
+        return self._file.tell()
+
+    def hexdigest(self):
+        return self._digest.hexdigest()
+
+    def claim(self, file_path):
+        """Move the received file to file_path; returns its SHA-256"""
+        self._file.close()
+        os.replace(self.path, file_path)
+        self.claimed = True
+        return self.hexdigest()
+
+    def _discard(self):
+        if not self._file.closed:
+            self._file.close()
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
+
+    def close(self):
+        if not self.claimed:
+            self._discard()
+
+
+def count_pages(file_path, extension):
+    """
+    Page count of a document, without extracting its text
+
+    Returns:
+        int or None: None if the format does not record pages
+    """
+    if extension == 'pdf':
+        import PyPDF2
+        with open(file_path, 'rb') as file:
+            return len(PyPDF2.PdfReader(file).pages)
+    if extension == 'docx':
+        with zipfile.ZipFile(file_path) as archive:
+            try:
+                # Word records the page count in the document properties
+                match = _DOCX_PAGES_RE.search(archive.read('docProps/app.xml'))
+            except KeyError:
+                return None
+            return int(match.group(1)) if match else None
+    return None
+
+
+def validate_document(file_path, extension):
+    """
+    Check a fully received upload against its structural and page limits
+
+    Returns:
+        int or None: Page count, if the format records one
+
+    Raises:
+        UploadTooLarge: If the document has too many pages or expands too far
+        UnsupportedUpload: If the document is malformed
+    """
+    limits = UPLOAD_LIMITS.get(extension, {})
+    try:
+        if extension == 'docx':
+            with zipfile.ZipFile(file_path) as archive:
+                names = archive.namelist()
+                uncompressed = sum(info.file_size for info in archive.infolist())
+            if 'word/document.xml' not in names:
+                raise UnsupportedUpload("File is not a Word document.")
+            if uncompressed > limits['max_uncompressed_bytes']:
+                raise UploadTooLarge("Document expands to more data than allowed.")
+        pages = count_pages(file_path, extension) if 'max_pages' in limits else None
+    except zipfile.BadZipFile:
+        raise UnsupportedUpload("File is not a valid .docx document.")
+    except (UploadTooLarge, UnsupportedUpload):
+        raise
+    except Exception as e:
+        logger.warning(f"Could not inspect {file_path}: {e}")
+        raise UnsupportedUpload(f"File is not a valid .{extension} document.")
+
+    if pages is not None and pages > limits['max_pages']:
+        raise UploadTooLarge(f"Document has {pages} pages; the limit is {limits['max_pages']}.")
+    return pages
+
+
+def estimate_chars(file_path, extension, pages=None):
+    """Rough number of characters an upload will extract to, before extracting it"""
+    if pages:
+        return pages * CHARS_PER_PAGE
+    size = os.path.getsize(file_path)
+    if extension == 'docx':
+        return size * 2  # Compressed XML; a rough but consistent ratio
+    return size
@@ -15,8 +15,14 @@ function App() {
   const [loading, setLoading] = useState<boolean>(false);
   const [error, setError] = useState<string | null>(null);
 
+  const handleStartProcessing = () => {
+    setAudioUrl(null);
+    setLoading(true);
+  };
+
   const handleFileProcessed = (data: ProcessedData) => {
-    setAudioUrl(data.audio_url);
+    // Keep playing the progressive stream if it was already started
+    setAudioUrl((current) => current ?? data.audio_url);
     setExtractedText(data.text);
     setLoading(false);
     setError(null);
@@ -34,8 +40,9 @@ function App() {
       <main className="main-content">
         <section className="upload-section">
           <FileUpload
-            onStartProcessing={() => setLoading(true)}
+            onStartProcessing={handleStartProcessing}
             onFileProcessed={handleFileProcessed}
+            onStreamReady={setAudioUrl}
             onError={handleError}
           />
 
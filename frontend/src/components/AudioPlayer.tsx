@@ -69,12 +69,14 @@ const AudioPlayer: React.FC<AudioPlayerProps> = ({ audioUrl }) => {
   };
 
   const formatTime = (seconds: number): string => {
+    // Progressive streams have no known length until synthesis finishes
+    if (!isFinite(seconds)) return '--:--';
     const mins = Math.floor(seconds / 60);
     const secs = Math.floor(seconds % 60);
     return `${mins}:${secs < 10 ? '0' : ''}${secs}`;
   };
 
-  const progressPercentage = duration ? (currentTime / duration) * 100 : 0;
+  const progressPercentage = duration && isFinite(duration) ? (currentTime / duration) * 100 : 0;
 
   return (
     <div className="audio-player">
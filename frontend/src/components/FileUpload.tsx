@@ -5,10 +5,16 @@ import '../styles/FileUpload.css';
 interface FileUploadProps {
   onStartProcessing: () => void;
   onFileProcessed: (data: any) => void;
+  onStreamReady: (streamUrl: string) => void;
   onError: (message: string) => void;
 }
 
-const FileUpload: React.FC<FileUploadProps> = ({ onStartProcessing, onFileProcessed, onError }) => {
+const API_BASE = 'http://localhost:5000';
+const POLL_INTERVAL_MS = 1000;
+
+const sleep = (ms: number) => new Promise((resolve) => setTimeout(resolve, ms));
+
+const FileUpload: React.FC<FileUploadProps> = ({ onStartProcessing, onFileProcessed, onStreamReady, onError }) => {
   const [selectedFile, setSelectedFile] = useState<File | null>(null);
   const [dragActive, setDragActive] = useState(false);
   const fileInputRef = useRef<HTMLInputElement>(null);
@@ -71,12 +77,38 @@ const FileUpload: React.FC<FileUploadProps> = ({ onStartProcessing, onFileProces
 
     try {
       onStartProcessing();
-      const response = await axios.post('http://localhost:5000/api/upload', formData, {
+      const response = await axios.post(`${API_BASE}/api/upload`, formData, {
         headers: {
           'Content-Type': 'multipart/form-data',
         },
       });
-      onFileProcessed(response.data);
+
+      // A previously converted document is answered right away
+      if (response.status === 200) {
+        onFileProcessed(response.data);
+        return;
+      }
+
+      // Conversion runs in the background; poll the job until it finishes
+      const statusUrl = `${API_BASE}${response.data.status_url}`;
+      let streaming = false;
+      while (true) {
+        await sleep(POLL_INTERVAL_MS);
+        const status = await axios.get(statusUrl);
+        // Start playback as soon as the first chunk has been synthesized
+        if (!streaming && status.data.progress?.chunks_done > 0) {
+          streaming = true;
+          onStreamReady(response.data.stream_url);
+        }
+        if (status.data.state === 'completed') {
+          onFileProcessed(status.data);
+          return;
+        }
+        if (status.data.state === 'failed') {
+          onError(status.data.error || 'File processing failed. Please try again.');
+          return;
+        }
+      }
     } catch (error: any) {
       let errorMessage = 'File processing failed. Please try again.';
       if (error.response?.data?.error) {